@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Collection Server
+Birden fazla test istasyonunda tamamlanan oturumları tek bir merkezi
+veritabanında toplar (asyncio HTTP sunucusu, yalnızca standart kütüphane)
+
+Sunucu:
+    POST /upload   gzip sıkıştırılmış JSON oturum paketi (idempotent upsert)
+    GET  /status   merkezi depodaki oturum / istasyon sayıları
+- Paketler olay döngüsü dışında (thread) açılır ve doğrulanır
+- Eşzamanlı yüklemeler tek bir yazıcı görevinde birleştirilir: kuyruktaki
+  tüm paketler tek transaction'da yazılır (grup commit); istasyon yanıtı
+  commit'ten sonra alır. Grup commit başarısız olursa paketler ayrı
+  SAVEPOINT'lerle yeniden denenir, yalnızca hatalı paket reddedilir
+- Oturumlar session_id ile eşlenir; içerik özeti (SHA-256) değişmemişse
+  yazılmaz, değişmişse denemeleri ve metrikleriyle birlikte güncellenir
+- Oturum ilk gönderen istasyona aittir; başka istasyondan aynı session_id
+  ile gelen farklı içerik yazılmaz, 'conflict' olarak bildirilir
+
+İstasyon (istemci):
+    Yerel veritabanındaki gönderilmemiş veya değişmiş oturumları paketler
+    halinde yollar, gönderilenleri uploaded_sessions tablosunda işaretler.
+    Config.COLLECTION_URL tanımlıysa uygulama her oturumdan sonra arka
+    planda gönderir; başarısız gönderimler bir sonrakinde tekrar denenir.
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import gzip
+import zlib
+import json
+import math
+import time
+import socket
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import urllib.request
+from http import HTTPStatus
+from itertools import chain, groupby
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from igt_metrics import database_metrics, store_metrics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_DB = 'igt_central.db'
+TOKEN_HEADER = 'X-IGT-Token'
+MAX_BODY_BYTES = 32 * 1024 * 1024    # Sıkıştırılmış paket üst sınırı
+MAX_PACKET_SESSIONS = 1000           # Paket başına oturum üst sınırı
+MAX_COMMIT_SESSIONS = 5000           # Tek commit'te birleştirilen oturum sınırı (SQLite parametre sınırı)
+PUSH_BATCH = 50                      # İstemci: paket başına oturum
+PUSH_TIMEOUT_S = 30
+
+# Aktarılan alanlar (yerel dosya yolları ve sid istasyona özgüdür, gönderilmez)
+SESSION_FIELDS = ('session_id', 'subject_id', 'age', 'gender', 'start_time', 'end_time',
+                  'trials_completed', 'final_balance', 'net_change', 't0_ns', 'schedule_seed')
+TRIAL_FIELDS = ('trial_number', 'deck', 'reaction_time', 'reward', 'penalty',
+                'net_outcome', 'total_balance', 't_ns')
+
+# Alan türleri (sqlite'a bağlanamayan bir değer grup commit'ini bozar); NOT NULL alanlar ayrıca
+SESSION_TYPES = {'session_id': str, 'subject_id': str, 'age': int, 'gender': str,
+                 'start_time': str, 'end_time': str, 'trials_completed': int,
+                 'final_balance': int, 'net_change': int, 't0_ns': int, 'schedule_seed': int}
+TRIAL_TYPES = {'trial_number': int, 'deck': int, 'reaction_time': float, 'reward': int,
+               'penalty': int, 'net_outcome': int, 'total_balance': int, 't_ns': int}
+NOT_NULL_FIELDS = ('session_id', 'subject_id', 'start_time', 'trial_number', 'deck')
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Merkezi depo: oturumun kaynağı ve son yazılan içeriğin özeti
+SOURCES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_sources (
+    sid INTEGER PRIMARY KEY,
+    station TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    received_at TEXT NOT NULL,
+    FOREIGN KEY (sid) REFERENCES sessions(sid)
+)
+"""
+
+# İstasyon: sunucunun kabul ettiği oturumlar
+UPLOADS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploaded_sessions (
+    session_id TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL
+)
+"""
+
+
+# =============================================================================
+# HTTP (asyncio streams üzerinde en küçük HTTP/1.1 katmanı)
+# =============================================================================
+class HttpError(Exception):
+    """İstemciye durum koduyla döndürülecek hata"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY_BYTES):
+    """
+    Tek bir HTTP isteğini okur
+
+    Returns:
+        (method, target, headers, body) veya bağlantı kapandıysa None
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "geçersiz istek satırı")
+
+    headers = {'version': version}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(411, "Content-Length gerekli")
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(400, "geçersiz Content-Length")
+    if length > max_body:
+        raise HttpError(413, f"paket çok büyük (> {max_body} bayt)")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def encode_response(status: int, payload, keep_alive: bool = True,
+                    content_type: str = 'application/json') -> bytes:
+    """Yanıtı baytlara çevirir (bytes dışındaki yükler JSON olarak gönderilir)"""
+    if isinstance(payload, bytes):
+        body = payload
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        content_type = 'application/json'
+    head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                           dispatch, max_body: int = MAX_BODY_BYTES):
+    """
+    Bağlantıdaki istekleri sırayla dispatch'e iletir (keep-alive destekli)
+
+    dispatch(method, target, headers, body) → (status, payload) veya
+    (status, payload, content_type) döndüren coroutine.
+    """
+    try:
+        while True:
+            try:
+                request = await read_request(reader, max_body)
+            except HttpError as e:
+                writer.write(encode_response(e.status, {'error': e.message}, keep_alive=False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            keep_alive = (headers.get('connection', '').lower() != 'close'
+                          and headers['version'] != 'HTTP/1.0')
+            try:
+                status, payload, *content_type = await dispatch(method, target, headers, body)
+            except HttpError as e:
+                status, payload, content_type = e.status, {'error': e.message}, []
+            except Exception as e:
+                logging.exception("İstek işlenemedi")
+                status, payload, content_type = 500, {'error': str(e)}, []
+            writer.write(encode_response(status, payload, keep_alive, *content_type))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+# =============================================================================
+# PAKET BİÇİMİ
+# =============================================================================
+def session_digest(item: dict) -> str:
+    """Oturum içeriğinin özeti (istasyon ve sunucuda aynı kanonik JSON)"""
+    text = json.dumps(item, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def valid_column(values: list, kind: type, nullable: bool = True) -> bool:
+    """Sütundaki tüm değerler türe uyuyor mu (int: int64 aralığı, float: sonlu sayı)"""
+    if nullable:
+        values = [v for v in values if v is not None]
+    if kind is str:
+        return all(type(v) is str for v in values)
+    if kind is float:
+        if not all(math.isfinite(v) for v in values if type(v) is float):
+            return False
+        values = [v for v in values if type(v) is not float]
+    # bool da int alt sınıfıdır; type() ile dışarıda bırakılır
+    return all(type(v) is int for v in values) \
+        and (not values or (min(values) >= INT64_MIN and max(values) <= INT64_MAX))
+
+
+def validate_session(item: dict) -> dict:
+    """
+    Gelen oturumu şemaya göre doğrular
+
+    Returns:
+        Yalnızca bilinen alanları içeren oturum ({'session', 'trials'})
+    """
+    if not isinstance(item, dict) or not isinstance(item.get('session'), dict) \
+            or not isinstance(item.get('trials'), dict):
+        raise ValueError("oturum {'session', 'trials'} nesnesi olmalı")
+    session, trials = item['session'], item['trials']
+    missing = [f for f in SESSION_FIELDS if f not in session] + \
+              [f for f in TRIAL_FIELDS if f not in trials]
+    if missing:
+        raise ValueError(f"eksik alanlar {missing}")
+    if not isinstance(session['session_id'], str) or not session['session_id'] \
+            or not session['subject_id'] or not session['start_time']:
+        raise ValueError("session_id, subject_id ve start_time boş olamaz")
+
+    invalid = [f for f, kind in SESSION_TYPES.items()
+               if not valid_column([session[f]], kind, f not in NOT_NULL_FIELDS)]
+    if invalid:
+        raise ValueError(f"{session['session_id']}: geçersiz oturum alanları {invalid}")
+
+    columns = {f: trials[f] for f in TRIAL_FIELDS}
+    if not all(isinstance(c, list) for c in columns.values()) \
+            or len({len(c) for c in columns.values()}) != 1:
+        raise ValueError(f"{session['session_id']}: deneme sütunları eşit uzunlukta listeler olmalı")
+    invalid = [f for f, kind in TRIAL_TYPES.items()
+               if not valid_column(columns[f], kind, f not in NOT_NULL_FIELDS)]
+    if invalid:
+        raise ValueError(f"{session['session_id']}: geçersiz deneme sütunları {invalid}")
+    if not all(0 <= d <= 3 for d in columns['deck']):
+        raise ValueError(f"{session['session_id']}: geçersiz deste değeri")
+    if columns['trial_number'] != list(range(1, len(columns['trial_number']) + 1)):
+        raise ValueError(f"{session['session_id']}: trial_number sırası bozuk")
+    return {'session': {f: session[f] for f in SESSION_FIELDS}, 'trials': columns}
+
+
+def decode_packet(body: bytes, encoding: str = '') -> tuple:
+    """
+    Yükleme gövdesini açar ve doğrular (olay döngüsü dışında çalışır)
+
+    Returns:
+        (istasyon adı, [(oturum, özet), ...])
+    """
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    packet = json.loads(body)
+    if not isinstance(packet, dict) or not isinstance(packet.get('sessions'), list):
+        raise ValueError("paket {'station', 'sessions'} nesnesi olmalı")
+    if len(packet['sessions']) > MAX_PACKET_SESSIONS:
+        raise ValueError(f"paket başına en fazla {MAX_PACKET_SESSIONS} oturum")
+    station = str(packet.get('station') or 'bilinmeyen')
+    items = {}
+    for item in packet['sessions']:
+        item = validate_session(item)
+        items[item['session']['session_id']] = item     # tekrar edenlerde sonuncusu
+    return station, [(item, session_digest(item)) for item in items.values()]
+
+
+def encode_packet(station: str, items: list) -> bytes:
+    """İstasyon paketi: gzip sıkıştırılmış JSON"""
+    text = json.dumps({'station': station, 'sessions': items}, separators=(',', ':'))
+    return gzip.compress(text.encode('utf-8'), compresslevel=6)
+
+
+# =============================================================================
+# MERKEZİ DEPO
+# =============================================================================
+def upsert_sessions(conn: sqlite3.Connection, entries: list, received_at: str) -> list:
+    """
+    Oturumları tek geçişte yazar (transaction çağırana aittir)
+
+    Yazıcı, bir commit'te birleşen tüm paketlerin oturumlarını birlikte
+    verir; denemeler tek executemany ile, metrikler tek vektörel geçişte yazılır.
+
+    Bir oturum ilk yazan istasyona aittir (session_sources.station). Başka
+    bir istasyondan aynı session_id ile farklı içerik gelirse üzerine
+    yazılmaz, 'conflict' olarak reddedilir (örn. iki istasyonda aynı anda
+    başlatılmış, aynı kimliği almış oturumlar).
+
+    Args:
+        entries: [(istasyon, oturum, özet), ...]; aynı session_id sahibi
+            istasyondan birden fazla gelirse sonuncusu yazılır
+
+    Returns:
+        Her giriş için 'inserted', 'updated', 'unchanged' veya 'conflict'
+    """
+    if not entries:
+        return []
+    session_ids = {item['session']['session_id'] for _, item, _ in entries}
+    placeholders = ",".join("?" * len(session_ids))
+    known = {session_id: (digest, station) for session_id, digest, station in conn.execute(f"""
+        SELECT s.session_id, src.digest, src.station
+        FROM sessions s
+        LEFT JOIN session_sources src ON src.sid = s.sid
+        WHERE s.session_id IN ({placeholders})
+    """, list(session_ids)).fetchall()}
+
+    # Sahibi olmayan istasyonun girişleri yazılmaz: aynı içerik 'unchanged', farklı içerik 'conflict'
+    owners, latest, foreign = {}, {}, {}
+    for i, (station, item, digest) in enumerate(entries):
+        session_id = item['session']['session_id']
+        known_digest, known_station = known.get(session_id, (None, None))
+        owner = owners.setdefault(session_id, known_station or station)
+        if station == owner:
+            latest[session_id] = i
+        elif digest == known_digest:
+            foreign[i] = 'unchanged'
+        else:
+            foreign[i] = 'conflict'
+            logging.warning(f"⚠️ {session_id}: {station} istasyonundan gelen içerik "
+                            f"{owner} kaydıyla çakışıyor, yazılmadı")
+
+    status = {session_id: 'unchanged' if known.get(session_id, ('',))[0] == entries[i][2]
+              else 'updated' if session_id in known else 'inserted'
+              for session_id, i in latest.items()}
+    statuses = [foreign.get(i) or status[item['session']['session_id']]
+                for i, (_, item, _) in enumerate(entries)]
+    changed = [entries[i] for session_id, i in latest.items() if status[session_id] != 'unchanged']
+    if not changed:
+        return statuses
+
+    conn.executemany(f"""
+        INSERT INTO sessions ({', '.join(SESSION_FIELDS)})
+        VALUES ({', '.join('?' * len(SESSION_FIELDS))})
+        ON CONFLICT(session_id) DO UPDATE SET
+            {', '.join(f'{f} = excluded.{f}' for f in SESSION_FIELDS[1:])}
+    """, [[item['session'][f] for f in SESSION_FIELDS] for _, item, _ in changed])
+
+    changed_ids = [item['session']['session_id'] for _, item, _ in changed]
+    placeholders = ",".join("?" * len(changed_ids))
+    sids = dict(conn.execute(
+        f"SELECT session_id, sid FROM sessions WHERE session_id IN ({placeholders})",
+        changed_ids).fetchall())
+    sid_list = [sids[session_id] for session_id in changed_ids]
+
+    # Güncellenen oturumların eski denemeleri ve model kestirimleri geçersizdir
+    conn.execute(f"DELETE FROM trial_data WHERE sid IN ({placeholders})", sid_list)
+    conn.execute(f"DELETE FROM model_fits WHERE sid IN ({placeholders})", sid_list)
+
+    counts = [len(item['trials']['trial_number']) for _, item, _ in changed]
+    columns = {f: list(chain.from_iterable(item['trials'][f] for _, item, _ in changed))
+               for f in TRIAL_FIELDS}
+    trial_sids = np.repeat(sid_list, counts).tolist()
+    conn.executemany(f"""
+        INSERT INTO trial_data (sid, {', '.join(TRIAL_FIELDS)})
+        VALUES (?, {', '.join('?' * len(TRIAL_FIELDS))})
+    """, zip(trial_sids, *(columns[f] for f in TRIAL_FIELDS)))
+    if trial_sids:
+        trials = pd.DataFrame({'sid': trial_sids, **{f: columns[f] for f in
+                               ('trial_number', 'deck', 'reaction_time', 'net_outcome')}})
+        store_metrics(conn, database_metrics(trials))
+
+    conn.executemany("""
+        INSERT OR REPLACE INTO session_sources (sid, station, digest, received_at)
+        VALUES (?, ?, ?, ?)
+    """, [(sid, station, digest, received_at)
+          for sid, (station, _, digest) in zip(sid_list, changed)])
+    return statuses
+
+
+class CollectionServer:
+    """
+    Merkezi toplama sunucusu
+
+    Tüm SQLite işlemleri tek bir thread'de (tek bağlantı) yürütülür; olay
+    döngüsü yalnızca ağ G/Ç'sini yönetir. Yazıcı görev kuyrukta biriken
+    paketleri tek transaction'da commit eder.
+    """
+
+    def __init__(self, db_path: str, token: str = None, max_body: int = MAX_BODY_BYTES):
+        self.db_path = db_path
+        self.token = token
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='IGT-CollectionDB')
+        self.conn = None
+        self.queue = None
+        self.stats = {'uploads': 0, 'commits': 0, 'sessions_written': 0, 'errors': 0}
+
+    def _connect(self):
+        """Veritabanı bağlantısı (yazıcı thread'de)"""
+        # Sunucu tarafı şemayı uygulamadan alır; istasyon istemcisi main'e bağımlı değildir
+        from main import migrate_database
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        migrate_database(conn)
+        conn.execute(SOURCES_SCHEMA)
+        conn.commit()
+        self.conn = conn
+
+    def _write(self, batch: list) -> list:
+        """
+        Kuyruktaki paketleri tek transaction'da yazar (yazıcı thread)
+
+        Grup commit başarısız olursa paketler tek transaction içinde ayrı
+        SAVEPOINT'lerle yeniden yazılır: yalnızca hatalı paket geri alınır.
+
+        Returns:
+            Her paket için sonuç sözlüğü veya paketi yazdırmayan hata
+        """
+        received_at = datetime.now().isoformat(timespec='seconds')
+        entries = [(station, item, digest) for station, items, _ in batch for item, digest in items]
+        try:
+            with self.conn:
+                statuses = iter(upsert_sessions(self.conn, entries, received_at))
+            return [self._result(items, statuses) for _, items, _ in batch]
+        except Exception:
+            if len(batch) == 1:
+                raise
+            logging.warning(f"⚠️ Grup commit başarısız, {len(batch)} paket ayrı ayrı yazılıyor")
+
+        results = []
+        with self.conn:
+            # Açık BEGIN: aksi halde en dıştaki RELEASE her paketi ayrı commit eder
+            self.conn.execute("BEGIN")
+            for station, items, _ in batch:
+                self.conn.execute("SAVEPOINT packet")
+                try:
+                    statuses = iter(upsert_sessions(
+                        self.conn, [(station, item, digest) for item, digest in items], received_at))
+                except Exception as e:
+                    self.conn.execute("ROLLBACK TO packet")
+                    results.append(e)
+                else:
+                    results.append(self._result(items, statuses))
+                finally:
+                    self.conn.execute("RELEASE packet")
+        return results
+
+    @staticmethod
+    def _result(items: list, statuses) -> dict:
+        """Bir paketin oturum durumlarından yanıt sözlüğü"""
+        result = {'received': len(items), 'inserted': 0, 'updated': 0, 'unchanged': 0,
+                  'conflict': 0, 'conflicts': []}
+        for item, _ in items:
+            status = next(statuses)
+            result[status] += 1
+            if status == 'conflict':
+                result['conflicts'].append(item['session']['session_id'])
+        return result
+
+    def _status(self) -> dict:
+        """Depo özeti (yazıcı thread)"""
+        sessions, trials = self.conn.execute(
+            "SELECT COUNT(*), (SELECT COUNT(*) FROM trial_data) FROM sessions").fetchone()
+        stations = dict(self.conn.execute(
+            "SELECT station, COUNT(*) FROM session_sources GROUP BY station").fetchall())
+        return {'sessions': sessions, 'trials': trials, 'stations': stations, **self.stats}
+
+    async def run_in_db(self, func, *args):
+        """Fonksiyonu veritabanı thread'inde çalıştırır"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def writer_loop(self):
+        """Kuyruğu boşaltır: biriken tüm paketler tek commit'te"""
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][1])
+            while not self.queue.empty() and size < MAX_COMMIT_SESSIONS:
+                batch.append(self.queue.get_nowait())
+                size += len(batch[-1][1])
+            try:
+                results = await self.run_in_db(self._write, batch)
+            except Exception as e:
+                logging.error(f"❌ Toplu yazma hatası: {e}")
+                self.stats['errors'] += 1
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats['commits'] += 1
+            for (_, _, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logging.error(f"❌ Paket yazılamadı: {result}")
+                    self.stats['errors'] += 1
+                    if not future.done():
+                        future.set_exception(result)
+                    continue
+                self.stats['sessions_written'] += result['inserted'] + result['updated']
+                if not future.done():
+                    future.set_result(result)
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        """İstek yönlendirme"""
+        path = target.split('?', 1)[0].rstrip('/') or '/'
+        if self.token and headers.get(TOKEN_HEADER.lower()) != self.token:
+            raise HttpError(401, "geçersiz istasyon anahtarı")
+        if path == '/status':
+            if method != 'GET':
+                raise HttpError(405, "GET bekleniyor")
+            status = await self.run_in_db(self._status)
+            return 200, {**status, 'queued': self.queue.qsize()}
+        if path == '/upload':
+            if method != 'POST':
+                raise HttpError(405, "POST bekleniyor")
+            loop = asyncio.get_running_loop()
+            try:
+                station, items = await loop.run_in_executor(
+                    None, decode_packet, body, headers.get('content-encoding', '').lower())
+            except (ValueError, OSError, EOFError, zlib.error) as e:
+                raise HttpError(400, f"geçersiz paket: {e}")
+            future = loop.create_future()
+            await self.queue.put((station, items, future))
+            try:
+                result = await future
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError,
+                    OverflowError, TypeError, ValueError) as e:
+                raise HttpError(400, f"paket yazılamadı: {e}")
+            self.stats['uploads'] += 1
+            return 200, result
+        raise HttpError(404, f"bilinmeyen yol: {path}")
+
+    async def handle_connection(self, reader, writer):
+        await serve_connection(reader, writer, self.dispatch, self.max_body)
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Veritabanını hazırlar, yazıcı görevi ve dinleyiciyi başlatır"""
+        await self.run_in_db(self._connect)
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.writer_loop())
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def close(self):
+        """Yazıcı görevi durdurur ve bağlantıyı kapatır"""
+        self.writer_task.cancel()
+        if self.conn is not None:
+            await self.run_in_db(self.conn.close)
+        self.executor.shutdown(wait=True)
+
+
+# =============================================================================
+# İSTASYON İSTEMCİSİ
+# =============================================================================
+def station_sessions(conn: sqlite3.Connection) -> list:
+    """Yerel veritabanındaki tüm oturumlar, gönderim biçiminde"""
+    sessions = conn.execute(
+        f"SELECT sid, {', '.join(SESSION_FIELDS)} FROM sessions ORDER BY start_time").fetchall()
+    trials = conn.execute(
+        f"SELECT sid, {', '.join(TRIAL_FIELDS)} FROM trial_data ORDER BY sid, trial_number")
+    columns = {sid: dict(zip(TRIAL_FIELDS, map(list, zip(*(row[1:] for row in rows)))))
+               for sid, rows in groupby(trials, key=lambda row: row[0])}
+    empty = {f: [] for f in TRIAL_FIELDS}
+    return [{'session': dict(zip(SESSION_FIELDS, row[1:])), 'trials': columns.get(row[0], empty)}
+            for row in sessions]
+
+
+def post_packet(url: str, body: bytes, token: str = None, timeout: float = PUSH_TIMEOUT_S) -> dict:
+    """Paketi sunucuya gönderir, sunucunun sonuç sözlüğünü döndürür"""
+    headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    if token:
+        headers[TOKEN_HEADER] = token
+    request = urllib.request.Request(url.rstrip('/') + '/upload', data=body,
+                                     headers=headers, method='POST')
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def push_sessions(db_path: str, url: str, station: str = None, token: str = None,
+                  batch: int = PUSH_BATCH, timeout: float = PUSH_TIMEOUT_S) -> dict:
+    """
+    Gönderilmemiş veya değişmiş oturumları paketler halinde gönderir
+
+    Returns:
+        {'pending', 'sent', 'inserted', 'updated', 'unchanged', 'conflict', 'bytes'}
+        (ağ / sunucu hataları çağırana iletilir; gönderilmeyenler ve sunucunun
+        başka istasyonun kaydıyla çakıştığı için reddettikleri sonraki çağrıda denenir)
+    """
+    station = station or socket.gethostname()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute(UPLOADS_SCHEMA)
+        conn.commit()
+        uploaded = dict(conn.execute("SELECT session_id, digest FROM uploaded_sessions").fetchall())
+        pending = [(item, digest) for item, digest in
+                   ((item, session_digest(item)) for item in station_sessions(conn))
+                   if uploaded.get(item['session']['session_id']) != digest]
+
+        totals = {'pending': len(pending), 'sent': 0, 'inserted': 0, 'updated': 0,
+                  'unchanged': 0, 'conflict': 0, 'bytes': 0}
+        for start in range(0, len(pending), batch):
+            chunk = pending[start:start + batch]
+            body = encode_packet(station, [item for item, _ in chunk])
+            result = post_packet(url, body, token, timeout)
+            uploaded_at = datetime.now().isoformat(timespec='seconds')
+            conflicts = set(result.get('conflicts', []))
+            for session_id in sorted(conflicts):
+                logging.warning(f"⚠️ {session_id}: merkezde başka istasyonun kaydıyla çakışıyor")
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO uploaded_sessions (session_id, digest, uploaded_at) "
+                    "VALUES (?, ?, ?)",
+                    [(item['session']['session_id'], digest, uploaded_at) for item, digest in chunk
+                     if item['session']['session_id'] not in conflicts])
+            totals['sent'] += len(chunk)
+            totals['bytes'] += len(body)
+            for key in ('inserted', 'updated', 'unchanged', 'conflict'):
+                totals[key] += result.get(key, 0)
+
+        # Yerelde silinmiş (200 sınırı) oturumların işaretleri
+        with conn:
+            conn.execute("DELETE FROM uploaded_sessions "
+                         "WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+        return totals
+    finally:
+        conn.close()
+
+
+_push_lock = threading.Lock()
+
+
+def start_background_push(db_path: str, url: str, station: str = None,
+                          token: str = None) -> threading.Thread:
+    """
+    Deney akışını bekletmeden arka planda gönderir
+
+    Aynı anda tek gönderim çalışır; sonraki çağrı öncekinin bitmesini bekler.
+    """
+    def run():
+        with _push_lock:
+            try:
+                totals = push_sessions(db_path, url, station, token)
+                if totals['sent']:
+                    logging.info(f"📤 {totals['sent']} oturum toplama sunucusuna gönderildi")
+            except Exception as e:
+                logging.warning(f"⚠️ Toplama sunucusuna gönderilemedi (sonra tekrar denenecek): {e}")
+
+    thread = threading.Thread(target=run, name='IGT-CollectionPush', daemon=True)
+    thread.start()
+    return thread
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+async def serve(db_path: str, host: str, port: int, token: str = None):
+    """Sunucuyu durdurulana kadar çalıştırır"""
+    server = CollectionServer(db_path, token)
+    listener = await server.start(host, port)
+    print(f"🌐 Dinleniyor: http://{host}:{port}  (depo: {db_path})")
+    print("   Durdurmak için Ctrl+C")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📡 IGT Toplama Sunucusu")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    command = args[0] if args else None
+    if 'help' in options or command not in ('serve', 'push') \
+            or (command == 'push' and len(args) < 3):
+        print("\nKullanım:")
+        print("  python3 collection_server.py serve [merkez.db] [--host=127.0.0.1] "
+              "[--port=8765] [--token=<anahtar>]")
+        print("  python3 collection_server.py push <istasyon.db> <http://sunucu:port> "
+              "[--station=<ad>] [--token=<anahtar>] [--batch=N]")
+        print("\nÖrnek:")
+        print("  python3 collection_server.py serve Sonuclar/igt_central.db --host=0.0.0.0")
+        print("  python3 collection_server.py push Sonuclar/igt_sessions.db http://192.168.1.10:8765")
+        sys.exit(0 if 'help' in options else 1)
+
+    token = options.get('token') or None
+    if command == 'serve':
+        db_path = args[1] if len(args) > 1 else DEFAULT_DB
+        try:
+            asyncio.run(serve(db_path, options.get('host') or DEFAULT_HOST,
+                              int(options.get('port') or DEFAULT_PORT), token))
+        except KeyboardInterrupt:
+            print("\n👋 Sunucu durduruldu")
+        return
+
+    db_path, url = args[1], args[2]
+    if not os.path.exists(db_path):
+        print(f"❌ Veritabanı bulunamadı: {db_path}")
+        sys.exit(1)
+    t_start = time.perf_counter()
+    try:
+        totals = push_sessions(db_path, url, options.get('station') or None, token,
+                               int(options.get('batch') or PUSH_BATCH))
+    except Exception as e:
+        print(f"❌ Gönderim başarısız: {e}")
+        sys.exit(1)
+    print(f"\n✅ {totals['sent']}/{totals['pending']} oturum gönderildi "
+          f"({totals['bytes'] / 1024:.1f} KB, {time.perf_counter() - t_start:.2f} sn)")
+    print(f"   Yeni: {totals['inserted']}, güncellenen: {totals['updated']}, "
+          f"değişmemiş: {totals['unchanged']}")
+    if totals['conflict']:
+        print(f"   ⚠️ {totals['conflict']} oturum başka istasyonun kaydıyla çakıştı (yazılmadı)")
+
+
+if __name__ == "__main__":
+    main()
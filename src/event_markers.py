@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Event Markers
+Deneme olaylarını (kartlar aktif, seçim, geri bildirim açık/kapalı) harici
+kayıt cihazlarına düşük gecikmeyle gönderir
+
+Taşıyıcılar:
+    UdpTransport     - "IGT,<kod>,<olay>,<trial>,<deste>,<wall_ns>" metin satırı
+    SerialTransport  - Tek bayt tetik kodu (pyserial, trigger box / pseudo-terminal)
+    LslTransport     - Lab Streaming Layer string marker outlet (pylsl)
+
+Gönderim ayrı bir thread'de yapılır; GUI thread'i yalnızca kuyruğa ekler.
+Her marker için olay zamanı ve her taşıyıcıdaki gönderim zamanı kaydedilir.
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import csv
+import time
+import queue
+import socket
+import threading
+from collections import namedtuple
+
+try:
+    import serial
+except ImportError:  # pyserial opsiyonel
+    serial = None
+
+try:
+    import pylsl
+except ImportError:  # pylsl opsiyonel
+    pylsl = None
+
+MARKER_CODES = {
+    'sync': 1,
+    'cards_on': 10,
+    'choice_A': 21,
+    'choice_B': 22,
+    'choice_C': 23,
+    'choice_D': 24,
+    'feedback_on': 30,
+    'feedback_off': 31,
+    'session_end': 99,
+}
+
+Marker = namedtuple('Marker', ['seq', 'code', 'event', 'trial', 'deck',
+                               'event_ns', 'wall_ns', 'lsl_time'])
+
+
+class UdpTransport:
+    """UDP datagram ile metin marker gönderir"""
+    name = 'udp'
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 5005):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, marker: Marker):
+        payload = (f"IGT,{marker.code},{marker.event},{marker.trial},"
+                   f"{marker.deck},{marker.wall_ns}\n")
+        self.sock.sendto(payload.encode('ascii'), self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+class SerialTransport:
+    """Seri port üzerinden tek baytlık tetik kodu gönderir"""
+    name = 'serial'
+
+    def __init__(self, port: str, baudrate: int = 115200):
+        if serial is None:
+            raise ImportError("pyserial gerekli: pip install pyserial")
+        self.port = serial.Serial(port, baudrate=baudrate, timeout=0, write_timeout=0.01)
+
+    def send(self, marker: Marker):
+        self.port.write(bytes([marker.code]))
+        self.port.flush()
+
+    def close(self):
+        self.port.close()
+
+
+class LslTransport:
+    """LSL string marker outlet"""
+    name = 'lsl'
+
+    def __init__(self, stream_name: str = 'IGT_Markers', source_id: str = 'igt_tr'):
+        if pylsl is None:
+            raise ImportError("pylsl gerekli: pip install pylsl")
+        info = pylsl.StreamInfo(stream_name, 'Markers', 1, pylsl.IRREGULAR_RATE,
+                                'string', source_id)
+        self.outlet = pylsl.StreamOutlet(info)
+
+    def send(self, marker: Marker):
+        label = f"{marker.event}|{marker.trial}|{marker.deck}"
+        # Olay anındaki LSL saati gönderilir, kuyruk gecikmesi zaman damgasına yansımaz
+        self.outlet.push_sample([label], marker.lsl_time)
+
+    def close(self):
+        self.outlet = None
+
+
+class MarkerSender:
+    """
+    Marker kuyruğu ve gönderici thread
+
+    emit() GUI thread'inden çağrılır ve yalnızca zaman damgası alıp kuyruğa ekler.
+    Gönderim kayıtları (seq, olay zamanı, taşıyıcı, gönderim zamanı) log'da tutulur;
+    her marker emit anındaki oturumun log listesiyle kuyruğa girer, böylece reset()
+    sonrası gönderilen eski bir marker yeni oturumun log'una yazılmaz.
+    """
+
+    def __init__(self, transports: list):
+        self.transports = transports
+        self.queue = queue.SimpleQueue()
+        self.markers = []
+        self.send_log = []  # (seq, transport, sent_ns, error)
+        self.seq = 0
+        self.thread = threading.Thread(target=self.run, name='IGT-MarkerSender', daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def from_config(cls, udp=None, serial_port=None, lsl=False):
+        """Yapılandırmadan taşıyıcıları kurar; hiçbiri yoksa None döndürür"""
+        transports = []
+        if udp:
+            transports.append(UdpTransport(*udp))
+        if serial_port:
+            transports.append(SerialTransport(serial_port))
+        if lsl:
+            transports.append(LslTransport())
+        return cls(transports) if transports else None
+
+    def emit(self, event: str, trial: int = 0, deck: str = ''):
+        """Olay marker'ını zaman damgalayıp kuyruğa ekler"""
+        self.seq += 1
+        marker = Marker(
+            self.seq, MARKER_CODES[event], event, trial, deck,
+            time.perf_counter_ns(), time.time_ns(),
+            pylsl.local_clock() if pylsl is not None else 0.0
+        )
+        self.markers.append(marker)
+        self.queue.put((marker, self.send_log))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            marker, send_log = item
+            for transport in self.transports:
+                error = ''
+                try:
+                    transport.send(marker)
+                except Exception as e:
+                    error = str(e)
+                send_log.append((marker.seq, transport.name, time.perf_counter_ns(), error))
+
+    def close(self, timeout: float = 1.0):
+        """Kuyruğu boşaltıp thread'i ve taşıyıcıları kapatır"""
+        self.queue.put(None)
+        self.thread.join(timeout)
+        for transport in self.transports:
+            transport.close()
+
+    def reset(self):
+        """Yeni oturum için kayıtları temizler (thread ve taşıyıcılar açık kalır)"""
+        self.flush()
+        self.markers = []
+        self.send_log = []
+
+    def flush(self, timeout: float = 0.5):
+        """Kuyruktaki marker'ların gönderilmesini bekler"""
+        expected = len(self.markers) * len(self.transports)
+        deadline = time.perf_counter() + timeout
+        while len(self.send_log) < expected and time.perf_counter() < deadline:
+            time.sleep(0.001)
+
+    def save_log(self, path: str):
+        """Marker ve gönderim zamanlarını CSV olarak yazar"""
+        self.flush()
+        events = {m.seq: m for m in self.markers}
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Seq', 'Code', 'Event', 'Trial', 'Deck', 'Wall_Time_ns',
+                             'Transport', 'Send_Latency_us', 'Error'])
+            for seq, transport, sent_ns, error in list(self.send_log):
+                m = events.get(seq)
+                if m is None:
+                    continue
+                writer.writerow([m.seq, m.code, m.event, m.trial, m.deck, m.wall_ns,
+                                 transport, f"{(sent_ns - m.event_ns) / 1000:.1f}", error])
+
+
+def loopback_selftest(n_markers: int = 200):
+    """Yerel UDP dinleyici (ve pyserial varsa pseudo-terminal) ile gecikme ölçer"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.settimeout(1.0)
+    transports = [UdpTransport(*listener.getsockname())]
+
+    master_fd = None
+    if serial is not None and hasattr(os, 'openpty'):
+        master_fd, slave_fd = os.openpty()
+        transports.append(SerialTransport(os.ttyname(slave_fd)))
+
+    sender = MarkerSender(transports)
+    latencies = []
+    for i in range(n_markers):
+        sender.emit('choice_A', trial=i + 1, deck='A')
+        data = listener.recv(256)
+        latencies.append((time.perf_counter_ns() - sender.markers[-1].event_ns) / 1000)
+        assert data.startswith(b'IGT,21,choice_A,')
+    if master_fd is not None:
+        time.sleep(0.05)
+        received = os.read(master_fd, n_markers)
+        print(f"   Serial (pty): {len(received)}/{n_markers} bayt alındı")
+    sender.close()
+    listener.close()
+
+    latencies.sort()
+    print(f"   UDP: {n_markers} marker, medyan {latencies[len(latencies) // 2]:.0f} µs, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.0f} µs")
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📡 IGT Event Marker Self-Test")
+    print("=" * 60)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    loopback_selftest(n)
+    print("✅ Test tamamlandı")
+
+
+if __name__ == "__main__":
+    main()
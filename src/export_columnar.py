@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Columnar Export
+Oturum ve deneme verilerini Parquet/Feather formatında sütunsal olarak dışa aktarır
+
+Çıktı yapısı (hive partitioning):
+    <out_dir>/sessions/date=2025-12-28/part-<run>-0.parquet
+    <out_dir>/trials/date=2025-12-28/part-<run>-0.parquet
+    <out_dir>/_exported_sessions.json   (artımlı aktarım manifestosu)
+
+Tüm çalışma tek bir okuma ile yüklenebilir:
+    pd.read_parquet('<out_dir>/trials')
+    arrow::open_dataset('<out_dir>/trials')   # R
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import json
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow opsiyonel bağımlılık
+    pa = None
+    ds = None
+
+# Deste kodlaması: A=0, B=1, C=2, D=3
+DECK_CODES = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+
+FORMATS = {'parquet': 'parquet', 'feather': 'feather'}
+PARTITIONS = ('date', 'site', 'none')
+MANIFEST_NAME = '_exported_sessions.json'
+
+
+def to_epoch_ns(values) -> pd.arrays.IntegerArray:
+    """ISO zaman damgalarını nullable int64 nanosaniyeye çevirir (NaT → null)"""
+    ts = pd.to_datetime(pd.Series(values), errors='coerce').astype('datetime64[ns]')
+    return pd.arrays.IntegerArray(ts.to_numpy().view('int64'), ts.isna().to_numpy())
+
+
+def load_manifest(out_dir: str) -> set:
+    """Daha önce aktarılmış session_id kümesini okur"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(json.load(f).get('session_ids', []))
+
+
+def save_manifest(out_dir: str, session_ids: set):
+    """Aktarılmış session_id kümesini yazar (atomik)"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'session_ids': sorted(session_ids),
+                   'updated_at': datetime.now().isoformat(timespec='seconds')}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_tables(db_path: str, skip_ids: set):
+    """Henüz aktarılmamış oturumları ve denemelerini veritabanından okur"""
+    conn = sqlite3.connect(db_path)
+    try:
+        sessions = pd.read_sql_query("""
+            SELECT session_id, subject_id, age, gender, start_time, end_time,
+                   trials_completed, final_balance, net_change, csv_path
+            FROM sessions
+            ORDER BY start_time
+        """, conn)
+        sessions = sessions[~sessions['session_id'].isin(skip_ids)].reset_index(drop=True)
+        if sessions.empty:
+            return sessions, pd.DataFrame()
+
+        conn.execute("CREATE TEMP TABLE export_ids (session_id TEXT PRIMARY KEY)")
+        conn.executemany("INSERT INTO export_ids VALUES (?)",
+                         ((sid,) for sid in sessions['session_id']))
+        native = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trial_data'"
+        ).fetchone()
+        if native:
+            # v2 şeması: deste kodu ve ns zaman damgası doğrudan okunur
+            trials = pd.read_sql_query("""
+                SELECT s.session_id, t.trial_number, t.deck, t.reaction_time,
+                       t.reward, t.penalty, t.net_outcome, t.total_balance,
+                       s.t0_ns + t.t_ns AS trial_time_ns
+                FROM trial_data t
+                JOIN sessions s ON s.sid = t.sid
+                JOIN export_ids e ON e.session_id = s.session_id
+                ORDER BY s.session_id, t.trial_number
+            """, conn)
+        else:
+            trials = pd.read_sql_query("""
+                SELECT t.session_id, t.trial_number, t.deck_selected, t.reaction_time,
+                       t.reward, t.penalty, t.net_outcome, t.total_balance, t.trial_timestamp
+                FROM trials t
+                JOIN export_ids e ON e.session_id = t.session_id
+                ORDER BY t.session_id, t.trial_number
+            """, conn)
+            trials['deck'] = trials.pop('deck_selected').map(DECK_CODES).fillna(-1)
+            trials['trial_time_ns'] = to_epoch_ns(trials.pop('trial_timestamp'))
+    finally:
+        conn.close()
+    return sessions, trials
+
+
+def load_scr_columns(sessions: pd.DataFrame) -> pd.DataFrame:
+    """merge_shimmer_igt.py çıktısı (_Shimmer.csv) varsa SCR/PPG/ECG sütunlarını okur"""
+    frames = []
+    for session_id, csv_path in zip(sessions['session_id'], sessions['csv_path']):
+        if not isinstance(csv_path, str):
+            continue
+        shimmer_path = csv_path.replace('.csv', '_Shimmer.csv')
+        if not os.path.exists(shimmer_path):
+            continue
+        header = pd.read_csv(shimmer_path, nrows=0).columns
+        # Çok sensörlü çıktılarda sütunlar cihaz adıyla ön eklidir (örn. EDA_SCR_...)
+        cols = ['Trial_Number'] + [c for c in header
+                                   if any(key in c for key in ('SCR_', 'PPG_', 'ECG_'))]
+        scr = pd.read_csv(shimmer_path, usecols=cols)
+        scr.insert(0, 'session_id', session_id)
+        frames.append(scr)
+    if not frames:
+        return pd.DataFrame()
+    scr_df = pd.concat(frames, ignore_index=True)
+    scr_df = scr_df.rename(columns={'Trial_Number': 'trial_number'})
+    float_cols = [c for c in scr_df.columns if c not in ('session_id', 'trial_number')]
+    scr_df[float_cols] = scr_df[float_cols].astype('float32')
+    return scr_df
+
+
+def build_frames(sessions: pd.DataFrame, trials: pd.DataFrame, site: str = None):
+    """Sütunsal şemaya dönüştürür: kategorik sözlükler, int deste kodları, int64 zamanlar
+
+    Şemada NULL olabilen tamsayı alanları pandas nullable tiplerine (Int16/Int32/Int64)
+    çevrilir; NULL değerler Parquet/Feather'da null olarak yazılır.
+    """
+    date_str = pd.to_datetime(sessions['start_time'], errors='coerce').dt.strftime('%Y-%m-%d')
+    site_label = site or 'default'
+
+    sessions_out = pd.DataFrame({
+        'session_id': sessions['session_id'].astype('category'),
+        'subject_id': sessions['subject_id'].astype('category'),
+        'age': sessions['age'].astype('Int16'),
+        'gender': sessions['gender'].astype('category'),
+        'start_time_ns': to_epoch_ns(sessions['start_time']),
+        'end_time_ns': to_epoch_ns(sessions['end_time']),
+        'trials_completed': sessions['trials_completed'].astype('Int16'),
+        'final_balance': sessions['final_balance'].astype('Int64'),
+        'net_change': sessions['net_change'].astype('Int64'),
+        'site': site_label,
+        'date': date_str.fillna('unknown').to_numpy(),
+    })
+
+    if trials.empty:
+        return sessions_out, pd.DataFrame()
+
+    # Oturum düzeyindeki alanlar bir kez saklanır, denemelere yalnızca anahtar gider
+    session_dates = dict(zip(sessions['session_id'], sessions_out['date']))
+    trials_out = pd.DataFrame({
+        'session_id': pd.Categorical(trials['session_id'],
+                                     categories=sessions_out['session_id'].cat.categories),
+        'trial_number': trials['trial_number'].astype('int16'),
+        'deck': trials['deck'].astype('int8').to_numpy(),
+        'reaction_time': trials['reaction_time'].astype('float32'),
+        'reward': trials['reward'].astype('Int32'),
+        'penalty': trials['penalty'].astype('Int32'),
+        'net_outcome': trials['net_outcome'].astype('Int32'),
+        'total_balance': trials['total_balance'].astype('Int64'),
+        'trial_time_ns': trials['trial_time_ns'].astype('Int64'),
+        'site': site_label,
+        'date': trials['session_id'].map(session_dates).to_numpy(),
+    })
+
+    scr_df = load_scr_columns(sessions)
+    if not scr_df.empty:
+        trials_out = trials_out.merge(scr_df, on=['session_id', 'trial_number'], how='left')
+        trials_out['session_id'] = pd.Categorical(
+            trials_out['session_id'], categories=sessions_out['session_id'].cat.categories)
+    return sessions_out, trials_out
+
+
+def write_dataset(df: pd.DataFrame, root: str, fmt: str, partition: str, run_tag: str):
+    """DataFrame'i hive-partitioned dataset olarak ekler (mevcut dosyalar korunur)"""
+    df = df.copy()
+    # Partition sütunu düz string olmalı, diğer etiketler sözlük kodlu kalır
+    for col in ('date', 'site'):
+        df[col] = df[col].astype(str) if col == partition else df[col].astype('category')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partitioning = None
+    if partition != 'none':
+        partitioning = ds.partitioning(pa.schema([(partition, pa.string())]), flavor='hive')
+    ds.write_dataset(
+        table, root,
+        format=FORMATS[fmt],
+        partitioning=partitioning,
+        basename_template=f"part-{run_tag}-{{i}}.{fmt}",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def export_database(db_path: str, out_dir: str, fmt: str = 'parquet',
+                    partition: str = 'date', site: str = None) -> int:
+    """
+    Veritabanını sütunsal formata aktarır (yalnızca yeni oturumlar)
+
+    Args:
+        db_path: igt_sessions.db yolu
+        out_dir: Çıktı kök dizini
+        fmt: 'parquet' veya 'feather'
+        partition: 'date', 'site' veya 'none'
+        site: İstasyon/laboratuvar etiketi (site partition için)
+
+    Returns:
+        Aktarılan oturum sayısı
+    """
+    if pa is None:
+        raise ImportError("pyarrow gerekli: pip install pyarrow")
+    if fmt not in FORMATS:
+        raise ValueError(f"Bilinmeyen format: {fmt}")
+    if partition not in PARTITIONS:
+        raise ValueError(f"Bilinmeyen partition: {partition}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    exported = load_manifest(out_dir)
+    sessions, trials = load_tables(db_path, exported)
+    if sessions.empty:
+        print("✅ Aktarılacak yeni oturum yok")
+        return 0
+
+    sessions_out, trials_out = build_frames(sessions, trials, site)
+    run_tag = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    write_dataset(sessions_out, os.path.join(out_dir, 'sessions'), fmt, partition, run_tag)
+    if not trials_out.empty:
+        write_dataset(trials_out, os.path.join(out_dir, 'trials'), fmt, partition, run_tag)
+
+    exported.update(sessions['session_id'])
+    save_manifest(out_dir, exported)
+    print(f"✅ {len(sessions)} oturum, {len(trials_out)} deneme aktarıldı → {out_dir}")
+    return len(sessions)
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📦 IGT Sütunsal Veri Aktarımı")
+    print("=" * 60)
+
+    if len(sys.argv) < 3:
+        print("\nKullanım:")
+        print("  python3 export_columnar.py <igt_sessions.db> <out_dir> "
+              "[parquet|feather] [date|site|none] [site_label]")
+        print("\nÖrnek:")
+        print("  python3 export_columnar.py Sonuclar/igt_sessions.db export/")
+        print("  python3 export_columnar.py Sonuclar/igt_sessions.db export/ feather site LAB1")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+    out_dir = sys.argv[2]
+    fmt = sys.argv[3] if len(sys.argv) > 3 else 'parquet'
+    partition = sys.argv[4] if len(sys.argv) > 4 else 'date'
+    site = sys.argv[5] if len(sys.argv) > 5 else None
+
+    if not os.path.exists(db_path):
+        print(f"❌ Veritabanı bulunamadı: {db_path}")
+        sys.exit(1)
+    if pa is None:
+        print("❌ pyarrow yüklü değil: pip install pyarrow")
+        sys.exit(1)
+
+    export_database(db_path, out_dir, fmt, partition, site)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Hierarchical Bayesian Model Fitting
+PVL-Delta ve ORL modellerinin hiyerarşik Bayesçi kestirimi (saf NumPy/SciPy)
+
+Model:
+    φ_ik ~ N(μ_k, σ_k²)     (katılımcı parametreleri, sınırsız ölçek; probit ile sınırlı aralığa)
+    μ_k ~ N(0, 1),  σ_k² ~ Inv-Gamma(2, 1)
+
+Örnekleyici (Metropolis-within-Gibbs):
+    - Katılımcı parametreleri: tüm zincirler × katılımcılar için aynı anda önerilen
+      adaptif rastgele yürüyüş; olabilirlik tek bir toplu (zincir × katılımcı)
+      deneme döngüsünde hesaplanır, kabul/ret her satır için ayrı
+    - Grup parametreleri (μ, σ²): eşlenik Gibbs adımları ve μ ile tüm φ'yi birlikte
+      kaydıran öteleme adımı (merkezli parametrelemede μ'nün karışmasını hızlandırır)
+    - Isınma (warmup): adım boyu Robbins-Monro ile, öneri kovaryansı katılımcı
+      başına ısınma örneklerinden uyarlanır
+
+Tanılar: split-R̂ ve etkin örneklem büyüklüğü (ESS, Geyer başlangıç dizisi)
+Uzun çalışmalar için periyodik kontrol noktası (.npz) ve kaldığı yerden devam.
+Sonuçlar model_fits tablosuna oturum başına yazılır.
+
+Sonuçlar katılımcının kendi ölçeğinde: kazanç/kayıplar oturumun ödül setindeki
+(TR/EN) kötü deste ödülü = 1 olacak şekilde ölçeklenir.
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+N_DECKS = 4
+N_CHAINS = 8
+N_WARMUP = 1000
+N_SAMPLES = 1000
+CHECKPOINT_EVERY = 250
+DEFAULT_SEED = 20251220
+TARGET_ACCEPT = 0.3
+PRIOR_MU_SD = 1.0
+PRIOR_SIGMA_SHAPE = 2.0
+PRIOR_SIGMA_SCALE = 1.0
+
+# Parametre adı → (alt sınır, üst sınır); None = sınırsız (dönüşüm yok)
+MODELS = {
+    'pvl_delta': {'A': (0, 1), 'alpha': (0, 2), 'cons': (0, 5), 'lambda': (0, 10)},
+    'orl': {'Arew': (0, 1), 'Apun': (0, 1), 'K': (0, 5), 'betaF': None, 'betaP': None},
+}
+
+FITS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS model_fits (
+        sid INTEGER NOT NULL,
+        model TEXT NOT NULL,
+        parameter TEXT NOT NULL,
+        mean REAL,
+        sd REAL,
+        q025 REAL,
+        q975 REAL,
+        rhat REAL,
+        ess REAL,
+        fitted_at TEXT,
+        PRIMARY KEY (sid, model, parameter),
+        FOREIGN KEY (sid) REFERENCES sessions(sid)
+    ) WITHOUT ROWID
+"""
+
+
+# =============================================================================
+# DATA
+# =============================================================================
+def load_choice_data(db_path: str):
+    """
+    Tüm oturumların seçim ve sonuçlarını (oturum × deneme) dizilerine yükler
+
+    Returns:
+        {'sids', 'session_ids', 'choice' (S×T int), 'outcome' (S×T, ölçekli),
+         'valid' (S×T bool)}
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        trials = pd.read_sql_query("""
+            SELECT t.sid, s.session_id, t.trial_number, t.deck, t.reward, t.net_outcome
+            FROM trial_data t
+            JOIN sessions s ON s.sid = t.sid
+            ORDER BY t.sid, t.trial_number
+        """, conn)
+    finally:
+        conn.close()
+
+    session, sids = pd.factorize(trials['sid'], sort=True)
+    position = trials.groupby('sid').cumcount().to_numpy()
+    n_sessions, n_trials = len(sids), int(position.max()) + 1
+    choice = np.zeros((n_sessions, n_trials), dtype=np.int64)
+    outcome = np.zeros((n_sessions, n_trials))
+    valid = np.zeros((n_sessions, n_trials), dtype=bool)
+    choice[session, position] = trials['deck'].to_numpy()
+    outcome[session, position] = trials['net_outcome'].to_numpy(dtype=np.float64)
+    valid[session, position] = True
+
+    # Oturum ölçeği: ödül setinin (TR/EN) kötü deste ödülü = 1; A/B hiç seçilmemiş
+    # oturumlar da aynı ölçeğe gelir. Bilinmeyen setlerde en büyük ödül kullanılır.
+    from main import LanguageConfig   # main bu modülü içe aktarır (döngüsel içe aktarma)
+    by_sid = trials.groupby('sid')['reward']
+    scale = by_sid.max().to_numpy(dtype=np.float64)
+    for lang_config in (LanguageConfig.TR, LanguageConfig.EN):
+        rewards = {lang_config['reward_bad'], lang_config['reward_good']}
+        in_set = by_sid.agg(lambda r: set(r) <= rewards).to_numpy()
+        scale[in_set] = lang_config['reward_bad']
+    outcome /= np.where(scale > 0, scale, 1.0)[:, None]
+    session_ids = trials.groupby('sid')['session_id'].first().to_numpy()
+    return {'sids': np.asarray(sids), 'session_ids': session_ids,
+            'choice': choice, 'outcome': outcome, 'valid': valid}
+
+
+# =============================================================================
+# MODELS
+# =============================================================================
+def constrain(model: str, phi: np.ndarray) -> dict:
+    """Sınırsız φ (..., d) → model parametreleri sözlüğü"""
+    params = {}
+    for k, (name, bounds) in enumerate(MODELS[model].items()):
+        if bounds is None:
+            params[name] = phi[..., k]
+        else:
+            low, high = bounds
+            params[name] = low + (high - low) * ndtr(phi[..., k])
+    return params
+
+
+def trial_arrays(data: dict):
+    """
+    Deneme döngüsü için deste-önde diziler
+
+    Returns:
+        (onehot: T × 4 × 1 × S, geçersiz denemelerde sıfır; valid: T × 1 × S)
+    """
+    choice, valid = data['choice'], data['valid']
+    onehot = (choice.T[:, None, :] == np.arange(N_DECKS)[None, :, None]) & valid.T[:, None, :]
+    return onehot[:, :, None, :].astype(np.float64), valid.T[:, None, :].astype(np.float64)
+
+
+def log_choice_prob(logits: np.ndarray, onehot: np.ndarray) -> np.ndarray:
+    """Seçilen destenin log softmax olasılığı (ilk eksen desteler)"""
+    top = logits.max(axis=0)
+    log_norm = np.log(np.exp(logits - top).sum(axis=0)) + top
+    return (logits * onehot).sum(axis=0) - log_norm
+
+
+def loglik_pvl_delta(phi: np.ndarray, data: dict) -> np.ndarray:
+    """
+    PVL-Delta toplu log-olabilirlik
+
+    Desteler ilk eksende tutulur (4 × zincir × katılımcı); deneme döngüsü
+    dışında kalabilen her şey (fayda değerleri, öğrenme oranları) tüm
+    denemeler için önceden hesaplanır.
+
+    Args:
+        phi: (zincir × katılımcı × 4) sınırsız parametreler
+
+    Returns:
+        (zincir × katılımcı) log-olabilirlik
+    """
+    p = constrain('pvl_delta', phi)
+    onehot, valid = trial_arrays(data)
+    x = data['outcome'].T[:, None, :]                                   # (T × 1 × S)
+    magnitude = np.abs(x) ** p['alpha']
+    utility = np.where(x >= 0, magnitude, -p['lambda'] * magnitude)     # (T × zincir × S)
+    theta = 3.0 ** p['cons'] - 1.0
+    ev = np.zeros((N_DECKS,) + phi.shape[:-1])
+    ll = np.zeros((len(onehot),) + phi.shape[:-1])
+    for t in range(len(onehot)):
+        ll[t] = log_choice_prob(theta * ev, onehot[t])
+        chosen = (ev * onehot[t]).sum(axis=0)
+        ev += onehot[t] * (p['A'] * (utility[t] - chosen))
+    return (ll * valid).sum(axis=0)
+
+
+def loglik_orl(phi: np.ndarray, data: dict) -> np.ndarray:
+    """ORL (Outcome-Representation Learning) toplu log-olabilirlik"""
+    p = constrain('orl', phi)
+    onehot, valid = trial_arrays(data)
+    x = data['outcome'].T[:, None, :]                                   # (T × 1 × S)
+    gain = x >= 0
+    sign = np.sign(x)[:, None]                                          # (T × 1 × 1 × S)
+    # Seçilen deste kazanç/kayıp hızıyla, seçilmeyenler karşı hızla güncellenir
+    rate = np.where(gain, p['Arew'], p['Apun'])                         # (T × zincir × S)
+    other_rate = np.where(gain, p['Apun'], p['Arew'])
+    ef_rate = np.where(onehot > 0, rate[:, None], other_rate[:, None]) * valid[:, None]
+    ef_target = np.where(onehot > 0, sign, -sign / (N_DECKS - 1))       # (T × 4 × 1 × S)
+    decay = 1.0 / (1.0 + valid * (3.0 ** p['K'] - 1.0))                 # (T × zincir × S)
+
+    shape = (N_DECKS,) + phi.shape[:-1]
+    ev, ef, pers = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    ll = np.zeros((len(onehot),) + phi.shape[:-1])
+    for t in range(len(onehot)):
+        ll[t] = log_choice_prob(ev + p['betaF'] * ef + p['betaP'] * pers, onehot[t])
+        ev += onehot[t] * rate[t] * (x[t] - ev)
+        ef += ef_rate[t] * (ef_target[t] - ef)
+        pers = np.maximum(pers, onehot[t]) * decay[t]
+    return (ll * valid).sum(axis=0)
+
+
+LOGLIK = {'pvl_delta': loglik_pvl_delta, 'orl': loglik_orl}
+
+
+# =============================================================================
+# SAMPLER
+# =============================================================================
+def log_prior(phi: np.ndarray, mu: np.ndarray, sigma2: np.ndarray) -> np.ndarray:
+    """φ | μ, σ² normal log-yoğunluğu, (zincir × katılımcı)"""
+    z2 = (phi - mu[:, None, :]) ** 2 / sigma2[:, None, :]
+    return -0.5 * (z2 + np.log(sigma2[:, None, :])).sum(axis=-1)
+
+
+def gibbs_group(phi: np.ndarray, sigma2: np.ndarray, rng: np.random.Generator):
+    """Eşlenik koşullu dağılımlardan μ ve σ² çekimi, (zincir × d)"""
+    n = phi.shape[1]
+    precision = n / sigma2 + 1.0 / PRIOR_MU_SD ** 2
+    mean = (phi.sum(axis=1) / sigma2) / precision
+    mu = mean + rng.standard_normal(mean.shape) / np.sqrt(precision)
+    shape = PRIOR_SIGMA_SHAPE + n / 2
+    rate = PRIOR_SIGMA_SCALE + 0.5 * ((phi - mu[:, None, :]) ** 2).sum(axis=1)
+    sigma2 = rate / rng.gamma(shape, size=rate.shape)
+    return mu, sigma2
+
+
+def initial_state(model: str, n_chains: int, n_subjects: int, rng: np.random.Generator) -> dict:
+    """Başlangıç durumu (zincirler dağınık başlatılır)"""
+    d = len(MODELS[model])
+    return {
+        'iteration': 0,
+        'phi': rng.normal(0.0, 0.5, (n_chains, n_subjects, d)),
+        'mu': rng.normal(0.0, 0.5, (n_chains, d)),
+        'sigma2': np.ones((n_chains, d)),
+        'log_scale': np.full((n_chains, n_subjects), np.log(0.5)),
+        'log_shift': np.full(n_chains, np.log(0.05)),
+        'shift_chol': np.eye(d),
+        'mu_sum': np.zeros(d),
+        'mu_outer': np.zeros((d, d)),
+        'chol': np.broadcast_to(np.eye(d), (n_subjects, d, d)).copy(),
+        'cov_sum': np.zeros((n_subjects, d)),
+        'cov_outer': np.zeros((n_subjects, d, d)),
+        'cov_count': 0,
+        'accepted': np.zeros((n_chains, n_subjects)),
+        'draws_phi': [],
+        'draws_mu': [],
+        'draws_sigma': [],
+    }
+
+
+def save_checkpoint(path: str, state: dict, config: dict, rng: np.random.Generator):
+    """Durumu atomik olarak .npz kontrol noktasına yazar"""
+    arrays = {key: value for key, value in state.items()
+              if isinstance(value, np.ndarray)}
+    arrays['draws_phi'] = np.asarray(state['draws_phi'], dtype=np.float32)
+    for key in ('draws_mu', 'draws_sigma'):
+        arrays[key] = np.asarray(state[key], dtype=np.float64)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays, iteration=state['iteration'], cov_count=state['cov_count'],
+             config=json.dumps(config), rng_state=json.dumps(rng.bit_generator.state))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, config: dict):
+    """Kontrol noktasını yükler; yapılandırma farklıysa hata verir"""
+    with np.load(path, allow_pickle=False) as f:
+        saved = json.loads(str(f['config']))
+        if saved != config:
+            raise ValueError("Kontrol noktası farklı bir yapılandırmaya ait")
+        state = {key: f[key] for key in f.files if key not in ('config', 'rng_state')}
+        rng = np.random.default_rng()
+        rng.bit_generator.state = json.loads(str(f['rng_state']))
+    state['iteration'] = int(state['iteration'])
+    state['cov_count'] = int(state['cov_count'])
+    for key in ('draws_phi', 'draws_mu', 'draws_sigma'):
+        state[key] = list(state[key])
+    return state, rng
+
+
+def run_sampler(model: str, data: dict, n_chains: int = N_CHAINS, n_warmup: int = N_WARMUP,
+                n_samples: int = N_SAMPLES, seed: int = DEFAULT_SEED,
+                checkpoint: str = None, checkpoint_every: int = CHECKPOINT_EVERY,
+                resume: bool = False, progress: bool = True) -> dict:
+    """
+    Hiyerarşik modeli örnekler
+
+    Returns:
+        {'phi': (zincir × çekim × katılımcı × d), 'mu', 'sigma': (zincir × çekim × d),
+         'accept_rate', 'seconds'}
+    """
+    loglik = LOGLIK[model]
+    n_subjects, d = data['choice'].shape[0], len(MODELS[model])
+    config = {'model': model, 'chains': n_chains, 'warmup': n_warmup, 'samples': n_samples,
+              'seed': seed, 'sids': [int(s) for s in data['sids']]}
+    if resume and checkpoint and os.path.exists(checkpoint):
+        state, rng = load_checkpoint(checkpoint, config)
+        print(f"↩️ Kontrol noktasından devam: iterasyon {state['iteration']}")
+    else:
+        rng = np.random.default_rng(seed)
+        state = initial_state(model, n_chains, n_subjects, rng)
+
+    phi, mu, sigma2 = state['phi'], state['mu'], state['sigma2']
+    ll = loglik(phi, data)
+    lp = ll + log_prior(phi, mu, sigma2)
+    # Öneri kovaryansı iki pencerede uyarlanır: [W/4, W/2) ve [W/2, 3W/4)
+    adapt_windows = {n_warmup // 2: n_warmup // 4, 3 * n_warmup // 4: n_warmup // 2}
+
+    t_start = time.perf_counter()
+    total = n_warmup + n_samples
+    for it in range(state['iteration'], total):
+        # Katılımcı parametreleri: toplu adaptif rastgele yürüyüş
+        noise = np.einsum('sij,csj->csi', state['chol'], rng.standard_normal(phi.shape))
+        proposal = phi + np.exp(state['log_scale'])[..., None] * noise
+        ll_new = loglik(proposal, data)
+        lp_new = ll_new + log_prior(proposal, mu, sigma2)
+        accept = np.log(rng.random(lp.shape)) < (lp_new - lp)
+        phi = np.where(accept[..., None], proposal, phi)
+        ll = np.where(accept, ll_new, ll)
+
+        # Grup parametreleri: Gibbs
+        mu, sigma2 = gibbs_group(phi, sigma2, rng)
+
+        # Öteleme adımı: μ ve tüm φ birlikte kaydırılır (φ - μ sabit kalır),
+        # merkezli parametrelemede μ'nün yavaş karışmasını giderir
+        shift = np.exp(state['log_shift'])[:, None] * (rng.standard_normal(mu.shape)
+                                                       @ state['shift_chol'].T)
+        ll_shift = loglik(phi + shift[:, None, :], data)
+        mu_shift = mu + shift
+        log_ratio = (ll_shift.sum(axis=1) - ll.sum(axis=1)
+                     - 0.5 * ((mu_shift ** 2 - mu ** 2) / PRIOR_MU_SD ** 2).sum(axis=1))
+        shifted = np.log(rng.random(log_ratio.shape)) < log_ratio
+        phi = np.where(shifted[:, None, None], phi + shift[:, None, :], phi)
+        mu = np.where(shifted[:, None], mu_shift, mu)
+        ll = np.where(shifted[:, None], ll_shift, ll)
+        lp = ll + log_prior(phi, mu, sigma2)
+
+        if it < n_warmup:
+            # Robbins-Monro adım boyu uyarlaması
+            state['log_scale'] += (accept - TARGET_ACCEPT) / (1.0 + it) ** 0.6
+            state['log_shift'] += (shifted - TARGET_ACCEPT) / (1.0 + it) ** 0.6
+            if it in adapt_windows and state['cov_count'] > d:
+                # Katılımcı başına öneri kovaryansı (zincirler birleştirilerek)
+                m = state['cov_sum'] / state['cov_count']
+                cov = state['cov_outer'] / state['cov_count'] - np.einsum('si,sj->sij', m, m)
+                state['chol'] = np.linalg.cholesky(cov + 1e-6 * np.eye(d))
+                state['log_scale'][:] = np.log(2.38 / np.sqrt(d))
+                # Öteleme adımı için grup ortalamalarının kovaryansı
+                m = state['mu_sum'] / state['cov_count']
+                cov = state['mu_outer'] / state['cov_count'] - np.outer(m, m)
+                state['shift_chol'] = np.linalg.cholesky(cov + 1e-8 * np.eye(d))
+                state['log_shift'][:] = np.log(2.38 / np.sqrt(d))
+                for key in ('cov_sum', 'cov_outer', 'mu_sum', 'mu_outer'):
+                    state[key][:] = 0.0
+                state['cov_count'] = 0
+            if n_warmup // 4 <= it < 3 * n_warmup // 4:
+                state['cov_sum'] += phi.sum(axis=0)
+                state['cov_outer'] += np.einsum('csi,csj->sij', phi, phi)
+                state['mu_sum'] += mu.sum(axis=0)
+                state['mu_outer'] += mu.T @ mu
+                state['cov_count'] += n_chains
+        else:
+            state['accepted'] += accept
+            state['draws_phi'].append(phi.astype(np.float32))
+            state['draws_mu'].append(mu.copy())
+            state['draws_sigma'].append(np.sqrt(sigma2))
+
+        state.update(iteration=it + 1, phi=phi, mu=mu, sigma2=sigma2)
+        if checkpoint and (it + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint, state, config, rng)
+        if progress and (it + 1) % max(1, total // 10) == 0:
+            phase = 'ısınma' if it < n_warmup else 'örnekleme'
+            print(f"   {it + 1}/{total} ({phase}) - {time.perf_counter() - t_start:.1f} sn")
+
+    if checkpoint:
+        save_checkpoint(checkpoint, state, config, rng)
+    return {
+        'phi': np.stack(state['draws_phi'], axis=1),
+        'mu': np.stack(state['draws_mu'], axis=1),
+        'sigma': np.stack(state['draws_sigma'], axis=1),
+        'accept_rate': state['accepted'] / max(1, n_samples),
+        'seconds': time.perf_counter() - t_start,
+    }
+
+
+# =============================================================================
+# DIAGNOSTICS
+# =============================================================================
+def split_chains(draws: np.ndarray) -> np.ndarray:
+    """(zincir × çekim × ...) → (2·zincir × çekim/2 × ...)"""
+    half = draws.shape[1] // 2
+    return np.concatenate([draws[:, :half], draws[:, half:2 * half]], axis=0)
+
+
+def split_rhat(draws: np.ndarray) -> np.ndarray:
+    """Split-R̂ (son eksenler parametreler)"""
+    chains = split_chains(draws)
+    n = chains.shape[1]
+    chain_means = chains.mean(axis=1)
+    within = chains.var(axis=1, ddof=1).mean(axis=0)
+    between = n * chain_means.var(axis=0, ddof=1)
+    var_plus = (n - 1) / n * within + between / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.sqrt(var_plus / within)
+
+
+def effective_sample_size(draws: np.ndarray) -> np.ndarray:
+    """
+    Çok zincirli ESS (Geyer başlangıç monoton dizisi), tüm parametreler için vektörel
+    """
+    chains = split_chains(draws)
+    m, n = chains.shape[:2]
+    centered = chains - chains.mean(axis=1, keepdims=True)
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    spectrum = np.fft.rfft(centered, n=size, axis=1)
+    acov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :n] / n
+    within = chains.var(axis=1, ddof=1).mean(axis=0)
+    var_plus = (n - 1) / n * within + chains.mean(axis=1).var(axis=0, ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rho = 1.0 - (within - acov.mean(axis=0)) / var_plus       # (n × ...)
+        n_pairs = n // 2
+        pairs = rho[:2 * n_pairs:2] + rho[1:2 * n_pairs:2]
+        positive = np.cumprod(pairs > 0, axis=0).astype(bool)     # ilk negatif çifte kadar
+        monotone = np.minimum.accumulate(np.where(positive, pairs, np.inf), axis=0)
+        tau = -1.0 + 2.0 * np.where(positive, monotone, 0.0).sum(axis=0)
+        return m * n / np.maximum(tau, 1.0 / np.log10(m * n))
+
+
+def summarize(model: str, fit: dict, data: dict) -> pd.DataFrame:
+    """Oturum başına parametre özetleri (sınırlı ölçekte)"""
+    draws = constrain(model, fit['phi'].astype(np.float64))
+    rows = []
+    for name, values in draws.items():
+        rhat = split_rhat(values)
+        ess = effective_sample_size(values)
+        flat = values.reshape(-1, values.shape[-1])
+        q025, q975 = np.percentile(flat, [2.5, 97.5], axis=0)
+        rows.append(pd.DataFrame({
+            'sid': data['sids'], 'session_id': data['session_ids'], 'parameter': name,
+            'mean': flat.mean(axis=0), 'sd': flat.std(axis=0, ddof=1),
+            'q025': q025, 'q975': q975, 'rhat': rhat, 'ess': ess,
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def summarize_group(model: str, fit: dict) -> pd.DataFrame:
+    """Grup düzeyi μ (sınırlı ölçekte) ve σ (probit ölçeğinde) özetleri"""
+    rows = []
+    mu_constrained = constrain(model, fit['mu'])
+    for k, name in enumerate(MODELS[model]):
+        for label, values in ((f'mu_{name}', mu_constrained[name]),
+                              (f'sigma_{name}', fit['sigma'][..., k])):
+            rows.append({'parameter': label, 'mean': values.mean(), 'sd': values.std(ddof=1),
+                         'q025': np.percentile(values, 2.5), 'q975': np.percentile(values, 97.5),
+                         'rhat': float(split_rhat(values[..., None])[0]),
+                         'ess': float(effective_sample_size(values[..., None])[0])})
+    return pd.DataFrame(rows)
+
+
+def store_fits(db_path: str, model: str, summary: pd.DataFrame):
+    """Oturum başına özetleri model_fits tablosuna yazar"""
+    fitted_at = datetime.now().isoformat(timespec='seconds')
+    rows = [(int(r.sid), model, r.parameter, float(r.mean), float(r.sd), float(r.q025),
+             float(r.q975), float(r.rhat), float(r.ess), fitted_at)
+            for r in summary.itertuples()]
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(FITS_SCHEMA)
+            conn.executemany("""
+                INSERT OR REPLACE INTO model_fits (
+                    sid, model, parameter, mean, sd, q025, q975, rhat, ess, fitted_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    finally:
+        conn.close()
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("🎲 IGT Hiyerarşik Bayesçi Model Kestirimi")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in options or not args:
+        print("\nKullanım:")
+        print("  python3 igt_bayes.py <veritabani.db> [--model=pvl_delta|orl] [--chains=8] "
+              "[--warmup=1000] [--samples=1000] [--seed=N] [--checkpoint=<dosya.npz>] "
+              "[--resume] [--csv=<cikti.csv>]")
+        print("\nÖrnek:")
+        print("  python3 igt_bayes.py Sonuclar/igt_sessions.db --model=orl --checkpoint=orl.npz")
+        sys.exit(0 if 'help' in options else 1)
+
+    db_path = args[0]
+    model = options.get('model') or 'pvl_delta'
+    if not os.path.exists(db_path):
+        print(f"❌ Veritabanı bulunamadı: {db_path}")
+        sys.exit(1)
+    if model not in MODELS:
+        print(f"❌ Bilinmeyen model: {model} (seçenekler: {', '.join(MODELS)})")
+        sys.exit(1)
+
+    data = load_choice_data(db_path)
+    n_chains = int(options.get('chains') or N_CHAINS)
+    print(f"\n📋 Model: {model} | {len(data['sids'])} oturum × {data['choice'].shape[1]} deneme | "
+          f"{n_chains} zincir")
+    fit = run_sampler(model, data, n_chains,
+                      n_warmup=int(options.get('warmup') or N_WARMUP),
+                      n_samples=int(options.get('samples') or N_SAMPLES),
+                      seed=int(options.get('seed') or DEFAULT_SEED),
+                      checkpoint=options.get('checkpoint'), resume='resume' in options)
+
+    summary = summarize(model, fit, data)
+    group = summarize_group(model, fit)
+    store_fits(db_path, model, summary)
+
+    print(f"\n✅ Örnekleme tamamlandı: {fit['seconds']:.1f} sn, "
+          f"ortalama kabul oranı {fit['accept_rate'].mean():.2f}")
+    print("\n📈 Grup parametreleri:")
+    for row in group.itertuples():
+        print(f"   {row.parameter:<14} {row.mean:8.3f} [{row.q025:8.3f}, {row.q975:8.3f}]  "
+              f"R̂={row.rhat:.3f} ESS={row.ess:.0f}")
+    worst = summary['rhat'].max()
+    print(f"\n🔍 Katılımcı parametreleri: maks R̂ {worst:.3f}, min ESS {summary['ess'].min():.0f}")
+    if worst > 1.05:
+        print("   ⚠️ R̂ > 1.05: zincirler yakınsamamış olabilir, örnek sayısını artırın")
+    print(f"💾 Sonuçlar model_fits tablosuna yazıldı ({len(summary)} satır)")
+    if options.get('csv'):
+        summary.to_csv(options['csv'], index=False)
+        print(f"💾 Çıktı dosyası: {options['csv']}")
+
+
+if __name__ == "__main__":
+    main()
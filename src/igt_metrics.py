@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Behavioural Sequence Metrics
+Deneme dizilerinden davranışsal metrikler (tek oturum veya tüm veritabanı)
+
+Metrikler:
+    win_stay / lose_shift      - Kazanç sonrası aynı desteyi seçme / kayıp sonrası değiştirme olasılığı
+    switch_rate                - Ardışık denemelerde deste değiştirme oranı
+    post_loss_rt_slowing_s     - Kayıp sonrası ortalama RT - kazanç sonrası ortalama RT (sn)
+    b_preference               - B destesi seçim oranı
+    b_preference_index         - B oranı - diğer destelerin ortalama oranı
+    deck_entropy_bits          - Deste seçim dağılımının Shannon entropisi (bit)
+    entropy_block<k>_bits      - 20 denemelik bloklar için entropi
+
+Tüm oturumlar tek geçişte hesaplanır: denemeler (oturum, deneme) sırasına göre
+dizilir, önceki deneme bir kaydırma ile okunur ve oturum başına toplamlar
+np.bincount ile alınır (Python'da deneme döngüsü yoktur).
+
+Kayıp: net sonucu negatif olan deneme; kazanç: net sonucu sıfır veya pozitif.
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import time
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+BLOCK_SIZE = 20
+N_DECKS = 4
+DECK_CODES = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+
+# session_metrics tablosu (uzun biçim: oturum × metrik)
+METRICS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS session_metrics (
+        sid INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (sid, metric),
+        FOREIGN KEY (sid) REFERENCES sessions(sid)
+    ) WITHOUT ROWID
+"""
+
+
+def sequence_metrics(session: np.ndarray, deck: np.ndarray, net_outcome: np.ndarray,
+                     reaction_time: np.ndarray, trial_number: np.ndarray,
+                     n_blocks: int = None) -> pd.DataFrame:
+    """
+    Tüm oturumların metriklerini vektörel hesaplar
+
+    Args:
+        session: Oturum indeksleri 0..S-1, (oturum, deneme) sırasına göre dizili
+        deck: Deste kodları 0-3 (A-D)
+        net_outcome: Net sonuç (TL)
+        reaction_time: Karar süresi (sn, NaN olabilir)
+        trial_number: Deneme numarası (1'den başlar)
+        n_blocks: Blok sayısı; None ise en büyük deneme numarasından
+
+    Returns:
+        Oturum indeksine göre satırlı metrik DataFrame'i
+    """
+    session = np.asarray(session, dtype=np.int64)
+    deck = np.asarray(deck, dtype=np.int64)
+    net_outcome = np.asarray(net_outcome, dtype=np.float64)
+    reaction_time = np.asarray(reaction_time, dtype=np.float64)
+    trial_number = np.asarray(trial_number, dtype=np.int64)
+    n_sessions = int(session.max()) + 1 if len(session) else 0
+    if n_blocks is None:
+        n_blocks = max(1, int(np.ceil(trial_number.max() / BLOCK_SIZE))) if len(session) else 1
+
+    def per_session(index, weights=None):
+        return np.bincount(index, weights=weights, minlength=n_sessions).astype(np.float64)
+
+    # Ardışık deneme çiftleri (aynı oturum içinde): önceki sonuç → sonraki seçim
+    same = session[1:] == session[:-1]
+    pair_session = session[1:][same]
+    prev_loss = (net_outcome[:-1] < 0)[same]
+    stay = (deck[1:] == deck[:-1])[same]
+    next_rt = reaction_time[1:][same]
+    rt_valid = np.isfinite(next_rt)
+    next_rt = np.where(rt_valid, next_rt, 0.0)
+
+    pairs = per_session(pair_session)
+    wins = per_session(pair_session, ~prev_loss)
+    losses = per_session(pair_session, prev_loss)
+    rt_after_loss = (per_session(pair_session, next_rt * (prev_loss & rt_valid))
+                     / per_session(pair_session, prev_loss & rt_valid))
+    rt_after_win = (per_session(pair_session, next_rt * (~prev_loss & rt_valid))
+                    / per_session(pair_session, ~prev_loss & rt_valid))
+
+    # Deste sayıları: (oturum × deste) ve (oturum × blok × deste)
+    counts = np.bincount(session * N_DECKS + deck,
+                         minlength=n_sessions * N_DECKS).reshape(n_sessions, N_DECKS)
+    block = np.minimum((trial_number - 1) // BLOCK_SIZE, n_blocks - 1)
+    block_counts = np.bincount((session * n_blocks + block) * N_DECKS + deck,
+                               minlength=n_sessions * n_blocks * N_DECKS
+                               ).reshape(n_sessions, n_blocks, N_DECKS)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = counts / counts.sum(axis=1, keepdims=True)
+        metrics = {
+            'trials': counts.sum(axis=1),
+            'net_score': counts[:, 2] + counts[:, 3] - counts[:, 0] - counts[:, 1],
+            'win_stay': per_session(pair_session, ~prev_loss & stay) / wins,
+            'lose_shift': per_session(pair_session, prev_loss & ~stay) / losses,
+            'switch_rate': per_session(pair_session, ~stay) / pairs,
+            'post_loss_rt_slowing_s': rt_after_loss - rt_after_win,
+            'b_preference': share[:, 1],
+            'b_preference_index': share[:, 1] - (share[:, 0] + share[:, 2] + share[:, 3]) / 3,
+            'deck_entropy_bits': entropy_bits(counts),
+        }
+        block_entropy = entropy_bits(block_counts)
+    for b in range(n_blocks):
+        metrics[f'entropy_block{b + 1}_bits'] = block_entropy[:, b]
+    return pd.DataFrame(metrics)
+
+
+def entropy_bits(counts: np.ndarray) -> np.ndarray:
+    """Son eksendeki sayımların Shannon entropisi (bit); boş dağılım NaN"""
+    total = counts.sum(axis=-1, keepdims=True)
+    p = counts / total
+    terms = np.where(counts > 0, -p * np.log2(np.where(counts > 0, p, 1.0)), 0.0)
+    return np.where(total[..., 0] > 0, terms.sum(axis=-1), np.nan)
+
+
+def session_metrics(deck, net_outcome, reaction_time, trial_number) -> dict:
+    """
+    Tek oturumun metrikleri
+
+    deck: 0-3 kodları veya 'A'-'D' harfleri
+    """
+    deck = np.asarray(deck)
+    if deck.dtype.kind in 'OUS':
+        deck = pd.Series(deck).map(DECK_CODES).to_numpy()
+    n_blocks = max(1, int(np.ceil(np.max(trial_number) / BLOCK_SIZE))) if len(deck) else 1
+    frame = sequence_metrics(np.zeros(len(deck), dtype=np.int64), deck, net_outcome,
+                             reaction_time, trial_number, n_blocks)
+    return frame.iloc[0].to_dict() if len(frame) else {}
+
+
+def load_trials(conn: sqlite3.Connection) -> pd.DataFrame:
+    """trial_data tablosunu (sid, deneme) sırasıyla okur"""
+    return pd.read_sql_query("""
+        SELECT sid, trial_number, deck, reaction_time, net_outcome
+        FROM trial_data
+        ORDER BY sid, trial_number
+    """, conn)
+
+
+def database_metrics(trials: pd.DataFrame) -> pd.DataFrame:
+    """load_trials çıktısından tüm oturumların metrikleri (sid indeksli)"""
+    session, sids = pd.factorize(trials['sid'], sort=True)
+    metrics = sequence_metrics(session, trials['deck'].to_numpy(), trials['net_outcome'].to_numpy(),
+                               trials['reaction_time'].to_numpy(), trials['trial_number'].to_numpy())
+    metrics.index = pd.Index(sids, name='sid')
+    return metrics
+
+
+def store_metrics(conn: sqlite3.Connection, metrics: pd.DataFrame):
+    """Metrikleri session_metrics tablosuna yazar (sid indeksli DataFrame; commit çağırana aittir)"""
+    conn.execute(METRICS_SCHEMA)
+    long = metrics.rename_axis('sid').reset_index().melt(id_vars='sid', var_name='metric')
+    values = long['value'].astype(np.float64)
+    rows = zip(long['sid'].astype(int).tolist(), long['metric'].tolist(),
+               values.where(values.notna(), None).tolist())
+    conn.executemany(
+        "INSERT OR REPLACE INTO session_metrics (sid, metric, value) VALUES (?, ?, ?)", rows)
+
+
+def load_metrics(conn: sqlite3.Connection) -> pd.DataFrame:
+    """session_metrics tablosunu oturum × metrik biçiminde okur"""
+    long = pd.read_sql_query("""
+        SELECT s.session_id, m.metric, m.value
+        FROM session_metrics m
+        JOIN sessions s ON s.sid = m.sid
+    """, conn)
+    return long.pivot(index='session_id', columns='metric', values='value')
+
+
+def format_summary(metrics: dict) -> list:
+    """Özet rapor için metrik satırları"""
+    lines = [
+        f"Win-Stay olasılığı: {metrics['win_stay']:.2f}",
+        f"Lose-Shift olasılığı: {metrics['lose_shift']:.2f}",
+        f"Deste değiştirme oranı: {metrics['switch_rate']:.2f}",
+        f"Kayıp sonrası RT yavaşlaması: {metrics['post_loss_rt_slowing_s']:+.3f} sn",
+        f"B destesi tercihi: %{metrics['b_preference'] * 100:.1f} "
+        f"(indeks {metrics['b_preference_index']:+.3f})",
+        f"Deste seçim entropisi: {metrics['deck_entropy_bits']:.2f} bit",
+    ]
+    blocks = sorted((k for k in metrics if k.startswith('entropy_block')),
+                    key=lambda k: int(k[len('entropy_block'):-len('_bits')]))
+    for key in blocks:
+        lines.append(f"   Blok {key[len('entropy_block'):-len('_bits')]}: {metrics[key]:.2f} bit")
+    return lines
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📐 IGT Davranışsal Dizi Metrikleri")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in options or not args:
+        print("\nKullanım:")
+        print("  python3 igt_metrics.py <veritabani.db> [--csv=<cikti.csv>]")
+        print("\nÖrnek:")
+        print("  python3 igt_metrics.py Sonuclar/igt_sessions.db --csv=metrikler.csv")
+        sys.exit(0 if 'help' in options else 1)
+
+    db_path = args[0]
+    if not os.path.exists(db_path):
+        print(f"❌ Veritabanı bulunamadı: {db_path}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        t_start = time.perf_counter()
+        trials = load_trials(conn)
+        t_loaded = time.perf_counter()
+        metrics = database_metrics(trials)
+        t_computed = time.perf_counter()
+        store_metrics(conn, metrics)
+        conn.commit()
+        t_stored = time.perf_counter()
+        table = load_metrics(conn) if options.get('csv') else None
+    finally:
+        conn.close()
+
+    print(f"\n✅ {len(metrics)} oturum, {len(trials):,} deneme")
+    print(f"   Okuma: {t_loaded - t_start:.3f} sn | Hesaplama: {t_computed - t_loaded:.3f} sn | "
+          f"Yazma: {t_stored - t_computed:.3f} sn")
+    print("\n📊 Çalışma geneli ortalamalar:")
+    for name, value in metrics.mean().items():
+        print(f"   {name}: {value:.3f}")
+    if table is not None:
+        table.to_csv(options['csv'])
+        print(f"\n💾 Çıktı dosyası: {options['csv']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Bootstrap / Permutation Statistics
+Blok bazlı net skorlar için bootstrap güven aralıkları ve gruplar arası
+permütasyon testleri (doğrudan oturum veritabanından)
+
+- Yeniden örneklemeler indeks matrisleri olarak çekilir (resamples × n) ve
+  istatistik tek NumPy geçişinde hesaplanır; bellek üst sınırı için parça parça
+- Her grup (bootstrap) ve her grup çifti (permütasyon) ayrı bir iş olarak
+  süreç havuzunda çalışır; tohumlar SeedSequence ile türetilir (tekrarlanabilir)
+- Gruplama: cinsiyet, yaş bandı veya harici bir grup dosyasındaki sütun
+  (örn. klinik / kontrol)
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import time
+import sqlite3
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BLOCK_SIZE = 20
+N_RESAMPLES = 10000
+N_PERMUTATIONS = 10000
+CONFIDENCE = 0.95
+CHUNK_BYTES = 64 * 1024 * 1024    # Tek parçadaki yeniden örnekleme dizisinin üst sınırı
+DEFAULT_SEED = 20251220
+
+AGE_BINS = [0, 18, 26, 36, 51, np.inf]
+AGE_LABELS = ['<18', '18-25', '26-35', '36-50', '51+']
+
+
+def load_net_scores(db_path: str) -> pd.DataFrame:
+    """
+    Oturum başına blok net skorları [(C+D) - (A+B)] ve demografik bilgiler
+
+    Returns:
+        session_id, subject_id, age, gender, age_band, Block_1..Block_k, Net_Score
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        sessions = pd.read_sql_query(
+            "SELECT sid, session_id, subject_id, age, gender FROM sessions", conn)
+        blocks = pd.read_sql_query(f"""
+            SELECT sid, (trial_number - 1) / {BLOCK_SIZE} AS block,
+                   SUM(CASE WHEN deck >= 2 THEN 1 ELSE -1 END) AS net_score
+            FROM trial_data
+            GROUP BY sid, block
+        """, conn)
+    finally:
+        conn.close()
+
+    scores = blocks.pivot(index='sid', columns='block', values='net_score')
+    scores.columns = [f'Block_{b + 1}' for b in scores.columns]
+    scores['Net_Score'] = scores.sum(axis=1, min_count=1)
+    df = sessions.merge(scores, left_on='sid', right_index=True, how='inner')
+    df['age_band'] = pd.cut(df['age'], AGE_BINS, labels=AGE_LABELS, right=False).astype(object)
+    return df.drop(columns='sid').reset_index(drop=True)
+
+
+def chunk_size(n: int, k: int, budget: int = CHUNK_BYTES) -> int:
+    """(parça × n × k) float64 dizisi bütçeye sığacak parça boyu"""
+    return max(1, budget // (8 * max(1, n) * max(1, k)))
+
+
+def bootstrap_ci(values: np.ndarray, n_resamples: int = N_RESAMPLES,
+                 confidence: float = CONFIDENCE, seed=None) -> dict:
+    """
+    Sütun ortalamaları için yüzdelik bootstrap güven aralığı
+
+    Args:
+        values: (n × k) dizi (oturumlar × istatistikler), NaN satırlar önceden atılmalı
+
+    Returns:
+        {'mean', 'ci_low', 'ci_high', 'se'} (her biri k uzunlukta)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n, k = values.shape
+    rng = np.random.default_rng(seed)
+    means = np.empty((n_resamples, k))
+    step = chunk_size(n, k)
+    for start in range(0, n_resamples, step):
+        stop = min(n_resamples, start + step)
+        index = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[index].mean(axis=1)
+    alpha = (1.0 - confidence) / 2
+    low, high = np.percentile(means, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return {'mean': values.mean(axis=0), 'ci_low': low, 'ci_high': high,
+            'se': means.std(axis=0, ddof=1)}
+
+
+def permutation_test(x: np.ndarray, y: np.ndarray, n_permutations: int = N_PERMUTATIONS,
+                     seed=None) -> dict:
+    """
+    Ortalama farkı için iki yönlü permütasyon testi (sütun başına)
+
+    Etiketler her permütasyonda karıştırılır: birleşik örneğin satır indeksleri
+    (permütasyon × N) matrisinde her satır ayrı bir karışımdır.
+
+    Returns:
+        {'diff', 'p_value'} (her biri k uzunlukta)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    pooled = np.concatenate([x, y])
+    n_x, total = len(x), len(pooled)
+    observed = x.mean(axis=0) - y.mean(axis=0)
+    column_sum = pooled.sum(axis=0)
+
+    rng = np.random.default_rng(seed)
+    extreme = np.zeros(pooled.shape[1], dtype=np.int64)
+    step = chunk_size(total, pooled.shape[1])
+    for start in range(0, n_permutations, step):
+        stop = min(n_permutations, start + step)
+        # Her satırda ilk n_x indeks birinci grubu oluşturur
+        order = rng.permuted(np.broadcast_to(np.arange(total), (stop - start, total)), axis=1)
+        sum_x = pooled[order[:, :n_x]].sum(axis=1)
+        diff = sum_x / n_x - (column_sum - sum_x) / (total - n_x)
+        extreme += (np.abs(diff) >= np.abs(observed) - 1e-12).sum(axis=0)
+    return {'diff': observed, 'p_value': (extreme + 1) / (n_permutations + 1)}
+
+
+def bootstrap_job(job):
+    """İşçi süreç: tek grubun bootstrap güven aralıkları"""
+    group, values, n_resamples, confidence, seed = job
+    return group, len(values), bootstrap_ci(values, n_resamples, confidence, seed)
+
+
+def permutation_job(job):
+    """İşçi süreç: iki grup arasında permütasyon testi"""
+    pair, x, y, n_permutations, seed = job
+    return pair, permutation_test(x, y, n_permutations, seed)
+
+
+def group_statistics(df: pd.DataFrame, by: str, columns: list = None,
+                     n_resamples: int = N_RESAMPLES, n_permutations: int = N_PERMUTATIONS,
+                     confidence: float = CONFIDENCE, workers: int = None,
+                     seed: int = DEFAULT_SEED):
+    """
+    Grup başına bootstrap CI'ları ve tüm grup çiftleri için permütasyon testleri
+
+    Returns:
+        (bootstrap DataFrame: grup × istatistik satırları,
+         permütasyon DataFrame: grup çifti × istatistik satırları)
+    """
+    columns = columns or [c for c in df.columns if c.startswith('Block_')] + ['Net_Score']
+    data = df.dropna(subset=columns + [by])
+    groups = {str(name): g[columns].to_numpy(dtype=np.float64)
+              for name, g in data.groupby(by, sort=True)}
+    pairs = list(combinations(groups, 2))
+
+    # Her iş için bağımsız, tekrarlanabilir tohum
+    seeds = np.random.SeedSequence(seed).spawn(len(groups) + len(pairs))
+    boot_jobs = [(name, values, n_resamples, confidence, s)
+                 for (name, values), s in zip(groups.items(), seeds)]
+    perm_jobs = [((a, b), groups[a], groups[b], n_permutations, s)
+                 for (a, b), s in zip(pairs, seeds[len(groups):])]
+
+    boot_rows, perm_rows = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        boot_futures = [pool.submit(bootstrap_job, job) for job in boot_jobs]
+        perm_futures = [pool.submit(permutation_job, job) for job in perm_jobs]
+        for future in boot_futures:
+            name, n, result = future.result()
+            for i, column in enumerate(columns):
+                boot_rows.append({'group': name, 'n': n, 'statistic': column,
+                                  **{key: result[key][i] for key in result}})
+        for future in perm_futures:
+            (a, b), result = future.result()
+            for i, column in enumerate(columns):
+                perm_rows.append({'group_a': a, 'group_b': b, 'statistic': column,
+                                  'n_a': len(groups[a]), 'n_b': len(groups[b]),
+                                  'diff': result['diff'][i], 'p_value': result['p_value'][i]})
+    return pd.DataFrame(boot_rows), pd.DataFrame(perm_rows)
+
+
+def attach_groups(df: pd.DataFrame, groups_csv: str) -> pd.DataFrame:
+    """Harici grup dosyasını (Subject_ID + grup sütunları) oturumlara ekler"""
+    groups = pd.read_csv(groups_csv, dtype={'Subject_ID': str})
+    return df.merge(groups.rename(columns={'Subject_ID': 'subject_id'}), on='subject_id', how='left')
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📊 IGT Bootstrap / Permütasyon İstatistikleri")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in options or not args:
+        print("\nKullanım:")
+        print("  python3 igt_stats.py <veritabani.db> [--by=gender|age_band|<sütun>] "
+              "[--groups=<gruplar.csv>] [--resamples=N] [--permutations=N] "
+              "[--workers=N] [--seed=N] [--csv=<cikti_onek>]")
+        print("\nÖrnek:")
+        print("  python3 igt_stats.py Sonuclar/igt_sessions.db --by=gender")
+        print("  python3 igt_stats.py Sonuclar/igt_sessions.db --groups=klinik.csv --by=Group")
+        sys.exit(0 if 'help' in options else 1)
+
+    db_path = args[0]
+    if not os.path.exists(db_path):
+        print(f"❌ Veritabanı bulunamadı: {db_path}")
+        sys.exit(1)
+
+    by = options.get('by') or 'gender'
+    df = load_net_scores(db_path)
+    if options.get('groups'):
+        df = attach_groups(df, options['groups'])
+    if by not in df.columns:
+        print(f"❌ Grup sütunu bulunamadı: {by}")
+        sys.exit(1)
+
+    t_start = time.perf_counter()
+    boot_df, perm_df = group_statistics(
+        df, by,
+        n_resamples=int(options.get('resamples') or N_RESAMPLES),
+        n_permutations=int(options.get('permutations') or N_PERMUTATIONS),
+        workers=int(options['workers']) if options.get('workers') else None,
+        seed=int(options.get('seed') or DEFAULT_SEED))
+    elapsed = time.perf_counter() - t_start
+
+    print(f"\n✅ {len(df)} oturum, gruplama: {by} ({elapsed:.2f} sn)")
+    print(f"\n📈 Bootstrap %{CONFIDENCE * 100:.0f} güven aralıkları:")
+    for row in boot_df.itertuples():
+        print(f"   {row.group:<12} {row.statistic:<10} n={row.n:<5} "
+              f"{row.mean:+7.2f} [{row.ci_low:+7.2f}, {row.ci_high:+7.2f}]")
+    if len(perm_df):
+        print("\n🔀 Permütasyon testleri (ortalama farkı, iki yönlü):")
+        for row in perm_df.itertuples():
+            print(f"   {row.group_a} - {row.group_b:<10} {row.statistic:<10} "
+                  f"{row.diff:+7.2f}  p={row.p_value:.4f}")
+
+    if options.get('csv'):
+        prefix = options['csv'].replace('.csv', '')
+        boot_df.to_csv(f"{prefix}_Bootstrap.csv", index=False)
+        perm_df.to_csv(f"{prefix}_Permutation.csv", index=False)
+        print(f"\n💾 Çıktı dosyaları: {prefix}_Bootstrap.csv, {prefix}_Permutation.csv")
+
+
+if __name__ == "__main__":
+    main()
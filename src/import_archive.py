@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT CSV Archive Importer
+Sonuclar/ klasöründeki IGT_*.csv dosyalarından veritabanını yeniden oluşturur
+veya eksik oturumları tamamlar
+
+- Dosyalar paralel işçi süreçlerinde ayrıştırılır ve doğrulanır
+- Veritabanında bulunan oturumlar atlanır (idempotent)
+- Satırlar büyük transaction'larda executemany ile yazılır
+
+Not: Uygulama her yeni kayıtta veritabanını Config.MAX_SESSIONS_STORED ile
+sınırlar; tüm arşivi tutmak için ayrı bir veritabanı yolu verin.
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import re
+import csv
+import sys
+import time
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import DECK_NAMES, get_output_dir, migrate_database
+
+# Oturum CSV'leri: IGT_<subject_id>_<YYYY-MM-DD_HH-MM-SS>.csv
+# (_Shimmer.csv gibi türetilmiş dosyalar hariç)
+SESSION_CSV_PATTERN = re.compile(r'^IGT_.+_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.csv$')
+
+REQUIRED_COLUMNS = [
+    'Subject_ID', 'Subject_Age', 'Subject_Gender', 'Experiment_Start',
+    'Trial_Number', 'Deck_Selected', 'Reaction_Time', 'Reward', 'Penalty',
+    'Net_Outcome', 'Total_Balance', 'Trial_Real_Time'
+]
+
+BATCH_SESSIONS = 500
+
+
+def scan_archive(archive_dir: str) -> list:
+    """Arşivdeki oturum CSV dosyalarını listeler"""
+    with os.scandir(archive_dir) as entries:
+        return sorted(entry.path for entry in entries
+                      if entry.is_file() and SESSION_CSV_PATTERN.match(entry.name))
+
+
+def parse_session_csv(csv_path: str):
+    """
+    Tek bir oturum CSV'sini ayrıştırır ve şemaya göre doğrular
+
+    Returns:
+        (session_row, trial_columns) veya hata durumunda (None, hata mesajı)
+    """
+    name = os.path.basename(csv_path)
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = list(reader)
+    except Exception as e:
+        return None, f"{name}: okunamadı ({e})"
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        return None, f"{name}: eksik sütunlar {missing}"
+    if not rows:
+        return None, f"{name}: boş dosya"
+
+    columns = dict(zip(header, zip(*rows)))
+    first = {key: values[0] for key, values in columns.items()}
+    try:
+        trial_numbers = np.array(columns['Trial_Number'], dtype=np.int64)
+        reward = np.array(columns['Reward'], dtype=np.int64)
+        penalty = np.array(columns['Penalty'], dtype=np.int64)
+        net = np.array(columns['Net_Outcome'], dtype=np.int64)
+        balance = np.array(columns['Total_Balance'], dtype=np.int64)
+        reaction_time = np.array(columns['Reaction_Time'], dtype=np.float64)
+        trial_ns = np.array(columns['Trial_Real_Time'], dtype='datetime64[ns]').view(np.int64)
+        t0 = first.get('Sync_Timestamp') or first['Experiment_Start']
+        t0_ns = int(np.datetime64(t0, 'ns').astype(np.int64))
+        age = int(first['Subject_Age'])
+        seed = int(first['Schedule_Seed']) if first.get('Schedule_Seed') else None
+    except (ValueError, OverflowError) as e:
+        return None, f"{name}: geçersiz değer ({e})"
+
+    if not np.array_equal(trial_numbers, np.arange(1, len(rows) + 1)):
+        return None, f"{name}: Trial_Number sırası bozuk"
+
+    if not set(columns['Deck_Selected']) <= set(DECK_NAMES):
+        return None, f"{name}: geçersiz deste değeri"
+    deck = np.searchsorted(DECK_NAMES, columns['Deck_Selected'])
+
+    if not np.array_equal(reward + penalty, net):
+        return None, f"{name}: Reward + Penalty ≠ Net_Outcome"
+    start_balance = balance[0] - net[0]
+    if not np.array_equal(start_balance + np.cumsum(net), balance):
+        return None, f"{name}: bakiye tutarsız"
+
+    png_path = csv_path.replace('.csv', '_Analysis.png')
+    txt_path = csv_path.replace('.csv', '_Summary.txt')
+    session_row = (
+        os.path.splitext(name)[0],
+        first['Subject_ID'],
+        age,
+        first['Subject_Gender'],
+        first['Experiment_Start'],
+        columns['Trial_Real_Time'][-1][:19],     # bitiş zamanı saniye hassasiyetinde
+        len(rows),
+        int(balance[-1]),
+        int(balance[-1] - start_balance),
+        csv_path,
+        png_path if os.path.exists(png_path) else None,
+        txt_path if os.path.exists(txt_path) else None,
+        t0_ns,
+        seed
+    )
+    trial_columns = (
+        trial_numbers.tolist(),
+        deck.tolist(),
+        reaction_time.tolist(),
+        reward.tolist(),
+        penalty.tolist(),
+        net.tolist(),
+        balance.tolist(),
+        (trial_ns - t0_ns).tolist()
+    )
+    return session_row, trial_columns
+
+
+def write_batch(conn: sqlite3.Connection, batch: list) -> int:
+    """Bir grup oturumu tek transaction'da yazar, yazılan deneme sayısını döndürür"""
+    with conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO sessions (
+                session_id, subject_id, age, gender, start_time, end_time,
+                trials_completed, final_balance, net_change, csv_path, png_path,
+                txt_path, t0_ns, schedule_seed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [session_row for session_row, _ in batch])
+
+        placeholders = ",".join("?" * len(batch))
+        sids = dict(conn.execute(
+            f"SELECT session_id, sid FROM sessions WHERE session_id IN ({placeholders})",
+            [session_row[0] for session_row, _ in batch]
+        ).fetchall())
+
+        trial_rows = []
+        for session_row, columns in batch:
+            sid = sids[session_row[0]]
+            trial_rows.extend(zip([sid] * len(columns[0]), *columns))
+        conn.executemany("""
+            INSERT OR IGNORE INTO trial_data (
+                sid, trial_number, deck, reaction_time, reward, penalty,
+                net_outcome, total_balance, t_ns
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, trial_rows)
+    return len(trial_rows)
+
+
+def import_archive(archive_dir: str, db_path: str, workers: int = None) -> dict:
+    """
+    Arşivdeki eksik oturumları veritabanına yükler
+
+    Args:
+        archive_dir: IGT_*.csv dosyalarının bulunduğu klasör
+        db_path: Hedef veritabanı (yoksa oluşturulur)
+        workers: İşçi süreç sayısı (varsayılan: CPU sayısı)
+
+    Returns:
+        İstatistik sözlüğü (sessions, trials, skipped, errors, seconds)
+    """
+    t_start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    migrate_database(conn)
+    existing = {row[0] for row in conn.execute("SELECT session_id FROM sessions")}
+
+    files = scan_archive(archive_dir)
+    pending = [f for f in files
+               if os.path.splitext(os.path.basename(f))[0] not in existing]
+    print(f"📁 {len(files)} oturum dosyası bulundu, {len(files) - len(pending)} zaten kayıtlı")
+
+    stats = {'sessions': 0, 'trials': 0, 'skipped': len(files) - len(pending),
+             'errors': [], 'seconds': 0.0}
+    if pending:
+        conn.execute("PRAGMA synchronous = OFF")
+        batch = []
+        chunksize = max(1, len(pending) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for session_row, result in pool.map(parse_session_csv, pending, chunksize=chunksize):
+                if session_row is None:
+                    stats['errors'].append(result)
+                    continue
+                batch.append((session_row, result))
+                if len(batch) >= BATCH_SESSIONS:
+                    stats['trials'] += write_batch(conn, batch)
+                    stats['sessions'] += len(batch)
+                    batch = []
+        if batch:
+            stats['trials'] += write_batch(conn, batch)
+            stats['sessions'] += len(batch)
+    conn.close()
+
+    stats['seconds'] = time.perf_counter() - t_start
+    return stats
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📥 IGT CSV Arşivi İçe Aktarma")
+    print("=" * 60)
+
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("\nKullanım:")
+        print("  python3 import_archive.py [arsiv_klasoru] [veritabani.db] [isci_sayisi]")
+        print("\nÖrnek:")
+        print("  python3 import_archive.py Sonuclar/ Sonuclar/igt_archive.db 8")
+        sys.exit(0)
+
+    archive_dir = sys.argv[1] if len(sys.argv) > 1 else get_output_dir()
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(archive_dir, 'igt_sessions.db')
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    if not os.path.isdir(archive_dir):
+        print(f"❌ Arşiv klasörü bulunamadı: {archive_dir}")
+        sys.exit(1)
+
+    stats = import_archive(archive_dir, db_path, workers)
+
+    for error in stats['errors']:
+        print(f"⚠️ {error}")
+    rate = stats['trials'] / stats['seconds'] if stats['seconds'] > 0 else 0
+    print(f"\n✅ {stats['sessions']} oturum, {stats['trials']} deneme yüklendi")
+    print(f"   Atlanan (mevcut): {stats['skipped']} | Hatalı: {len(stats['errors'])}")
+    print(f"   Süre: {stats['seconds']:.2f} sn ({rate:,.0f} satır/sn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Version: 3.0
 
 import sys
 import os
+import re
 import random
 import sqlite3
 import logging
@@ -16,14 +17,20 @@ from datetime import datetime
 from typing import List, Tuple, Dict, Optional
 import json
 
+from event_markers import MarkerSender
+from igt_metrics import session_metrics, store_metrics, format_summary, METRICS_SCHEMA
+from igt_bayes import FITS_SCHEMA
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QSpinBox, QComboBox, QMessageBox,
     QStackedWidget, QProgressBar, QFrame, QGridLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog, QPlainTextEdit
+)
+from PyQt6.QtCore import Qt, QTimer, QThread, QUrl, QRectF, pyqtSignal, QPropertyAnimation, QEasingCurve
+from PyQt6.QtGui import (
+    QFont, QPalette, QColor, QIcon, QImage, QPixmap, QDesktopServices, QPainter, QPen
 )
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve
-from PyQt6.QtGui import QFont, QPalette, QColor, QIcon
 
 # Data analysis imports
 import pandas as pd
@@ -44,10 +51,31 @@ class Config:
     REWARD_BAD_DECK = 5000
     REWARD_GOOD_DECK = 2500
     MAX_TRIALS = 100  # Klasik IGT standardı
+    FEEDBACK_DURATION_MS = 2000   # Geri bildirimin ekranda kalma süresi
+    FIRST_TRIAL_DELAY_MS = 100    # Arayüz hazırlanırken ilk deneme gecikmesi
+    
+    # Experiment Screen Geometry (pre-rendered assets)
+    CARD_SIZE = (200, 300)
+    FEEDBACK_SIZE = (860, 150)
     
     # Database
     MAX_SESSIONS_STORED = 200
     
+    # Data Viewer
+    THUMBNAIL_WIDTH = 480
+    THUMBNAIL_DIR = '.thumbs'
+    THUMBNAIL_CACHE_SIZE = 32
+    
+    # Event Markers (harici kayıt cihazları; hepsi kapalıysa marker gönderilmez)
+    MARKER_UDP = None          # örn. ('127.0.0.1', 5005)
+    MARKER_SERIAL_PORT = None  # örn. '/dev/ttyUSB0' veya 'COM3'
+    MARKER_LSL = False
+    
+    # Merkezi Toplama Sunucusu (collection_server; None ise gönderim yapılmaz)
+    COLLECTION_URL = None      # örn. 'http://192.168.1.10:8765'
+    COLLECTION_TOKEN = None
+    STATION_NAME = None        # None: bilgisayar adı
+    
     # Colors (Modern Palette)
     BG_COLOR = '#0f0f1e'
     CARD_COLORS = {
@@ -57,6 +85,9 @@ class Config:
         'D': '#0984e3'   # Ocean blue
     }
     PRIMARY_COLOR = '#667eea'
+    FEEDBACK_BG_COLOR = '#2d3436'
+    MUTED_COLOR = '#95a5a6'
+    CARD_HOVER_COLOR = '#ffeaa7'
     ACCENT_COLOR = '#f1c40f'
     TEXT_COLOR = '#ffffff'
     SUCCESS_COLOR = '#2ecc71'
@@ -118,6 +149,8 @@ class Strings:
         "open_summary": "Özet Aç",
         "open_folder": "Klasörü Aç",
         "records_found": "Toplam {count} kayıt bulundu. (Maksimum kapasite: {max})",
+        "preview": "Önizleme",
+        "no_preview": "Önizleme bulunamadı",
         
         # Welcome Screen
         "participant_id_label": "Katılımcı ID",
@@ -255,6 +288,8 @@ seçim yapma yeteneklerini değerlendirir.</p><br>
         "open_summary": "Open Summary",
         "open_folder": "Open Folder",
         "records_found": "Total {count} records found. (Maximum capacity: {max})",
+        "preview": "Preview",
+        "no_preview": "No preview available",
         
         # Welcome Screen
         "participant_id_label": "Participant ID",
@@ -393,8 +428,63 @@ penalties_B = [0, 0, 0, 0, 0, 0, 0, 0, 0, -62500] * 10
 penalties_C = [0, -1250, 0, -1250, 0, -2500, 0, -2500, 0, -5000] * 10
 penalties_D = [0, 0, 0, 0, 0, 0, 0, 0, 0, -12500] * 10
 
-def create_schedule(base_list: List[int]) -> List[int]:
-    """Ceza listesini 10'luk bloklara böler ve karıştırır"""
+SCHEDULE_BLOCK = 10
+
+def new_schedule_seed() -> int:
+    """Yeni oturum için 63 bitlik çizelge tohumu (SQLite INTEGER'a sığar)"""
+    return int(np.random.default_rng().integers(0, 2**63 - 1))
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 karıştırma fonksiyonu (uint64, taşmalar mod 2^64)"""
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+def schedule_batch(seeds, base_lists: List[List[int]], first_deck: int = 0) -> np.ndarray:
+    """
+    Tohumlardan deste çizelgelerini toplu ve belirlenimli üretir
+    
+    Her (tohum, deste, pozisyon) için SplitMix64 anahtarı hesaplanır; her 10'luk
+    blok kendi anahtarlarına göre sıralanarak karıştırılır. Sonuç yalnızca tohuma
+    bağlıdır: aynı oturum tek başına veya milyonlarca simüle oturumla birlikte
+    üretildiğinde aynı çizelgeyi alır. Bellek için büyük partiler ~100 bin
+    tohumluk parçalar halinde üretilmelidir.
+    
+    Args:
+        seeds: Oturum tohumları (n,)
+        base_lists: Deste başına ceza listeleri (blok katı uzunlukta, ör. 4 × 100)
+        first_deck: base_lists[0]'ın deste indeksi (tek deste üretimi için)
+    
+    Returns:
+        (n × deste × uzunluk) int64 ceza dizisi
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64).reshape(-1)
+    base = np.asarray(base_lists, dtype=np.int64)
+    n_decks, length = base.shape
+    counter = (np.arange(first_deck, first_deck + n_decks, dtype=np.uint64)[:, None] * np.uint64(length)
+               + np.arange(length, dtype=np.uint64))
+    keys = _mix64(_mix64(seeds)[:, None, None] ^ counter)
+    shape = (len(seeds), n_decks, length // SCHEDULE_BLOCK, SCHEDULE_BLOCK)
+    order = np.argsort(keys.reshape(shape), axis=-1, kind='stable')
+    blocks = np.broadcast_to(base.reshape(shape[1:]), shape)
+    return np.take_along_axis(blocks, order, axis=-1).reshape(len(seeds), n_decks, length)
+
+def session_schedule(seed: int, lang_config: Optional[Dict] = None) -> Dict[str, List[int]]:
+    """Oturumun dört destelik ceza çizelgesini tohumdan yeniden üretir"""
+    lang_config = lang_config or get_lang_config()
+    base_lists = [lang_config[f"penalty_{name.lower()}"] * 10 for name in 'ABCD']
+    return dict(zip('ABCD', schedule_batch([seed], base_lists)[0].tolist()))
+
+def create_schedule(base_list: List[int], seed: Optional[int] = None, deck_index: int = 0) -> List[int]:
+    """Ceza listesini 10'luk bloklara böler ve karıştırır
+    
+    Tohum verilirse karışım schedule_batch ile belirlenimli üretilir; verilmezse
+    global random modülü kullanılır.
+    """
+    if seed is not None:
+        return schedule_batch([seed], [base_list], first_deck=deck_index)[0, 0].tolist()
     final_schedule = []
     for i in range(0, len(base_list), 10):
         block = base_list[i:i+10]
@@ -404,10 +494,10 @@ def create_schedule(base_list: List[int]) -> List[int]:
 
 class Deck:
     """Kart destesi sınıfı"""
-    def __init__(self, name: str, reward: int, schedule: List[int]):
+    def __init__(self, name: str, reward: int, schedule: List[int], seed: Optional[int] = None):
         self.name = name
         self.reward = reward
-        self.schedule = create_schedule(schedule)
+        self.schedule = create_schedule(schedule, seed, 'ABCD'.index(name) if seed is not None else 0)
         self.draw_count = 0
     
     def draw_card(self) -> Tuple[int, int, int]:
@@ -416,9 +506,127 @@ class Deck:
         self.draw_count += 1
         return self.reward, penalty, self.reward + penalty
 
+# =============================================================================
+# TRIAL RECORDS
+# =============================================================================
+DECK_NAMES = ('A', 'B', 'C', 'D')
+
+TRIAL_DTYPE = np.dtype([
+    ('trial_number', np.int32),
+    ('deck', np.int8),            # DECK_NAMES indeksi
+    ('reaction_time', np.float64),
+    ('reward', np.int32),
+    ('penalty', np.int32),
+    ('net_outcome', np.int32),
+    ('total_balance', np.int64),
+    ('timestamp_ns', np.int64)    # Trial_Real_Time (datetime64[ns])
+])
+
+def to_epoch_ns(dt: datetime) -> int:
+    """Naive yerel zamanı int64 nanosaniyeye çevirir (SQLite 'unixepoch' ile uyumlu)"""
+    return int(np.datetime64(dt, 'ns').astype(np.int64))
+
+class TrialBuffer:
+    """Deneme kayıtları için önceden ayrılmış yapılandırılmış dizi.
+
+    Oturum düzeyindeki bilgiler (katılımcı, başlangıç, sync) bir kez saklanır;
+    deneme satırları ``Config.MAX_TRIALS`` boyutunda ayrılan diziye yazılır ve
+    uzun protokollerde kapasite ikiye katlanarak büyür.
+    """
+    
+    def __init__(self, participant_info: Dict, start_time: datetime,
+                 sync_timestamp: Optional[datetime] = None, capacity: Optional[int] = None,
+                 schedule_seed: Optional[int] = None):
+        self.subject_id = participant_info['subject_id']
+        self.age = participant_info['age']
+        self.gender = participant_info['gender']
+        self.start_time = start_time
+        self.sync_timestamp = sync_timestamp
+        self.schedule_seed = schedule_seed
+        self.records = np.zeros(capacity or Config.MAX_TRIALS, dtype=TRIAL_DTYPE)
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def view(self) -> np.ndarray:
+        """Doldurulmuş satırların kopyasız görünümü"""
+        return self.records[:self.count]
+    
+    @property
+    def final_balance(self) -> int:
+        return int(self.records['total_balance'][self.count - 1])
+    
+    def append(self, deck_idx: int, reaction_time: float, reward: int, penalty: int,
+               net: int, balance: int, timestamp: datetime):
+        """Yeni deneme satırı ekler"""
+        if self.count == len(self.records):
+            self.records = np.resize(self.records, max(1, 2 * len(self.records)))
+        self.records[self.count] = (
+            self.count + 1, deck_idx, round(reaction_time, 3), reward, penalty,
+            net, balance, np.datetime64(timestamp, 'ns').astype(np.int64)
+        )
+        self.count += 1
+    
+    def to_dataframe(self) -> pd.DataFrame:
+        """CSV şemasıyla DataFrame oluşturur (sütunlar dizinin görünümleridir)"""
+        v = self.view
+        n = self.count
+        df = pd.DataFrame({
+            'Subject_ID': [self.subject_id] * n,
+            'Subject_Age': np.full(n, self.age),
+            'Subject_Gender': [self.gender] * n,
+            'Experiment_Start': [self.start_time.isoformat(timespec='seconds')] * n,
+            'Trial_Number': v['trial_number'],
+            'Deck_Selected': np.asarray(DECK_NAMES)[v['deck']],
+            'Reaction_Time': v['reaction_time'],
+            'Reward': v['reward'],
+            'Penalty': v['penalty'],
+            'Net_Outcome': v['net_outcome'],
+            'Total_Balance': v['total_balance'],
+            # ms hassasiyet: Shimmer birleştirmesi olay zamanlarını bu sütundan alır
+            'Trial_Real_Time': np.datetime_as_string(
+                v['timestamp_ns'].view('datetime64[ns]'), unit='ms')
+        }, copy=False)
+        if self.sync_timestamp:
+            # Sync timestamp yalnızca ilk satırda
+            sync_col = [None] * n
+            if n:
+                sync_col[0] = self.sync_timestamp.isoformat(timespec='milliseconds')
+            df['Sync_Timestamp'] = sync_col
+        if self.schedule_seed is not None:
+            df['Schedule_Seed'] = np.full(n, self.schedule_seed, dtype=np.int64)
+        return df
+    
+    @property
+    def t0_ns(self) -> int:
+        """Zaman referansı: sync marker (yoksa deney başlangıcı), epoch ns"""
+        return to_epoch_ns(self.sync_timestamp or self.start_time)
+    
+    def db_rows(self, sid: int):
+        """trial_data tablosu için executemany satırları üretir"""
+        v = self.view
+        return zip(
+            [sid] * self.count,
+            v['trial_number'].tolist(),
+            v['deck'].tolist(),
+            v['reaction_time'].tolist(),
+            v['reward'].tolist(),
+            v['penalty'].tolist(),
+            v['net_outcome'].tolist(),
+            v['total_balance'].tolist(),
+            (v['timestamp_ns'] - self.t0_ns).tolist()
+        )
+
 # =============================================================================
 # DATABASE & FILE MANAGEMENT
 # =============================================================================
+# Oturum çıktıları: IGT_<subject_id>_<YYYY-MM-DD_HH-MM-SS>(.csv|_Analysis.png|_Summary.txt)
+# (_Shimmer.csv, _Markers.csv gibi türetilmiş dosyalar eşleşmez)
+SESSION_FILE_PATTERN = re.compile(
+    r'^IGT_(?P<subject_id>.+)_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}(?P<suffix>\.csv|_Analysis\.png|_Summary\.txt)$')
+
 def get_output_dir() -> str:
     """Çıktı dizinini oluşturur"""
     if getattr(sys, 'frozen', False):
@@ -449,51 +657,156 @@ def generate_subject_id() -> str:
     millisecond = now.microsecond // 1000
     return f"D{now.strftime('%Y%m%d_%H%M%S')}{millisecond:03d}"
 
+DB_SCHEMA_VERSION = 5
+
+SCHEMA_V2 = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        sid INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL UNIQUE,
+        subject_id TEXT NOT NULL,
+        age INTEGER,
+        gender TEXT,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        trials_completed INTEGER DEFAULT 0,
+        final_balance INTEGER,
+        net_change INTEGER,
+        csv_path TEXT,
+        png_path TEXT,
+        txt_path TEXT,
+        t0_ns INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Deste: 0-3 (A-D), t_ns: sync marker'a (t0_ns) göre nanosaniye
+    """
+    CREATE TABLE IF NOT EXISTS trial_data (
+        sid INTEGER NOT NULL,
+        trial_number INTEGER NOT NULL,
+        deck INTEGER NOT NULL,
+        reaction_time REAL,
+        reward INTEGER,
+        penalty INTEGER,
+        net_outcome INTEGER,
+        total_balance INTEGER,
+        t_ns INTEGER,
+        PRIMARY KEY (sid, trial_number),
+        FOREIGN KEY (sid) REFERENCES sessions(sid)
+    ) WITHOUT ROWID
+    """,
+    # Eski trials tablosunun sütun yapısını koruyan uyumluluk görünümü
+    """
+    CREATE VIEW IF NOT EXISTS trials AS
+    SELECT s.session_id AS session_id,
+           t.trial_number AS trial_number,
+           substr('ABCD', t.deck + 1, 1) AS deck_selected,
+           t.reaction_time AS reaction_time,
+           t.reward AS reward,
+           t.penalty AS penalty,
+           t.net_outcome AS net_outcome,
+           t.total_balance AS total_balance,
+           strftime('%Y-%m-%dT%H:%M:%S', (s.t0_ns + t.t_ns) / 1000000000, 'unixepoch')
+               AS trial_timestamp
+    FROM trial_data t
+    JOIN sessions s ON s.sid = t.sid
+    """
+]
+
+# v3: oturum başına davranışsal metrikler (igt_metrics)
+SCHEMA_V3 = SCHEMA_V2 + [METRICS_SCHEMA]
+
+# v4: hiyerarşik Bayesçi model kestirimleri (igt_bayes)
+SCHEMA_V4 = SCHEMA_V3 + [FITS_SCHEMA]
+
+# v5: oturumun deste çizelgesi tohumu (eski oturumlarda NULL)
+SESSION_COLUMNS_V5 = [("schedule_seed", "INTEGER")]
+
+def migrate_database(conn: sqlite3.Connection):
+    """
+    Şemayı güncel sürüme taşır
+
+    v1 (TEXT anahtarlı trials tablosu) → v2 tablolarına veri taşınır;
+    v2 → v3 yalnızca session_metrics tablosunu, v3 → v4 model_fits tablosunu,
+    v4 → v5 sessions.schedule_seed sütununu ekler.
+    
+    Taşıma tek bir açık transaction'dır (sqlite3 modülü DDL'den önce örtük
+    transaction açmaz); yarıda kalmış eski bir taşımadan kalan sessions_v1 /
+    trials_v1 tabloları bulunursa kopyalama kaldığı yerden tamamlanır.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    legacy = bool(tables & {'trials', 'sessions_v1', 'trials_v1'})
+    if version >= DB_SCHEMA_VERSION and not legacy:
+        return
+    
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN")
+        if 'trials' in tables:
+            if 'sessions_v1' not in tables:
+                conn.execute("ALTER TABLE sessions RENAME TO sessions_v1")
+            conn.execute("ALTER TABLE trials RENAME TO trials_v1")
+            tables |= {'sessions_v1', 'trials_v1'}
+        for statement in SCHEMA_V4:
+            conn.execute(statement)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for name, sql_type in SESSION_COLUMNS_V5:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {sql_type}")
+        # Yarım kalmış taşımadan sonra yazılmış oturumlar korunur (OR IGNORE)
+        if 'sessions_v1' in tables:
+            conn.execute("""
+                INSERT OR IGNORE INTO sessions (
+                    session_id, subject_id, age, gender, start_time, end_time,
+                    trials_completed, final_balance, net_change, csv_path, png_path,
+                    txt_path, t0_ns, created_at
+                )
+                SELECT session_id, subject_id, age, gender, start_time, end_time,
+                       trials_completed, final_balance, net_change, csv_path, png_path,
+                       txt_path, CAST(strftime('%s', start_time) AS INTEGER) * 1000000000,
+                       created_at
+                FROM sessions_v1
+            """)
+        if 'trials_v1' in tables:
+            conn.execute("""
+                INSERT OR IGNORE INTO trial_data (
+                    sid, trial_number, deck, reaction_time, reward, penalty,
+                    net_outcome, total_balance, t_ns
+                )
+                SELECT s.sid, t.trial_number, instr('ABCD', t.deck_selected) - 1,
+                       t.reaction_time, t.reward, t.penalty, t.net_outcome, t.total_balance,
+                       CAST(strftime('%s', t.trial_timestamp) AS INTEGER) * 1000000000 - s.t0_ns
+                FROM trials_v1 t
+                JOIN sessions s ON s.session_id = t.session_id
+            """)
+            conn.execute("DROP TABLE trials_v1")
+        if 'sessions_v1' in tables:
+            conn.execute("DROP TABLE sessions_v1")
+        conn.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+    
+    if legacy:
+        conn.execute("VACUUM")
+        logging.info(f"✅ Veritabanı şeması v{DB_SCHEMA_VERSION}'ye taşındı")
+
 def init_database() -> str:
     """SQLite veritabanını hazırlar"""
     db_path = os.path.join(get_output_dir(), 'igt_sessions.db')
     conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            subject_id TEXT NOT NULL,
-            age INTEGER,
-            gender TEXT,
-            start_time TEXT NOT NULL,
-            end_time TEXT,
-            trials_completed INTEGER DEFAULT 0,
-            final_balance INTEGER,
-            net_change INTEGER,
-            csv_path TEXT,
-            png_path TEXT,
-            txt_path TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS trials (
-            session_id TEXT NOT NULL,
-            trial_number INTEGER NOT NULL,
-            deck_selected TEXT NOT NULL,
-            reaction_time REAL,
-            reward INTEGER,
-            penalty INTEGER,
-            net_outcome INTEGER,
-            total_balance INTEGER,
-            trial_timestamp TEXT,
-            PRIMARY KEY (session_id, trial_number),
-            FOREIGN KEY (session_id) REFERENCES sessions(session_id)
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    try:
+        migrate_database(conn)
+    finally:
+        conn.close()
     return db_path
 
-def save_session_to_db(session_meta: Dict, data_records: List[Dict], 
+def save_session_to_db(session_meta: Dict, trial_buffer: TrialBuffer, 
                        csv_path: str, png_path: str, txt_path: str):
     """Oturumu veritabanına kaydeder"""
     db_path = init_database()
@@ -501,43 +814,54 @@ def save_session_to_db(session_meta: Dict, data_records: List[Dict],
     cur = conn.cursor()
     
     try:
-        # Session kaydı
+        # Session kaydı (sid korunur)
         cur.execute("""
-            INSERT OR REPLACE INTO sessions (
+            INSERT INTO sessions (
                 session_id, subject_id, age, gender, start_time, end_time,
-                trials_completed, final_balance, net_change, csv_path, png_path, txt_path
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                trials_completed, final_balance, net_change, csv_path, png_path, txt_path,
+                t0_ns, schedule_seed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                subject_id = excluded.subject_id, age = excluded.age,
+                gender = excluded.gender, start_time = excluded.start_time,
+                end_time = excluded.end_time, trials_completed = excluded.trials_completed,
+                final_balance = excluded.final_balance, net_change = excluded.net_change,
+                csv_path = excluded.csv_path, png_path = excluded.png_path,
+                txt_path = excluded.txt_path, t0_ns = excluded.t0_ns,
+                schedule_seed = excluded.schedule_seed
         """, (
             session_meta["session_id"], session_meta["subject_id"],
             session_meta["age"], session_meta["gender"],
             session_meta["start_time"], session_meta["end_time"],
             session_meta["trials_completed"], session_meta["final_balance"],
-            session_meta["net_change"], csv_path, png_path, txt_path
+            session_meta["net_change"], csv_path, png_path, txt_path,
+            trial_buffer.t0_ns, trial_buffer.schedule_seed
         ))
+        sid = cur.execute("SELECT sid FROM sessions WHERE session_id = ?",
+                          (session_meta["session_id"],)).fetchone()[0]
         
         # Trial kayıtları
-        if data_records:
-            trial_rows = [
-                (session_meta["session_id"], rec["Trial_Number"], rec["Deck_Selected"],
-                 rec["Reaction_Time"], rec["Reward"], rec["Penalty"],
-                 rec["Net_Outcome"], rec["Total_Balance"], rec["Trial_Real_Time"])
-                for rec in data_records
-            ]
+        if len(trial_buffer):
             cur.executemany("""
-                INSERT OR REPLACE INTO trials (
-                    session_id, trial_number, deck_selected, reaction_time,
-                    reward, penalty, net_outcome, total_balance, trial_timestamp
+                INSERT OR REPLACE INTO trial_data (
+                    sid, trial_number, deck, reaction_time,
+                    reward, penalty, net_outcome, total_balance, t_ns
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, trial_rows)
+            """, trial_buffer.db_rows(sid))
+            v = trial_buffer.view
+            metrics = session_metrics(v['deck'], v['net_outcome'], v['reaction_time'], v['trial_number'])
+            store_metrics(conn, pd.DataFrame([metrics], index=[sid]))
         
         # Eski kayıtları temizle (200 limit)
-        cur.execute("SELECT session_id FROM sessions ORDER BY start_time DESC")
+        cur.execute("SELECT sid FROM sessions ORDER BY start_time DESC")
         rows = cur.fetchall()
         if len(rows) > Config.MAX_SESSIONS_STORED:
             stale_ids = [row[0] for row in rows[Config.MAX_SESSIONS_STORED:]]
             placeholders = ",".join("?" * len(stale_ids))
-            cur.execute(f"DELETE FROM trials WHERE session_id IN ({placeholders})", stale_ids)
-            cur.execute(f"DELETE FROM sessions WHERE session_id IN ({placeholders})", stale_ids)
+            cur.execute(f"DELETE FROM trial_data WHERE sid IN ({placeholders})", stale_ids)
+            cur.execute(f"DELETE FROM session_metrics WHERE sid IN ({placeholders})", stale_ids)
+            cur.execute(f"DELETE FROM model_fits WHERE sid IN ({placeholders})", stale_ids)
+            cur.execute(f"DELETE FROM sessions WHERE sid IN ({placeholders})", stale_ids)
         
         conn.commit()
         logging.info(f"✅ Oturum veritabanına kaydedildi: {session_meta['session_id']}")
@@ -546,6 +870,24 @@ def save_session_to_db(session_meta: Dict, data_records: List[Dict],
     finally:
         conn.close()
 
+def load_session_schedule(conn: sqlite3.Connection, session_id: str) -> Optional[Dict[str, List[int]]]:
+    """Kayıtlı oturumun deste çizelgesini tohumundan yeniden üretir (tohum yoksa None)
+
+    Ceza seti (TR/EN) oturumun kayıtlı ödüllerinden belirlenir.
+    """
+    row = conn.execute("""
+        SELECT s.schedule_seed, MAX(t.reward)
+        FROM sessions s
+        LEFT JOIN trial_data t ON t.sid = s.sid
+        WHERE s.session_id = ?
+        GROUP BY s.sid
+    """, (session_id,)).fetchone()
+    if row is None or row[0] is None:
+        return None
+    en_rewards = (LanguageConfig.EN["reward_bad"], LanguageConfig.EN["reward_good"])
+    lang_config = LanguageConfig.EN if row[1] in en_rewards else LanguageConfig.TR
+    return session_schedule(row[0], lang_config)
+
 # =============================================================================
 # ANALYSIS MODULE
 # =============================================================================
@@ -670,6 +1012,14 @@ def run_analysis(csv_path: str, subject_id: str, age: int, gender: str) -> Tuple
             deck_type = "Dezavantajlı" if deck in ['A', 'B'] else "Avantajlı"
             percentage = (count / len(df) * 100) if len(df) > 0 else 0
             f.write(f"Deste {deck} ({deck_type}): {count} seçim ({percentage:.1f}%)\n")
+        
+        f.write("\n" + "-" * 50 + "\n")
+        f.write("DAVRANIŞSAL METRİKLER\n")
+        f.write("-" * 50 + "\n")
+        metrics = session_metrics(df['Deck_Selected'], df['Net_Outcome'],
+                                  df['Reaction_Time'], df['Trial_Number'])
+        for line in format_summary(metrics):
+            f.write(line + "\n")
     
     logging.info(f"✅ Analiz tamamlandı: {png_path}")
     return png_path, txt_path
@@ -905,6 +1255,9 @@ class DataViewerScreen(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.session_data = []
+        self.file_index = None
+        self.thumbnail_cache = {}
         self.init_ui()
     
     def init_ui(self):
@@ -1010,7 +1363,31 @@ class DataViewerScreen(QWidget):
             }
         """)
         
-        layout.addWidget(self.table)
+        # Tablo + önizleme paneli
+        content_layout = QHBoxLayout()
+        content_layout.setSpacing(20)
+        content_layout.addWidget(self.table, 3)
+        
+        preview_layout = QVBoxLayout()
+        preview_title = QLabel(f"🖼️ {get_string('preview')}")
+        preview_title.setFont(QFont('Arial', 14, QFont.Weight.Bold))
+        preview_title.setStyleSheet(f"color: {Config.ACCENT_COLOR};")
+        preview_layout.addWidget(preview_title)
+        
+        self.preview_image = QLabel(get_string('no_preview'))
+        self.preview_image.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_image.setMinimumHeight(240)
+        self.preview_image.setStyleSheet("color: #95a5a6; border: 2px solid #4a5568; border-radius: 10px;")
+        preview_layout.addWidget(self.preview_image)
+        
+        self.preview_text = QPlainTextEdit()
+        self.preview_text.setReadOnly(True)
+        self.preview_text.setFont(QFont('Courier New', 10))
+        self.preview_text.setStyleSheet("background-color: #2d3436; color: white; border-radius: 10px;")
+        preview_layout.addWidget(self.preview_text)
+        
+        content_layout.addLayout(preview_layout, 2)
+        layout.addLayout(content_layout)
         
         # Aksiyon butonları
         action_layout = QHBoxLayout()
@@ -1082,27 +1459,35 @@ class DataViewerScreen(QWidget):
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
+            # Net IGT skoru [(C+D) - (A+B)] tek sorguda hesaplanır
             cursor.execute("""
-                SELECT session_id, subject_id, age, gender, 
-                       start_time, final_balance
-                FROM sessions
-                ORDER BY start_time DESC
+                SELECT s.session_id, s.subject_id, s.age, s.gender,
+                       s.start_time, s.final_balance,
+                       s.csv_path, s.png_path, s.txt_path,
+                       COALESCE(SUM(CASE WHEN t.deck IS NULL THEN 0 WHEN t.deck >= 2 THEN 1 ELSE -1 END), 0)
+                FROM sessions s
+                LEFT JOIN trial_data t ON t.sid = s.sid
+                GROUP BY s.sid
+                ORDER BY s.start_time DESC
             """)
             
             rows = cursor.fetchall()
             conn.close()
             
             self.table.setRowCount(len(rows))
-            self.session_data = []  # Subject ID'leri saklamak için
+            self.session_data = []  # Satır başına dosya yolları
+            self.file_index = None
             
             for i, row in enumerate(rows):
-                session_id, subject_id, age, gender, start_time, final_balance = row
+                (session_id, subject_id, age, gender, start_time, final_balance,
+                 csv_path, png_path, txt_path, net_score) = row
                 
-                # Subject ID'yi sakla
-                self.session_data.append(subject_id)
-                
-                # Net IGT skorunu hesapla
-                net_score = self.calculate_net_score(session_id)
+                self.session_data.append({
+                    'subject_id': subject_id,
+                    'csv': csv_path,
+                    'png': png_path,
+                    'txt': txt_path
+                })
                 
                 # Tarihi formatla
                 try:
@@ -1136,40 +1521,17 @@ class DataViewerScreen(QWidget):
             logging.error(f"Veri yükleme hatası: {e}")
             self.info_label.setText(f"❌ Veri yükleme hatası: {e}")
     
-    def calculate_net_score(self, session_id: int) -> int:
-        """Session için net IGT skorunu hesapla"""
-        try:
-            db_path = os.path.join(get_output_dir(), 'igt_sessions.db')
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT deck_selected FROM trials
-                WHERE session_id = ?
-            """, (session_id,))
-            
-            selections = [row[0] for row in cursor.fetchall()]
-            conn.close()
-            
-            advantageous = sum(1 for d in selections if d in ['C', 'D'])
-            disadvantageous = sum(1 for d in selections if d in ['A', 'B'])
-            
-            return advantageous - disadvantageous
-            
-        except Exception as e:
-            logging.error(f"Net score hesaplama hatası: {e}")
-            return 0
-    
     def on_selection_changed(self):
-        """Seçim değiştiğinde butonları aktifleştir"""
+        """Seçim değiştiğinde butonları aktifleştir ve önizlemeyi güncelle"""
         has_selection = len(self.table.selectedItems()) > 0
         self.open_csv_btn.setEnabled(has_selection)
         self.open_png_btn.setEnabled(has_selection)
         self.open_txt_btn.setEnabled(has_selection)
         self.open_folder_btn.setEnabled(has_selection)
+        self.update_preview()
     
-    def get_selected_subject_id(self) -> Optional[str]:
-        """Seçili satırdaki subject_id'yi al"""
+    def get_selected_session(self) -> Optional[Dict]:
+        """Seçili satırın oturum bilgilerini al"""
         selected_rows = self.table.selectionModel().selectedRows()
         if selected_rows and hasattr(self, 'session_data'):
             row = selected_rows[0].row()
@@ -1177,62 +1539,104 @@ class DataViewerScreen(QWidget):
                 return self.session_data[row]
         return None
     
+    def build_file_index(self) -> Dict[Tuple[str, str], str]:
+        """Çıktı klasörünü bir kez tarayıp (subject_id, tür) -> en son dosya eşlemesi kurar"""
+        kinds = {'_Analysis.png': 'png', '_Summary.txt': 'txt', '.csv': 'csv'}
+        index = {}
+        with os.scandir(get_output_dir()) as entries:
+            for entry in entries:
+                match = SESSION_FILE_PATTERN.match(entry.name)
+                if not match:
+                    continue
+                key = (match['subject_id'], kinds[match['suffix']])
+                if key not in index or entry.name > os.path.basename(index[key]):
+                    index[key] = entry.path
+        return index
+    
+    def resolve_artifact(self, session: Dict, kind: str) -> Optional[str]:
+        """Veritabanındaki dosya yolunu kullan, yoksa dosya indeksine başvur"""
+        path = session.get(kind)
+        if path and os.path.exists(path):
+            return path
+        if self.file_index is None:
+            self.file_index = self.build_file_index()
+        return self.file_index.get((session['subject_id'], kind))
+    
+    def get_thumbnail(self, png_path: str) -> Optional[QPixmap]:
+        """PNG için küçültülmüş önizlemeyi diskte önbellekten yükler veya bir kez üretir"""
+        if png_path in self.thumbnail_cache:
+            return self.thumbnail_cache[png_path]
+        
+        thumb_dir = os.path.join(get_output_dir(), Config.THUMBNAIL_DIR)
+        thumb_path = os.path.join(thumb_dir, os.path.basename(png_path))
+        if (not os.path.exists(thumb_path) or
+                os.path.getmtime(thumb_path) < os.path.getmtime(png_path)):
+            image = QImage(png_path)
+            if image.isNull():
+                return None
+            os.makedirs(thumb_dir, exist_ok=True)
+            image.scaledToWidth(Config.THUMBNAIL_WIDTH,
+                                Qt.TransformationMode.SmoothTransformation).save(thumb_path)
+        
+        pixmap = QPixmap(thumb_path)
+        if len(self.thumbnail_cache) >= Config.THUMBNAIL_CACHE_SIZE:
+            self.thumbnail_cache.pop(next(iter(self.thumbnail_cache)))
+        self.thumbnail_cache[png_path] = pixmap
+        return pixmap
+    
+    def update_preview(self):
+        """Seçili oturumun grafik ve özetini önizleme panelinde göster"""
+        session = self.get_selected_session()
+        pixmap = None
+        summary = ""
+        if session:
+            png_path = self.resolve_artifact(session, 'png')
+            if png_path:
+                pixmap = self.get_thumbnail(png_path)
+            txt_path = self.resolve_artifact(session, 'txt')
+            if txt_path:
+                with open(txt_path, 'r', encoding='utf-8') as f:
+                    summary = f.read()
+        
+        if pixmap:
+            self.preview_image.setPixmap(pixmap.scaled(
+                self.preview_image.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation))
+        else:
+            self.preview_image.setText(get_string('no_preview'))
+        self.preview_text.setPlainText(summary)
+    
     def open_csv(self):
         """CSV dosyasını aç"""
-        subject_id = self.get_selected_subject_id()
-        if subject_id:
-            csv_path = self.find_latest_file(subject_id, '.csv')
-            if csv_path:
-                self.open_file(csv_path)
+        self.open_artifact('csv')
     
     def open_png(self):
         """PNG grafiğini aç"""
-        subject_id = self.get_selected_subject_id()
-        if subject_id:
-            png_path = self.find_latest_file(subject_id, '_Analysis.png')
-            if png_path:
-                self.open_file(png_path)
+        self.open_artifact('png')
     
     def open_txt(self):
         """TXT özetini aç"""
-        subject_id = self.get_selected_subject_id()
-        if subject_id:
-            txt_path = self.find_latest_file(subject_id, '_Summary.txt')
-            if txt_path:
-                self.open_file(txt_path)
+        self.open_artifact('txt')
+    
+    def open_artifact(self, kind: str):
+        """Seçili oturumun dosyasını aç"""
+        session = self.get_selected_session()
+        if session:
+            path = self.resolve_artifact(session, kind)
+            if path:
+                self.open_file(path)
     
     def open_folder(self):
         """Sonuçlar klasörünü aç"""
-        output_dir = get_output_dir()
-        if sys.platform == 'darwin':  # macOS
-            os.system(f'open "{output_dir}"')
-        elif sys.platform == 'win32':  # Windows
-            os.startfile(output_dir)
-        else:  # Linux
-            os.system(f'xdg-open "{output_dir}"')
-    
-    def find_latest_file(self, subject_id: str, suffix: str) -> Optional[str]:
-        """Subject ID için en son dosyayı bul"""
-        output_dir = get_output_dir()
-        files = [f for f in os.listdir(output_dir) if f.startswith(f"IGT_{subject_id}") and f.endswith(suffix)]
-        if files:
-            files.sort(reverse=True)
-            return os.path.join(output_dir, files[0])
-        return None
+        QDesktopServices.openUrl(QUrl.fromLocalFile(get_output_dir()))
     
     def open_file(self, filepath: str):
         """Dosyayı sistem varsayılan uygulamasıyla aç"""
-        try:
-            if sys.platform == 'darwin':  # macOS
-                os.system(f'open "{filepath}"')
-            elif sys.platform == 'win32':  # Windows
-                os.startfile(filepath)
-            else:  # Linux
-                os.system(f'xdg-open "{filepath}"')
+        if QDesktopServices.openUrl(QUrl.fromLocalFile(filepath)):
             logging.info(f"Dosya açıldı: {filepath}")
-        except Exception as e:
-            logging.error(f"Dosya açma hatası: {e}")
-            QMessageBox.warning(self, "Hata", f"Dosya açılamadı:\n{e}")
+        else:
+            logging.error(f"Dosya açma hatası: {filepath}")
+            QMessageBox.warning(self, "Hata", f"Dosya açılamadı:\n{filepath}")
 
 # =============================================================================
 # PyQt6 GUI - WELCOME SCREEN
@@ -1357,9 +1761,10 @@ class SyncCountdownScreen(QWidget):
     """Shimmer senkronizasyon countdown ekranı"""
     sync_complete = pyqtSignal(datetime)
     
-    def __init__(self):
+    def __init__(self, markers: Optional[MarkerSender] = None):
         super().__init__()
         self.sync_time = None
+        self.markers = markers
         self.init_ui()
     
     def init_ui(self):
@@ -1419,7 +1824,7 @@ class SyncCountdownScreen(QWidget):
         """Countdown başlat"""
         self.start_btn.setEnabled(False)
         self.countdown = 3
-        self.timer = QTimer()
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_countdown)
         self.timer.start(1000)
         
@@ -1438,13 +1843,19 @@ class SyncCountdownScreen(QWidget):
             
             # Sync timestamp kaydet
             self.sync_time = datetime.now()
+            if self.markers:
+                self.markers.emit('sync')
             logging.info("="*60)
             logging.info(f"🔄 SYNC_MARKER: {self.sync_time.isoformat()}")
             logging.info(f"   Timestamp: {self.sync_time.strftime('%Y-%m-%d %H:%M:%S.%f')}")
             logging.info("="*60)
         else:
             self.timer.stop()
-            QTimer.singleShot(1500, lambda: self.sync_complete.emit(self.sync_time))
+            QTimer.singleShot(1500, self.emit_sync_complete)
+    
+    def emit_sync_complete(self):
+        """Sync zamanını bildir (ekran silinmişse zamanlayıcı iptal olur)"""
+        self.sync_complete.emit(self.sync_time)
 
 # =============================================================================
 # PyQt6 GUI - INSTRUCTION SCREEN
@@ -1503,21 +1914,169 @@ class InstructionScreen(QWidget):
         
         self.setLayout(layout)
 
+# =============================================================================
+# PyQt6 GUI - PRE-RENDERED EXPERIMENT ASSETS
+# =============================================================================
+class RenderAssets:
+    """Deneme sırasında kullanılan kart ve geri bildirim görselleri.
+
+    Kart yüzleri (aktif/hover/pasif) ve her (ödül, ceza) çifti için geri
+    bildirim paneli oturum başında bir kez QPixmap'e çizilir; deneme sırasında
+    yalnızca pixmap değiştirilir, stylesheet yeniden ayrıştırılmaz.
+    Önbellek dil, ekran ölçeği ve boyutlara göre anahtarlanır.
+    """
+    _cache: Dict[Tuple, 'RenderAssets'] = {}
+    
+    CARD_STATES = ('active', 'hover', 'disabled')
+    
+    def __init__(self, decks: List[Deck], dpr: float):
+        self.dpr = dpr
+        self.cards = {
+            deck.name: {state: self.render_card(deck.name, Config.CARD_COLORS[deck.name], state)
+                        for state in self.CARD_STATES}
+            for deck in decks
+        }
+        self.feedback = {
+            (deck.reward, penalty): self.render_feedback(deck.reward, penalty)
+            for deck in decks for penalty in set(deck.schedule)
+        }
+        self.blank_feedback = self.new_pixmap(*Config.FEEDBACK_SIZE)
+    
+    @classmethod
+    def for_session(cls, decks: List[Deck]) -> 'RenderAssets':
+        """Geçerli dil ve ekran için önbellekteki görselleri döndürür"""
+        screen = QApplication.primaryScreen()
+        dpr = screen.devicePixelRatio() if screen else 1.0
+        key = (current_lang, dpr, Config.CARD_SIZE, Config.FEEDBACK_SIZE,
+               tuple((deck.name, deck.reward, tuple(sorted(set(deck.schedule)))) for deck in decks))
+        if key not in cls._cache:
+            cls._cache[key] = cls(decks, dpr)
+        return cls._cache[key]
+    
+    def new_pixmap(self, width: int, height: int) -> QPixmap:
+        pixmap = QPixmap(round(width * self.dpr), round(height * self.dpr))
+        pixmap.setDevicePixelRatio(self.dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        return pixmap
+    
+    def render_card(self, deck_name: str, color: str, state: str) -> QPixmap:
+        """Kart yüzünü çizer"""
+        width, height = Config.CARD_SIZE
+        pixmap = self.new_pixmap(width, height)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        
+        border_width, border_color = (5, Config.CARD_HOVER_COLOR) if state == 'hover' else (3, 'white')
+        if state == 'disabled':
+            painter.setOpacity(0.45)
+        inset = border_width / 2
+        painter.setPen(QPen(QColor(border_color), border_width))
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(QRectF(inset, inset, width - border_width, height - border_width), 15, 15)
+        
+        painter.setPen(QColor('white'))
+        painter.setFont(QFont('Arial', 48, QFont.Weight.Bold))
+        painter.drawText(QRectF(0, 0, width, height), Qt.AlignmentFlag.AlignCenter, deck_name)
+        painter.end()
+        return pixmap
+    
+    def render_feedback(self, reward: int, penalty: int) -> QPixmap:
+        """Ödül/ceza/net satırlarından oluşan geri bildirim panelini çizer"""
+        currency = get_lang_config()['currency']
+        net = reward + penalty
+        
+        lines = [(f"✅ {get_string('reward').upper()}: +{reward:,} {currency}",
+                  Config.SUCCESS_COLOR, 16)]
+        if penalty < 0:
+            lines.append((f"❌ {get_string('penalty').upper()}: {penalty:,} {currency}",
+                          Config.ERROR_COLOR, 16))
+        else:
+            lines.append((f"✨ {get_string('no_penalty').upper()}", Config.MUTED_COLOR, 16))
+        net_color = Config.SUCCESS_COLOR if net >= 0 else Config.ERROR_COLOR
+        net_symbol = "📈" if net >= 0 else "📉"
+        lines.append((f"{net_symbol} {get_string('net').upper()}: {net:+,} {currency}", net_color, 18))
+        
+        width, height = Config.FEEDBACK_SIZE
+        pixmap = self.new_pixmap(width, height)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setPen(QPen(QColor(Config.ACCENT_COLOR), 2))
+        painter.setBrush(QColor(Config.FEEDBACK_BG_COLOR))
+        painter.drawRoundedRect(QRectF(1, 1, width - 2, height - 2), 10, 10)
+        
+        row_height = (height - 20) / len(lines)
+        for i, (text, color, size) in enumerate(lines):
+            painter.setPen(QColor(color))
+            painter.setFont(QFont('Arial', size, QFont.Weight.Bold))
+            painter.drawText(QRectF(0, 10 + i * row_height, width, row_height),
+                             Qt.AlignmentFlag.AlignCenter, text)
+        painter.end()
+        return pixmap
+
+class CardView(QLabel):
+    """Önceden çizilmiş pixmap'lerle gösterilen kart destesi.
+
+    Aktif/pasif geçişi setEnabled yerine pixmap değişimiyle yapılır; böylece
+    widget yeniden polish edilmez.
+    """
+    clicked = pyqtSignal()
+    
+    def __init__(self, pixmaps: Dict[str, QPixmap]):
+        super().__init__()
+        self.pixmaps = pixmaps
+        self.active = False
+        self.hovered = False
+        self.setFixedSize(*Config.CARD_SIZE)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setPixmap(self.pixmaps['disabled'])
+    
+    def set_active(self, active: bool):
+        self.active = active
+        self.refresh()
+    
+    def refresh(self):
+        if not self.active:
+            self.setPixmap(self.pixmaps['disabled'])
+        else:
+            self.setPixmap(self.pixmaps['hover' if self.hovered else 'active'])
+    
+    def enterEvent(self, event):
+        self.hovered = True
+        self.refresh()
+        super().enterEvent(event)
+    
+    def leaveEvent(self, event):
+        self.hovered = False
+        self.refresh()
+        super().leaveEvent(event)
+    
+    def mousePressEvent(self, event):
+        if self.active and event.button() == Qt.MouseButton.LeftButton:
+            self.clicked.emit()
+        super().mousePressEvent(event)
+
 # =============================================================================
 # PyQt6 GUI - EXPERIMENT SCREEN
 # =============================================================================
 class ExperimentScreen(QWidget):
     """Ana deney ekranı"""
-    experiment_complete = pyqtSignal(list)
+    experiment_complete = pyqtSignal(object)
     
-    def __init__(self, participant_info: Dict, sync_timestamp: datetime = None):
+    def __init__(self, participant_info: Dict, sync_timestamp: datetime = None,
+                 markers: Optional[MarkerSender] = None, schedule_seed: Optional[int] = None):
         super().__init__()
         self.participant_info = participant_info
+        self.markers = markers
         self.trial_num = 0
         self.balance = Config.START_BALANCE
-        self.data_records = []
         self.start_time = sync_timestamp if sync_timestamp else datetime.now()
         self.sync_timestamp = sync_timestamp
+        # Çizelge tohumu: verilmezse yeni üretilir ve oturumla birlikte saklanır
+        self.schedule_seed = new_schedule_seed() if schedule_seed is None else schedule_seed
+        self.trial_buffer = TrialBuffer(participant_info, self.start_time, sync_timestamp,
+                                        schedule_seed=self.schedule_seed)
         
         # Log experiment start with sync info
         logging.info("\n" + "="*60)
@@ -1526,6 +2085,7 @@ class ExperimentScreen(QWidget):
         logging.info(f"   Age: {participant_info['age']}")
         logging.info(f"   Gender: {participant_info['gender']}")
         logging.info(f"   Start Time: {self.start_time.isoformat()}")
+        logging.info(f"   Schedule Seed: {self.schedule_seed}")
         if sync_timestamp:
             logging.info(f"   ✅ Synced with Shimmer countdown")
         logging.info("="*60 + "\n")
@@ -1538,10 +2098,10 @@ class ExperimentScreen(QWidget):
         penalties_d_lang = lang_config["penalty_d"] * 10
         
         self.decks = [
-            Deck('A', Config.REWARD_BAD_DECK, penalties_a_lang),
-            Deck('B', Config.REWARD_BAD_DECK, penalties_b_lang),
-            Deck('C', Config.REWARD_GOOD_DECK, penalties_c_lang),
-            Deck('D', Config.REWARD_GOOD_DECK, penalties_d_lang)
+            Deck('A', Config.REWARD_BAD_DECK, penalties_a_lang, self.schedule_seed),
+            Deck('B', Config.REWARD_BAD_DECK, penalties_b_lang, self.schedule_seed),
+            Deck('C', Config.REWARD_GOOD_DECK, penalties_c_lang, self.schedule_seed),
+            Deck('D', Config.REWARD_GOOD_DECK, penalties_d_lang, self.schedule_seed)
         ]
         
         self.init_ui()
@@ -1599,90 +2159,48 @@ class ExperimentScreen(QWidget):
         
         main_layout.addSpacing(20)
         
-        # Cards
+        # Cards (pre-rendered)
+        self.assets = RenderAssets.for_session(self.decks)
         cards_layout = QHBoxLayout()
         cards_layout.setSpacing(20)
+        cards_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         self.card_buttons = []
-        for i, (deck_name, color) in enumerate([('A', Config.CARD_COLORS['A']),
-                                                  ('B', Config.CARD_COLORS['B']),
-                                                  ('C', Config.CARD_COLORS['C']),
-                                                  ('D', Config.CARD_COLORS['D'])]):
-            btn = QPushButton(deck_name)
-            btn.setFont(QFont('Arial', 48, QFont.Weight.Bold))
-            btn.setFixedSize(200, 300)
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {color};
-                    color: white;
-                    border: 3px solid white;
-                    border-radius: 15px;
-                }}
-                QPushButton:hover {{
-                    border: 5px solid #ffeaa7;
-                    transform: scale(1.05);
-                }}
-                QPushButton:pressed {{
-                    background-color: {color}dd;
-                }}
-            """)
-            btn.clicked.connect(lambda checked, idx=i: self.card_selected(idx))
-            self.card_buttons.append(btn)
-            cards_layout.addWidget(btn)
+        for i, deck in enumerate(self.decks):
+            card = CardView(self.assets.cards[deck.name])
+            card.clicked.connect(lambda idx=i: self.card_selected(idx))
+            self.card_buttons.append(card)
+            cards_layout.addWidget(card)
         
         main_layout.addLayout(cards_layout)
         
         main_layout.addSpacing(30)
         
-        # Feedback area
-        self.feedback_widget = QFrame()
-        self.feedback_widget.setFixedHeight(150)
-        self.feedback_widget.setStyleSheet("""
-            QFrame {
-                background-color: #2d3436;
-                border-radius: 10px;
-                border: 2px solid #f1c40f;
-            }
-        """)
-        self.feedback_widget.setVisible(False)
-        
-        feedback_layout = QVBoxLayout()
-        
-        self.reward_label = QLabel()
-        self.reward_label.setFont(QFont('Arial', 16, QFont.Weight.Bold))
-        self.reward_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        feedback_layout.addWidget(self.reward_label)
-        
-        self.penalty_label = QLabel()
-        self.penalty_label.setFont(QFont('Arial', 16, QFont.Weight.Bold))
-        self.penalty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        feedback_layout.addWidget(self.penalty_label)
-        
-        self.net_label = QLabel()
-        self.net_label.setFont(QFont('Arial', 18, QFont.Weight.Bold))
-        self.net_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        feedback_layout.addWidget(self.net_label)
-        
-        self.feedback_widget.setLayout(feedback_layout)
-        main_layout.addWidget(self.feedback_widget)
+        # Feedback area (pre-rendered, boş pixmap ile gizlenir)
+        self.feedback_label = QLabel()
+        self.feedback_label.setFixedSize(*Config.FEEDBACK_SIZE)
+        self.feedback_label.setPixmap(self.assets.blank_feedback)
+        main_layout.addWidget(self.feedback_label, alignment=Qt.AlignmentFlag.AlignCenter)
         
         main_layout.addStretch()
         
         self.setLayout(main_layout)
         
         # Start first trial with delay to ensure UI is ready
-        QTimer.singleShot(100, self.start_trial)
+        QTimer.singleShot(Config.FIRST_TRIAL_DELAY_MS, self.start_trial)
     
     def start_trial(self):
         """Yeni deneme başlat"""
         self.trial_start_time = datetime.now()
         self.enable_cards(True)
+        if self.markers:
+            self.markers.emit('cards_on', self.trial_num + 1)
         logging.info(f"▶️ Trial {self.trial_num + 1} başladı, kartlar aktif")
     
     def enable_cards(self, enabled: bool):
         """Kart butonlarını aktif/pasif yap"""
-        for btn in self.card_buttons:
-            btn.setEnabled(enabled)
+        for card in self.card_buttons:
+            card.set_active(enabled)
     
     def card_selected(self, deck_idx: int):
         """Kart seçildiğinde"""
@@ -1699,31 +2217,15 @@ class ExperimentScreen(QWidget):
         
         # Draw card
         deck = self.decks[deck_idx]
+        if self.markers:
+            self.markers.emit(f'choice_{deck.name}', self.trial_num + 1, deck.name)
         reward, penalty, net = deck.draw_card()
         self.balance += net
         self.trial_num += 1
         
         # Record data
-        trial_data = {
-            'Subject_ID': self.participant_info['subject_id'],
-            'Subject_Age': self.participant_info['age'],
-            'Subject_Gender': self.participant_info['gender'],
-            'Experiment_Start': self.start_time.isoformat(timespec='seconds'),
-            'Trial_Number': self.trial_num,
-            'Deck_Selected': deck.name,
-            'Reaction_Time': round(reaction_time, 3),
-            'Reward': reward,
-            'Penalty': penalty,
-            'Net_Outcome': net,
-            'Total_Balance': self.balance,
-            'Trial_Real_Time': datetime.now().isoformat(timespec='seconds')
-        }
-        
-        # İlk trial'a sync timestamp ekle
-        if self.trial_num == 1 and self.sync_timestamp:
-            trial_data['Sync_Timestamp'] = self.sync_timestamp.isoformat(timespec='milliseconds')
-        
-        self.data_records.append(trial_data)
+        self.trial_buffer.append(deck_idx, reaction_time, reward, penalty, net,
+                                 self.balance, datetime.now())
         
         # Disable cards
         self.enable_cards(False)
@@ -1739,40 +2241,29 @@ class ExperimentScreen(QWidget):
         
         # Check if complete
         if self.trial_num >= Config.MAX_TRIALS:
-            QTimer.singleShot(2000, self.complete_experiment)
+            QTimer.singleShot(Config.FEEDBACK_DURATION_MS, self.complete_experiment)
         else:
-            QTimer.singleShot(2000, self.hide_feedback)
+            QTimer.singleShot(Config.FEEDBACK_DURATION_MS, self.hide_feedback)
     
     def show_feedback(self, reward: int, penalty: int, net: int):
         """Geri bildirimi göster"""
-        currency = get_lang_config()['currency']
-        
-        self.reward_label.setText(f"✅ {get_string('reward').upper()}: +{reward:,} {currency}")
-        self.reward_label.setStyleSheet(f"color: {Config.SUCCESS_COLOR};")
-        
-        if penalty < 0:
-            self.penalty_label.setText(f"❌ {get_string('penalty').upper()}: {penalty:,} {currency}")
-            self.penalty_label.setStyleSheet(f"color: {Config.ERROR_COLOR};")
-        else:
-            self.penalty_label.setText(f"✨ {get_string('no_penalty').upper()}")
-            self.penalty_label.setStyleSheet("color: #95a5a6;")
-        
-        net_color = Config.SUCCESS_COLOR if net >= 0 else Config.ERROR_COLOR
-        net_symbol = "📈" if net >= 0 else "📉"
-        self.net_label.setText(f"{net_symbol} {get_string('net').upper()}: {net:+,} {currency}")
-        self.net_label.setStyleSheet(f"color: {net_color};")
-        
-        self.feedback_widget.setVisible(True)
+        self.feedback_label.setPixmap(self.assets.feedback[(reward, penalty)])
+        if self.markers:
+            self.markers.emit('feedback_on', self.trial_num)
     
     def hide_feedback(self):
         """Geri bildirimi gizle"""
-        self.feedback_widget.setVisible(False)
+        self.feedback_label.setPixmap(self.assets.blank_feedback)
+        if self.markers:
+            self.markers.emit('feedback_off', self.trial_num)
         self.start_trial()
     
     def complete_experiment(self):
         """Deneyi tamamla"""
         logging.info("✅ Deney tamamlandı!")
-        self.experiment_complete.emit(self.data_records)
+        if self.markers:
+            self.markers.emit('session_end', self.trial_num)
+        self.experiment_complete.emit(self.trial_buffer)
 
 # =============================================================================
 # PyQt6 GUI - COMPLETION SCREEN
@@ -1901,6 +2392,19 @@ class IGTMainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.setCentralWidget(self.stacked_widget)
         
+        # Oturum ekranları (her oturumda yenisiyle değiştirilir)
+        self.welcome_screen = None
+        self.instruction_screen = None
+        self.sync_screen = None
+        self.experiment_screen = None
+        self.completion_screen = None
+        self.sync_timestamp = None
+        
+        # Harici kayıt cihazlarına event marker (uygulama boyunca tek gönderici thread)
+        self.markers = MarkerSender.from_config(
+            Config.MARKER_UDP, Config.MARKER_SERIAL_PORT, Config.MARKER_LSL
+        )
+        
         # Apply dark theme first
         self.apply_dark_theme()
         
@@ -1925,11 +2429,6 @@ class IGTMainWindow(QMainWindow):
         self.data_viewer_screen.back_signal.connect(self.show_main_menu)
         self.stacked_widget.addWidget(self.data_viewer_screen)
         
-        # Welcome Screen
-        self.welcome_screen = WelcomeScreen()
-        self.welcome_screen.start_signal.connect(self.show_instructions)
-        self.stacked_widget.addWidget(self.welcome_screen)
-        
         # Show main menu
         self.show_main_menu()
     
@@ -1959,22 +2458,33 @@ class IGTMainWindow(QMainWindow):
         """Ana menüyü göster"""
         self.stacked_widget.setCurrentWidget(self.main_menu_screen)
     
+    def replace_screen(self, attr: str, screen: QWidget):
+        """Aynı roldeki eski ekranı kaldırıp yenisini ekler ve gösterir"""
+        self.discard_screen(attr)
+        setattr(self, attr, screen)
+        self.stacked_widget.addWidget(screen)
+        self.stacked_widget.setCurrentWidget(screen)
+    
+    def discard_screen(self, attr: str):
+        """Ekranı yığından kaldırır ve zamanlayıcıları/kayıtlarıyla birlikte siler"""
+        screen = getattr(self, attr, None)
+        if screen is not None:
+            self.stacked_widget.removeWidget(screen)
+            screen.deleteLater()
+            setattr(self, attr, None)
+    
+    def discard_session_screens(self):
+        """Tamamlanan oturumun ara ekranlarını bellekten kaldırır"""
+        for attr in ('instruction_screen', 'sync_screen', 'experiment_screen'):
+            self.discard_screen(attr)
+        self.sync_timestamp = None
+    
     def show_welcome(self):
         """Katılımcı bilgi ekranını göster"""
         # Yeni bir welcome screen oluştur (temiz ID için)
-        self.welcome_screen = WelcomeScreen()
-        self.welcome_screen.start_signal.connect(self.show_instructions)
-        
-        # Eski welcome screen'i kaldır ve yenisini ekle
-        for i in range(self.stacked_widget.count()):
-            widget = self.stacked_widget.widget(i)
-            if isinstance(widget, WelcomeScreen) and widget != self.welcome_screen:
-                self.stacked_widget.removeWidget(widget)
-                widget.deleteLater()
-                break
-        
-        self.stacked_widget.addWidget(self.welcome_screen)
-        self.stacked_widget.setCurrentWidget(self.welcome_screen)
+        welcome_screen = WelcomeScreen()
+        welcome_screen.start_signal.connect(self.show_instructions)
+        self.replace_screen('welcome_screen', welcome_screen)
     
     def show_data_viewer(self):
         """Veri görüntüleme ekranını göster"""
@@ -1987,15 +2497,13 @@ class IGTMainWindow(QMainWindow):
         
         instruction_screen = InstructionScreen()
         instruction_screen.continue_signal.connect(self.show_sync_screen)
-        self.stacked_widget.addWidget(instruction_screen)
-        self.stacked_widget.setCurrentWidget(instruction_screen)
+        self.replace_screen('instruction_screen', instruction_screen)
     
     def show_sync_screen(self):
         """Shimmer senkronizasyon ekranını göster"""
-        sync_screen = SyncCountdownScreen()
+        sync_screen = SyncCountdownScreen(self.markers)
         sync_screen.sync_complete.connect(self.start_experiment_with_sync)
-        self.stacked_widget.addWidget(sync_screen)
-        self.stacked_widget.setCurrentWidget(sync_screen)
+        self.replace_screen('sync_screen', sync_screen)
     
     def start_experiment_with_sync(self, sync_time: datetime):
         """Deneyi sync timestamp ile başlat"""
@@ -2004,22 +2512,26 @@ class IGTMainWindow(QMainWindow):
     
     def start_experiment(self):
         """Deneyi başlat"""
-        sync_ts = getattr(self, 'sync_timestamp', None)
-        self.experiment_screen = ExperimentScreen(self.participant_info, sync_ts)
-        self.experiment_screen.experiment_complete.connect(self.complete_experiment)
-        self.stacked_widget.addWidget(self.experiment_screen)
-        self.stacked_widget.setCurrentWidget(self.experiment_screen)
+        sync_ts = self.sync_timestamp
+        experiment_screen = ExperimentScreen(self.participant_info, sync_ts, self.markers)
+        experiment_screen.experiment_complete.connect(self.complete_experiment)
+        self.replace_screen('experiment_screen', experiment_screen)
     
-    def complete_experiment(self, data_records: List[Dict]):
+    def complete_experiment(self, trial_buffer: TrialBuffer):
         """Deneyi tamamla ve sonuçları kaydet"""
         # Save CSV
-        df = pd.DataFrame(data_records)
+        df = trial_buffer.to_dataframe()
         output_dir = get_output_dir()
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         filename = f"IGT_{self.participant_info['subject_id']}_{timestamp}"
         csv_path = os.path.join(output_dir, f"{filename}.csv")
         df.to_csv(csv_path, index=False)
         
+        # Marker gönderim kayıtları (olay ve gönderim zamanları)
+        if self.markers:
+            self.markers.save_log(os.path.join(output_dir, f"{filename}_Markers.csv"))
+            self.markers.reset()
+        
         # Run analysis
         png_path, txt_path = run_analysis(
             csv_path,
@@ -2029,19 +2541,25 @@ class IGTMainWindow(QMainWindow):
         )
         
         # Save to database
-        final_balance = data_records[-1]['Total_Balance']
+        final_balance = trial_buffer.final_balance
         session_meta = {
             "session_id": filename,
             "subject_id": self.participant_info['subject_id'],
             "age": self.participant_info['age'],
             "gender": self.participant_info['gender'],
-            "start_time": data_records[0]['Experiment_Start'],
+            "start_time": trial_buffer.start_time.isoformat(timespec='seconds'),
             "end_time": datetime.now().isoformat(timespec='seconds'),
-            "trials_completed": len(data_records),
+            "trials_completed": len(trial_buffer),
             "final_balance": final_balance,
             "net_change": final_balance - Config.START_BALANCE
         }
-        save_session_to_db(session_meta, data_records, csv_path, png_path, txt_path)
+        save_session_to_db(session_meta, trial_buffer, csv_path, png_path, txt_path)
+        
+        # Merkezi toplama sunucusuna arka planda gönder (deney akışını bekletmez)
+        if Config.COLLECTION_URL:
+            from collection_server import start_background_push
+            start_background_push(init_database(), Config.COLLECTION_URL,
+                                  Config.STATION_NAME, Config.COLLECTION_TOKEN)
         
         # Show completion screen
         completion_screen = CompletionScreen(
@@ -2050,8 +2568,14 @@ class IGTMainWindow(QMainWindow):
             png_path
         )
         completion_screen.close_signal.connect(self.show_main_menu)
-        self.stacked_widget.addWidget(completion_screen)
-        self.stacked_widget.setCurrentWidget(completion_screen)
+        self.replace_screen('completion_screen', completion_screen)
+        self.discard_session_screens()
+    
+    def closeEvent(self, event):
+        """Pencere kapanırken marker gönderici thread'i durdur"""
+        if self.markers:
+            self.markers.close()
+        super().closeEvent(event)
 
 # =============================================================================
 # MAIN
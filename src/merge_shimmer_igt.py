@@ -13,6 +13,27 @@ import numpy as np
 from datetime import datetime, timedelta
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from shimmer_eda import decompose_eda, trial_phasic_metrics
+from shimmer_preprocess import preprocess_shimmer, trial_quality
+from shimmer_ppg import detect_beats, trial_cardiac_features, CARDIAC_BANDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsiyonel (etiketli sürekli çıktı için)
+    pa = None
+    pq = None
+
+# ExperimentScreen geri bildirimi 2 sn gösterir, ardından kartlar yeniden aktif olur
+FEEDBACK_SECONDS = 2.0
+PHASES = ('iti', 'pre_choice', 'feedback')
+
+# SCR pencereleri (seçime göre, sn): baseline [-2, 0), yanıt [1, 5] (SCR latency)
+SCR_BASELINE_WINDOW = (-2.0, 0.0)
+SCR_RESPONSE_WINDOW = (1.0, 5.0)
 
 def load_igt_data(igt_csv_path):
     """IGT CSV dosyasını yükler"""
@@ -29,20 +50,183 @@ def load_shimmer_data(shimmer_csv_path):
     print(f"✅ {len(df)} Shimmer sample yüklendi")
     return df
 
-def merge_data(igt_df, shimmer_df, sync_offset_seconds=0):
+def load_sync_points(sync_csv_path):
     """
-    IGT ve Shimmer verilerini birleştirir
-    
+    Ek senkronizasyon noktalarını yükler
+
+    Beklenen sütunlar: Shimmer_Time_s (sensör saati, sn), PC_Time (ISO zaman)
+    """
+    print(f"📁 Sync noktaları yükleniyor: {sync_csv_path}")
+    df = pd.read_csv(sync_csv_path)
+    shimmer_s = df['Shimmer_Time_s'].to_numpy(dtype=np.float64)
+    pc_ns = pd.to_datetime(df['PC_Time']).to_numpy().astype('datetime64[ns]').view(np.int64)
+    print(f"✅ {len(df)} sync noktası yüklendi")
+    return shimmer_s, pc_ns
+
+def find_signal_columns(shimmer_df):
+    """GSR, PPG ve ECG sütunlarını bulur ({'GSR': sütun, ...}, her türden ilki)"""
+    columns = {}
+    for col in shimmer_df.columns:
+        if 'GSR' not in columns and ('GSR' in col or 'Skin_Conductance' in col):
+            columns['GSR'] = col
+        elif 'PPG' not in columns and 'PPG' in col:
+            columns['PPG'] = col
+        elif 'ECG' not in columns and 'ECG' in col:
+            columns['ECG'] = col
+    return columns
+
+def find_marker_column(shimmer_df):
+    """Shimmer kaydındaki marker/event kanalını bulur"""
+    for col in shimmer_df.columns:
+        if 'marker' in col.lower() or 'event' in col.lower():
+            return col
+    return None
+
+def marker_sync_points(shimmer_df, time_col, markers_csv_path):
+    """
+    Shimmer marker kanalındaki tetikleri IGT _Markers.csv kayıtlarıyla eşleştirir
+
+    Kanalda sıfırdan farklı değere geçiş anları tetik kabul edilir; her tetik,
+    aynı koda sahip bir sonraki gönderilmiş marker ile sırayla eşlenir.
+    """
+    marker_col = find_marker_column(shimmer_df)
+    if marker_col is None or not os.path.exists(markers_csv_path):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    channel = shimmer_df[marker_col].fillna(0).to_numpy(dtype=np.int64)
+    onsets = np.flatnonzero((channel != 0) & (np.r_[0, channel[:-1]] == 0))
+    onset_codes = channel[onsets]
+    onset_times = shimmer_df[time_col].to_numpy(dtype=np.float64)[onsets]
+
+    markers = pd.read_csv(markers_csv_path).drop_duplicates('Seq').sort_values('Seq')
+    codes = markers['Code'].to_numpy(dtype=np.int64)
+    # time.time_ns() (UTC) → IGT CSV'lerindeki yerel saat
+    wall_ns = markers['Wall_Time_ns'].to_numpy(dtype=np.int64)
+    local_ns = wall_ns + np.array([time.localtime(ns // 10**9).tm_gmtoff for ns in wall_ns],
+                                  dtype=np.int64) * 10**9
+
+    shimmer_s, pc_ns = [], []
+    j = 0
+    for t, code in zip(onset_times, onset_codes):
+        while j < len(codes) and codes[j] != code:
+            j += 1
+        if j == len(codes):
+            break
+        shimmer_s.append(t)
+        pc_ns.append(local_ns[j])
+        j += 1
+    print(f"✅ Marker kanalı '{marker_col}': {len(onsets)} tetik, {len(shimmer_s)} eşleşme")
+    return np.array(shimmer_s, dtype=np.float64), np.array(pc_ns, dtype=np.int64)
+
+def gather_sync_points(shimmer_df, markers_csv_path, sync_csv_path=None):
+    """Sync noktası dosyası ve marker kanalındaki ek sync noktalarını birleştirir"""
+    point_sets = []
+    if sync_csv_path:
+        point_sets.append(load_sync_points(sync_csv_path))
+    if 'Time (s)' not in shimmer_df.columns and 'Timestamp (ms)' in shimmer_df.columns:
+        shimmer_df['Time (s)'] = shimmer_df['Timestamp (ms)'] / 1000.0
+    if 'Time (s)' in shimmer_df.columns:
+        point_sets.append(marker_sync_points(shimmer_df, 'Time (s)', markers_csv_path))
+    if not point_sets:
+        return None
+    return (np.concatenate([p[0] for p in point_sets]),
+            np.concatenate([p[1] for p in point_sets]))
+
+def fit_clock_model(shimmer_s, pc_ns, piecewise=False):
+    """
+    Shimmer saatinden PC saatine doğrusal (veya parçalı doğrusal) saat modeli kurar
+
+    pc = intercept + slope * shimmer; slope - 1 saat kaymasıdır (drift).
+    Parçalı modelde sync noktaları arasında doğrusal enterpolasyon yapılır.
+
     Args:
-        igt_df: IGT DataFrame
-        shimmer_df: Shimmer DataFrame
-        sync_offset_seconds: Shimmer başlangıç offset (saniye)
-    
+        shimmer_s: Sync noktalarının Shimmer zamanları (sn)
+        pc_ns: Aynı noktaların PC zamanları (epoch ns, yerel saat)
+        piecewise: En az 3 nokta varsa parçalı model kullan
+
     Returns:
-        Birleştirilmiş DataFrame
+        Model sözlüğü (katsayılar, drift_ppm, artık istatistikleri)
     """
-    print("\n🔄 Veriler birleştiriliyor...")
-    
+    shimmer_s = np.asarray(shimmer_s, dtype=np.float64)
+    pc_ns = np.asarray(pc_ns, dtype=np.int64)
+    shimmer_s, unique_idx = np.unique(shimmer_s, return_index=True)
+    pc_ns = pc_ns[unique_idx]
+
+    # Hassasiyet için ilk noktaya göre göreli saniye
+    ref_ns = int(pc_ns[0])
+    pc_s = (pc_ns - ref_ns) / 1e9
+
+    if len(shimmer_s) == 1:
+        slope, intercept = 1.0, pc_s[0] - shimmer_s[0]
+    else:
+        slope, intercept = np.polyfit(shimmer_s, pc_s, 1)
+    residuals_ms = (pc_s - (intercept + slope * shimmer_s)) * 1000
+
+    model = {
+        'ref_ns': ref_ns,
+        'slope': float(slope),
+        'intercept': float(intercept),
+        'drift_ppm': float((slope - 1) * 1e6),
+        'n_points': len(shimmer_s),
+        'residual_rms_ms': float(np.sqrt(np.mean(residuals_ms ** 2))),
+        'residual_max_ms': float(np.max(np.abs(residuals_ms))),
+        'knots': None,
+    }
+
+    if piecewise and len(shimmer_s) >= 3:
+        model['knots'] = (shimmer_s, pc_s)
+        # Bırak-birini-dışarıda enterpolasyon hatası: iç noktalar komşularından tahmin edilir
+        inner = np.arange(1, len(shimmer_s) - 1)
+        loo = np.array([np.interp(shimmer_s[i], np.delete(shimmer_s, i), np.delete(pc_s, i))
+                        for i in inner])
+        model['residual_rms_ms'] = float(np.sqrt(np.mean(((pc_s[inner] - loo) * 1000) ** 2)))
+        model['residual_max_ms'] = float(np.max(np.abs(pc_s[inner] - loo)) * 1000)
+    return model
+
+def apply_clock_model(model, shimmer_s):
+    """Saat modelini tüm örneklere vektörel uygular, datetime64[ns] dizisi döndürür"""
+    t = np.asarray(shimmer_s, dtype=np.float64)
+    if model['knots'] is None:
+        pc_s = model['intercept'] + model['slope'] * t
+    else:
+        ks, kp = model['knots']
+        pc_s = np.interp(t, ks, kp)
+        # Uç noktaların dışında ilk/son segmentin eğimiyle uzat
+        before, after = t < ks[0], t > ks[-1]
+        pc_s[before] = kp[0] + (t[before] - ks[0]) * (kp[1] - kp[0]) / (ks[1] - ks[0])
+        pc_s[after] = kp[-1] + (t[after] - ks[-1]) * (kp[-1] - kp[-2]) / (ks[-1] - ks[-2])
+    return (model['ref_ns'] + np.round(pc_s * 1e9).astype(np.int64)).astype('datetime64[ns]')
+
+def print_clock_model(model):
+    """Saat modeli özetini yazdırır"""
+    kind = "parçalı doğrusal" if model['knots'] is not None else "doğrusal"
+    print(f"🕐 Saat modeli ({kind}, {model['n_points']} sync noktası)")
+    if model['n_points'] > 1:
+        print(f"   Drift: {model['drift_ppm']:+.2f} ppm")
+        print(f"   Artık: RMS {model['residual_rms_ms']:.3f} ms, maks {model['residual_max_ms']:.3f} ms")
+    else:
+        print("   ⚠️ Tek sync noktası: yalnızca offset düzeltmesi yapılabilir")
+
+def session_clock_model(igt_df, sync_offset_seconds=0, sync_points=None, piecewise=False):
+    """
+    IGT sync marker'ı (Shimmer 0 sn) veya ek sync noktalarından saat modeli kurar
+
+    Ek sync noktaları (marker kanalı / sync CSV) ms hassasiyetindedir; elle
+    başlatılan geri sayım noktasının hatası yüzlerce ms olabildiğinden ek
+    noktalar varsa modele yalnızca onlar girer (aksi halde offset ve drift
+    kestirimini bozar, parçalı modelde düğüm olur).
+
+    Returns:
+        Saat modeli sözlüğü (fit_clock_model)
+    """
+    if sync_points is not None and len(sync_points[0]) > 0:
+        print(f"🔗 {len(sync_points[0])} ek sync noktası kullanılıyor (geri sayım noktası hariç)")
+        if sync_offset_seconds != 0:
+            print(f"⚠️ Sync offset ({sync_offset_seconds} sn) yalnızca geri sayım noktasına uygulanır, yok sayıldı")
+        clock_model = fit_clock_model(sync_points[0], sync_points[1], piecewise)
+        print_clock_model(clock_model)
+        return clock_model
+
     # Sync marker'ı al
     if 'Sync_Timestamp' in igt_df.columns and pd.notna(igt_df.loc[0, 'Sync_Timestamp']):
         sync_marker = pd.to_datetime(igt_df.loc[0, 'Sync_Timestamp'])
@@ -57,6 +241,18 @@ def merge_data(igt_df, shimmer_df, sync_offset_seconds=0):
         sync_marker = sync_marker + timedelta(seconds=sync_offset_seconds)
         print(f"🔧 Sync offset uygulandı: {sync_offset_seconds} saniye")
     
+    # Tek nokta: Shimmer 0 sn ↔ sync marker (yalnızca offset)
+    clock_model = fit_clock_model([0.0], [sync_marker.value], piecewise)
+    print_clock_model(clock_model)
+    return clock_model
+
+def align_shimmer_time(igt_df, shimmer_df, sync_offset_seconds=0, sync_points=None, piecewise=False):
+    """
+    Shimmer örneklerine PC saatinde zaman damgası (Shimmer_Time) ekler
+
+    Returns:
+        Saat modeli sözlüğü veya zaman sütunu yoksa None
+    """
     # Shimmer zamanını ayarla
     if 'Time (s)' in shimmer_df.columns:
         time_col = 'Time (s)'
@@ -68,73 +264,128 @@ def merge_data(igt_df, shimmer_df, sync_offset_seconds=0):
         print("❌ Shimmer zaman sütunu bulunamadı!")
         return None
     
-    shimmer_df['Shimmer_Time'] = sync_marker + pd.to_timedelta(
-        shimmer_df[time_col], unit='s'
-    )
-    
-    # Her trial için SCR hesapla
-    results = []
-    
-    for idx, trial in igt_df.iterrows():
-        trial_time = trial['IGT_Time']
-        
-        # Baseline: Trial öncesi 2 saniye
-        baseline_start = trial_time - timedelta(seconds=2)
-        baseline_mask = (shimmer_df['Shimmer_Time'] >= baseline_start) & \
-                       (shimmer_df['Shimmer_Time'] < trial_time)
-        
-        # GSR sütununu bul
-        gsr_col = None
-        for col in shimmer_df.columns:
-            if 'GSR' in col or 'Skin_Conductance' in col:
-                gsr_col = col
-                break
-        
-        if gsr_col:
-            baseline_scr = shimmer_df[baseline_mask][gsr_col].mean()
-            
-            # Response: Trial sonrası 1-5 saniye (SCR latency)
-            response_start = trial_time + timedelta(seconds=1)
-            response_end = trial_time + timedelta(seconds=5)
-            response_mask = (shimmer_df['Shimmer_Time'] >= response_start) & \
-                           (shimmer_df['Shimmer_Time'] <= response_end)
-            response_scr = shimmer_df[response_mask][gsr_col].max()
-            
-            # SCR amplitude
-            scr_amplitude = response_scr - baseline_scr if not pd.isna(baseline_scr) else np.nan
-        else:
-            baseline_scr = np.nan
-            response_scr = np.nan
-            scr_amplitude = np.nan
-            print("⚠️ GSR sütunu bulunamadı!")
-        
-        # PPG (opsiyonel)
-        ppg_col = None
-        for col in shimmer_df.columns:
-            if 'PPG' in col:
-                ppg_col = col
-                break
-        
-        if ppg_col:
-            ppg_mask = response_mask
-            ppg_mean = shimmer_df[ppg_mask][ppg_col].mean()
-        else:
-            ppg_mean = np.nan
-        
-        # Birleştir
-        result = trial.to_dict()
-        result['SCR_Baseline_uS'] = baseline_scr
-        result['SCR_Peak_uS'] = response_scr
-        result['SCR_Amplitude_uS'] = scr_amplitude
-        result['PPG_Mean'] = ppg_mean
-        
-        results.append(result)
-        
-        # İlerleme
-        if (idx + 1) % 20 == 0:
-            print(f"   İşlenen trial: {idx + 1}/{len(igt_df)}")
-    
-    merged_df = pd.DataFrame(results)
+    clock_model = session_clock_model(igt_df, sync_offset_seconds, sync_points, piecewise)
+    shimmer_df['Shimmer_Time'] = apply_clock_model(clock_model, shimmer_df[time_col].to_numpy())
+    return clock_model
+
+def window_stat(sample_ns, values, event_ns, window, stat='mean', closed='left'):
+    """
+    Tüm denemelerin olay pencerelerinde NaN atlayan ortalama veya maksimum
+
+    Pencere sınırları sıralı örnek zamanlarında searchsorted ile bulunur;
+    ortalama kümülatif toplamla, maksimum pencere indekslerinin düz
+    birleşimi üzerinde reduceat ile hesaplanır (toplam örnek sayısında doğrusal).
+
+    Args:
+        sample_ns: Sıralı örnek zamanları (int64 ns)
+        values: Örnek değerleri
+        event_ns: Olay zamanları (int64 ns)
+        window: Olaya göre (başlangıç, bitiş) sn
+        stat: 'mean' veya 'max'
+        closed: 'left' [başlangıç, bitiş) veya 'both' [başlangıç, bitiş]
+    """
+    start = np.searchsorted(sample_ns, event_ns + int(window[0] * 1e9), side='left')
+    stop = np.searchsorted(sample_ns, event_ns + int(window[1] * 1e9),
+                           side='right' if closed == 'both' else 'left')
+    valid = ~np.isnan(values)
+    if stat == 'mean':
+        csum = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        count = np.concatenate([[0], np.cumsum(valid)])
+        n = count[stop] - count[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, (csum[stop] - csum[start]) / n, np.nan)
+
+    lengths = np.maximum(stop - start, 0)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    out = np.full(len(event_ns), np.nan)
+    nonempty = lengths > 0
+    if nonempty.any():
+        index = np.repeat(start - offsets, lengths) + np.arange(lengths.sum())
+        filled = np.where(valid, values, -np.inf)
+        out[nonempty] = np.maximum.reduceat(filled[index], offsets[nonempty])
+    out[np.isinf(out)] = np.nan
+    return out
+
+def compute_sensor_features(igt_df, shimmer_df, signal_cols, placeholders=True):
+    """
+    Tek bir sensörün hizalanmış kaydından deneme başına tüm özellikler
+
+    placeholders=True ise eksik GSR/PPG kanalları için NaN sütunlar eklenir
+    (tek sensörlü çıktının sabit sütun düzeni).
+
+    Returns:
+        igt_df satırlarıyla hizalı özellik DataFrame'i
+    """
+    sample_ns = shimmer_df['Shimmer_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    order = np.argsort(sample_ns, kind='stable')
+    sample_ns = sample_ns[order]
+    ref_ns = sample_ns[0]
+    event_ns = igt_df['IGT_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    signals = {name: shimmer_df[col].to_numpy(dtype=np.float64)[order]
+               for name, col in signal_cols.items()}
+    features = {}
+    
+    # SCR: baseline seçim öncesi 2 sn, yanıt seçim sonrası 1-5 sn (SCR latency)
+    if 'GSR' in signals:
+        baseline = window_stat(sample_ns, signals['GSR'], event_ns, SCR_BASELINE_WINDOW, 'mean')
+        peak = window_stat(sample_ns, signals['GSR'], event_ns, SCR_RESPONSE_WINDOW, 'max',
+                           closed='both')
+        features['SCR_Baseline_uS'] = baseline
+        features['SCR_Peak_uS'] = peak
+        features['SCR_Amplitude_uS'] = peak - baseline
+    elif placeholders:
+        print("⚠️ GSR sütunu bulunamadı!")
+        for col in ('SCR_Baseline_uS', 'SCR_Peak_uS', 'SCR_Amplitude_uS'):
+            features[col] = np.full(len(event_ns), np.nan)
+    if 'PPG' in signals:
+        features['PPG_Mean'] = window_stat(sample_ns, signals['PPG'], event_ns, SCR_RESPONSE_WINDOW,
+                                           'mean', closed='both')
+    elif placeholders:
+        features['PPG_Mean'] = np.full(len(event_ns), np.nan)
+    
+    # Tonik/fazik ayrıştırma: tüm kayıt bir kez ayrıştırılır, denemeler vektörel okunur
+    if 'GSR' in signals:
+        decomposition = decompose_eda((sample_ns - ref_ns) / 1e9, signals['GSR'])
+        features.update(trial_phasic_metrics(decomposition, (event_ns - ref_ns) / 1e9))
+    
+    # Kalp hızı/HRV: atımlar tüm kayıtta bir kez bulunur, pencereler indeksle okunur
+    for name in ('PPG', 'ECG'):
+        if name in signals:
+            beats = detect_beats((sample_ns - ref_ns) / 1e9, signals[name], CARDIAC_BANDS[name])
+            features.update(trial_cardiac_features(beats, (event_ns - ref_ns) / 1e9,
+                                                   prefix=f'{name}_'))
+            print(f"   Tespit edilen atım ({name}): {len(beats)}")
+    
+    # Sinyal kalitesi: deneme penceresindeki temiz (NaN olmayan) örnek oranı
+    fs = 1e9 / np.median(np.diff(sample_ns))
+    for name, values in signals.items():
+        quality_col = 'SCR_Quality' if name == 'GSR' else f'{name}_Quality'
+        features[quality_col] = trial_quality(sample_ns, np.isfinite(values), event_ns, fs)
+    
+    return pd.DataFrame(features, index=igt_df.index)
+
+def merge_data(igt_df, shimmer_df, sync_offset_seconds=0, sync_points=None, piecewise=False):
+    """
+    IGT ve Shimmer verilerini birleştirir
+    
+    Args:
+        igt_df: IGT DataFrame
+        shimmer_df: Shimmer DataFrame
+        sync_offset_seconds: Shimmer başlangıç offset (saniye)
+        sync_points: Ek (shimmer_s, pc_ns) sync noktaları (drift düzeltmesi için)
+        piecewise: Parçalı doğrusal saat modeli kullan
+    
+    Returns:
+        Birleştirilmiş DataFrame
+    """
+    print("\n🔄 Veriler birleştiriliyor...")
+    
+    clock_model = align_shimmer_time(igt_df, shimmer_df, sync_offset_seconds, sync_points, piecewise)
+    if clock_model is None:
+        return None
+    
+    features = compute_sensor_features(igt_df, shimmer_df, find_signal_columns(shimmer_df))
+    merged_df = pd.concat([igt_df, features], axis=1).reset_index(drop=True)
     
     # İstatistikler
     valid_scr = merged_df['SCR_Amplitude_uS'].notna().sum()
@@ -144,25 +395,238 @@ def merge_data(igt_df, shimmer_df, sync_offset_seconds=0):
     
     return merged_df
 
+def merge_sensors(igt_df, sensors, piecewise=False):
+    """
+    Birden çok sensör kaydını ortak zaman eksenine hizalayıp birleştirir
+    
+    Her sensör kendi offset/drift saat modeliyle PC saatine taşınır; özellik
+    sütunları cihaz adıyla ön eklenir (örn. EDA_SCR_Amplitude_uS, ECG_ECG_HR_...).
+    
+    Args:
+        igt_df: IGT DataFrame
+        sensors: [{'name', 'shimmer_df', 'sync_offset', 'sync_points'}] listesi
+        piecewise: Parçalı doğrusal saat modeli kullan
+    
+    Returns:
+        Birleştirilmiş DataFrame veya hizalama başarısızsa None
+    """
+    print(f"\n🔄 {len(sensors)} sensör birleştiriliyor...")
+    blocks = [igt_df]
+    for sensor in sensors:
+        print(f"\n📡 Sensör: {sensor['name']}")
+        shimmer_df = sensor['shimmer_df']
+        if align_shimmer_time(igt_df, shimmer_df, sensor.get('sync_offset', 0),
+                              sensor.get('sync_points'), piecewise) is None:
+            return None
+        signal_cols = find_signal_columns(shimmer_df)
+        if not signal_cols:
+            print(f"⚠️ {sensor['name']}: sinyal sütunu bulunamadı")
+            continue
+        features = compute_sensor_features(igt_df, shimmer_df, signal_cols, placeholders=False)
+        blocks.append(features.add_prefix(f"{sensor['name']}_"))
+    
+    merged_df = pd.concat(blocks, axis=1).reset_index(drop=True)
+    print(f"\n✅ Birleştirme tamamlandı! {len(merged_df)} trial, "
+          f"{len(merged_df.columns) - len(igt_df.columns)} sensör sütunu")
+    return merged_df
+
+def label_samples(igt_df, shimmer_df):
+    """
+    Her Shimmer örneğini deneme, deste, sonuç ve faz ile etiketler
+
+    Olay zaman çizelgesi deneme başına üç sınırdan oluşur:
+        kartlar aktif (seçim - Reaction_Time) → seçim → geri bildirim sonu
+    Örnekler tek bir searchsorted ile bu sıralı sınırlara yerleştirilir (O(N log T)).
+
+    Returns:
+        Shimmer_Time sırasına göre etiketli DataFrame
+    """
+    choice_ns = igt_df['IGT_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    cards_on_ns = choice_ns - np.round(igt_df['Reaction_Time'].to_numpy() * 1e9).astype(np.int64)
+    feedback_end_ns = choice_ns + int(FEEDBACK_SECONDS * 1e9)
+    boundaries = np.column_stack([cards_on_ns, choice_ns, feedback_end_ns]).ravel()
+    boundaries = np.maximum.accumulate(boundaries)  # kayıt gecikmelerinden kaynaklı çakışmalar
+
+    shimmer_df = shimmer_df.sort_values('Shimmer_Time', kind='stable')
+    sample_ns = shimmer_df['Shimmer_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    segment = np.searchsorted(boundaries, sample_ns, side='right') - 1
+    trial_idx = segment // 3
+    # Segment 0: pre_choice, 1: feedback, 2: sonraki kartlara kadar (iti); ilk denemeden önce iti
+    phase_code = np.where(segment >= 0, (segment % 3 + 1) % 3, 0)
+    in_task = (segment >= 0) & ~((trial_idx == len(choice_ns) - 1) & (phase_code == 0))
+
+    def per_trial(values, dtype):
+        column = pd.array(np.asarray(values)[np.clip(trial_idx, 0, None)], dtype=dtype)
+        column[~in_task] = pd.NA
+        return column
+
+    labelled = pd.DataFrame({
+        'Time_ns': sample_ns,
+        'Shimmer_Time_s': shimmer_df['Time (s)'].to_numpy(dtype=np.float64),
+    })
+    for col in find_signal_columns(shimmer_df).values():
+        labelled[col] = shimmer_df[col].to_numpy(dtype=np.float32)
+    labelled['Trial_Number'] = per_trial(igt_df['Trial_Number'], 'Int16')
+    labelled['Deck_Selected'] = pd.Categorical(
+        per_trial(igt_df['Deck_Selected'], 'string'), categories=['A', 'B', 'C', 'D'])
+    labelled['Net_Outcome'] = per_trial(igt_df['Net_Outcome'], 'Int32')
+    labelled['Phase'] = pd.Categorical.from_codes(phase_code, categories=list(PHASES))
+    return labelled
+
+def write_labelled(labelled, output_file):
+    """Etiketli sürekli akışı sıkıştırılmış Parquet olarak yazar"""
+    if pa is None:
+        raise ImportError("pyarrow gerekli: pip install pyarrow")
+    table = pa.Table.from_pandas(labelled, preserve_index=False)
+    pq.write_table(table, output_file, compression='zstd')
+
+def merge_session(igt_csv, shimmer_csv, sync_offset=0, sync_csv=None, markers_csv=None,
+                  piecewise=False, preprocess=True, label=False):
+    """
+    Tek bir oturumu birleştirir ve <igt>_Shimmer.csv olarak kaydeder
+    (label=True ise örnek düzeyinde etiketli <igt>_Labelled.parquet de yazılır)
+
+    Returns:
+        Çıktı dosyası yolu veya başarısızsa None
+    """
+    igt_df = load_igt_data(igt_csv)
+    shimmer_df = load_shimmer_data(shimmer_csv)
+    
+    # Ek sync noktaları: dosyadan ve/veya Shimmer marker kanalından
+    markers_csv = markers_csv or igt_csv.replace('.csv', '_Markers.csv')
+    sync_points = gather_sync_points(shimmer_df, markers_csv, sync_csv)
+    
+    # Filtreleme, düzgün ızgara ve artefakt temizliği (marker kanalı okunduktan sonra)
+    signal_cols = find_signal_columns(shimmer_df)
+    if preprocess and signal_cols and 'Time (s)' in shimmer_df.columns:
+        print("🧹 Sinyal ön işleme...")
+        shimmer_df = preprocess_shimmer(shimmer_df, signal_cols)
+    
+    merged_df = merge_data(igt_df, shimmer_df, sync_offset, sync_points, piecewise)
+    if merged_df is None:
+        return None
+    
+    output_file = igt_csv.replace('.csv', '_Shimmer.csv')
+    merged_df.to_csv(output_file, index=False)
+    
+    if label:
+        labelled_file = igt_csv.replace('.csv', '_Labelled.parquet')
+        write_labelled(label_samples(igt_df, shimmer_df), labelled_file)
+        print(f"🏷️ Etiketli sürekli veri: {labelled_file}")
+    return output_file
+
+def merge_multi_session(igt_csv, sensors_csv, piecewise=False, preprocess=True):
+    """
+    Bir oturumun birden çok sensör kaydını (örn. EDA + ECG) birleştirir
+
+    sensors_csv sütunları: Device, Shimmer_CSV, (opsiyonel) Offset_s, Sync_Points_CSV
+    Her cihazın marker kanalı aynı <igt>_Markers.csv ile eşleştirilir.
+
+    Returns:
+        Çıktı dosyası yolu veya başarısızsa None
+    """
+    igt_df = load_igt_data(igt_csv)
+    manifest = pd.read_csv(sensors_csv)
+    markers_csv = igt_csv.replace('.csv', '_Markers.csv')
+    
+    sensors = []
+    for _, row in manifest.iterrows():
+        print(f"\n📂 {row['Device']}: {row['Shimmer_CSV']}")
+        shimmer_df = load_shimmer_data(row['Shimmer_CSV'])
+        sync_csv = row.get('Sync_Points_CSV')
+        sync_points = gather_sync_points(shimmer_df, markers_csv,
+                                         sync_csv if isinstance(sync_csv, str) else None)
+        signal_cols = find_signal_columns(shimmer_df)
+        if preprocess and signal_cols and 'Time (s)' in shimmer_df.columns:
+            print("🧹 Sinyal ön işleme...")
+            shimmer_df = preprocess_shimmer(shimmer_df, signal_cols)
+        offset = row.get('Offset_s', 0)
+        sensors.append({
+            'name': row['Device'],
+            'shimmer_df': shimmer_df,
+            'sync_offset': 0 if pd.isna(offset) else float(offset),
+            'sync_points': sync_points,
+        })
+    
+    merged_df = merge_sensors(igt_df, sensors, piecewise)
+    if merged_df is None:
+        return None
+    
+    output_file = igt_csv.replace('.csv', '_Shimmer.csv')
+    merged_df.to_csv(output_file, index=False)
+    return output_file
+
+def merge_batch_job(job):
+    """İşçi süreçte tek oturum (hata mesajı döndürülür, toplu iş durmaz)"""
+    igt_csv, shimmer_csv, sync_offset = job
+    try:
+        return igt_csv, merge_session(igt_csv, shimmer_csv, sync_offset), None
+    except Exception as e:
+        return igt_csv, None, str(e)
+
+def merge_batch(pairs_csv, workers=None):
+    """
+    Katılımcı listesini süreç havuzunda paralel birleştirir
+
+    pairs_csv sütunları: IGT_CSV, Shimmer_CSV, (opsiyonel) Offset_s
+    """
+    pairs = pd.read_csv(pairs_csv)
+    offsets = pairs['Offset_s'] if 'Offset_s' in pairs else [0] * len(pairs)
+    jobs = list(zip(pairs['IGT_CSV'], pairs['Shimmer_CSV'], offsets))
+    print(f"🔄 {len(jobs)} oturum {workers or os.cpu_count()} işçi süreçle birleştiriliyor...")
+    
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for igt_csv, output_file, error in pool.map(merge_batch_job, jobs):
+            if output_file is None:
+                failed += 1
+                print(f"❌ {igt_csv}: {error or 'birleştirme başarısız'}")
+            else:
+                print(f"✅ {output_file}")
+    print(f"\n🎉 {len(jobs) - failed}/{len(jobs)} oturum birleştirildi")
+    return failed
+
 def main():
     """Ana fonksiyon"""
     print("="*60)
     print("🔬 IGT + Shimmer Veri Birleştirme")
     print("="*60)
     
-    # Argüman kontrolü
-    if len(sys.argv) < 3:
+    # Argüman kontrolü (--seçenekler konumsal argümanlardan ayrılır)
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'batch' in options:
+        workers = int(options['workers']) if options.get('workers') else None
+        sys.exit(1 if merge_batch(options['batch'], workers) else 0)
+    
+    if 'sensors' in options and args:
+        output_file = merge_multi_session(args[0], options['sensors'],
+                                          piecewise='piecewise' in options,
+                                          preprocess='raw' not in options)
+        if output_file is None:
+            print("❌ Birleştirme başarısız!")
+            sys.exit(1)
+        print(f"\n💾 Çıktı dosyası: {output_file}")
+        sys.exit(0)
+    
+    if len(args) < 2:
         print("\n❌ Kullanım hatası!")
         print("\nKullanım:")
-        print("  python3 merge_shimmer_igt.py <igt.csv> <shimmer.csv> [offset_seconds]")
+        print("  python3 merge_shimmer_igt.py <igt.csv> <shimmer.csv> [offset_seconds] "
+              "[--sync-points=<csv>] [--markers=<_Markers.csv>] [--piecewise] [--raw] [--label]")
         print("\nÖrnek:")
         print("  python3 merge_shimmer_igt.py IGT_D20251220_XXX.csv Shimmer_Session.csv")
         print("  python3 merge_shimmer_igt.py IGT_D20251220_XXX.csv Shimmer_Session.csv 2")
+        print("  python3 merge_shimmer_igt.py IGT_D20251220_XXX.csv Shimmer_Session.csv "
+              "--sync-points=sync_end.csv")
+        print("  python3 merge_shimmer_igt.py IGT_D20251220_XXX.csv --sensors=cihazlar.csv")
+        print("  python3 merge_shimmer_igt.py --batch=katilimcilar.csv --workers=8")
         sys.exit(1)
     
-    igt_csv = sys.argv[1]
-    shimmer_csv = sys.argv[2]
-    sync_offset = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    igt_csv = args[0]
+    shimmer_csv = args[1]
+    sync_offset = float(args[2]) if len(args) > 2 else 0
     
     # Dosya kontrolü
     if not os.path.exists(igt_csv):
@@ -179,25 +643,19 @@ def main():
     print(f"   Sync offset: {sync_offset} saniye")
     print()
     
-    # Veriyi yükle
-    igt_df = load_igt_data(igt_csv)
-    shimmer_df = load_shimmer_data(shimmer_csv)
-    
-    # Birleştir
-    merged_df = merge_data(igt_df, shimmer_df, sync_offset)
+    # Yükle, birleştir ve kaydet
+    output_file = merge_session(igt_csv, shimmer_csv, sync_offset, options.get('sync-points'),
+                                options.get('markers'), piecewise='piecewise' in options,
+                                preprocess='raw' not in options, label='label' in options)
     
-    if merged_df is None:
+    if output_file is None:
         print("❌ Birleştirme başarısız!")
         sys.exit(1)
     
-    # Kaydet
-    output_file = igt_csv.replace('.csv', '_Shimmer.csv')
-    merged_df.to_csv(output_file, index=False)
-    
     print(f"\n💾 Çıktı dosyası: {output_file}")
     print(f"\n📊 Sütun listesi:")
-    for col in merged_df.columns:
-        if 'SCR' in col or 'PPG' in col:
+    for col in pd.read_csv(output_file, nrows=0).columns:
+        if 'SCR' in col or 'PPG' in col or 'ECG' in col:
             print(f"   ✅ {col}")
     
     print("\n" + "="*60)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shimmer Epoch Extraction
+Shimmer sinyallerini IGT denemelerine kilitli epoch'lara ayırır
+
+- İstenilen sayıda adlandırılmış pencere (örn. anticipation -2..0 sn, response 1..5 sn)
+- Tüm pencereleri kapsayan ortak zaman ekseni, hedef örnekleme hızına yeniden örnekleme
+- (trials × channels × samples) float32 dizisi; isteğe bağlı disk üzerinde .npy (memmap)
+- Pencere başına özet özellikler (mean, max, min, peak latency, AUC)
+
+Çıktılar:
+    <igt>_Epochs.npy          (trials × channels × samples)
+    <igt>_Epochs.json         (kanallar, örnekleme hızı, zaman ekseni, deste etiketleri)
+    <igt>_EpochFeatures.csv   (deneme başına pencere özellikleri)
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from merge_shimmer_igt import (
+    load_igt_data, load_shimmer_data, align_shimmer_time, gather_sync_points,
+    find_signal_columns
+)
+
+# Seçim anına göre pencereler (sn); geri bildirim seçimle birlikte gösterilir
+DEFAULT_WINDOWS = {
+    'anticipation': (-2.0, 0.0),
+    'response': (1.0, 5.0),
+}
+
+DEFAULT_FS = 32.0
+FEATURES = ('mean', 'max', 'min', 'peak_latency_s', 'auc')
+
+
+def epoch_axis(windows: dict, fs: float) -> np.ndarray:
+    """Tüm pencereleri kapsayan epoch zaman ekseni (sn, olaya göre)"""
+    tmin = min(start for start, _ in windows.values())
+    tmax = max(end for _, end in windows.values())
+    n_samples = int(round((tmax - tmin) * fs))
+    return tmin + np.arange(n_samples) / fs
+
+
+def extract_epochs(sample_ns: np.ndarray, signals: np.ndarray, event_ns: np.ndarray,
+                   times: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Sıralı sinyali olay zamanlarına kilitli epoch'lara yeniden örnekler
+
+    Args:
+        sample_ns: Örnek zamanları (int64 ns, artan)
+        signals: (channels × n) sinyal dizisi
+        event_ns: Olay zamanları (int64 ns)
+        times: Epoch zaman ekseni (sn, olaya göre)
+        out: Doldurulacak (trials × channels × samples) dizi (örn. memmap)
+
+    Returns:
+        (trials × channels × samples) float32; kayıt dışında kalan örnekler NaN
+    """
+    if out is None:
+        out = np.empty((len(event_ns), len(signals), len(times)), dtype=np.float32)
+
+    # Hassasiyet için ilk örneğe göre göreli saniye
+    ref_ns = sample_ns[0]
+    x = (sample_ns - ref_ns) / 1e9
+    query = (event_ns[:, None] - ref_ns) / 1e9 + times[None, :]
+    for c, channel in enumerate(signals):
+        out[:, c, :] = np.interp(query, x, channel, left=np.nan, right=np.nan)
+    return out
+
+
+def window_features(epochs: np.ndarray, times: np.ndarray, windows: dict,
+                    channels: list) -> pd.DataFrame:
+    """Her pencere ve kanal için deneme başına özet özellikler"""
+    fs = 1.0 / (times[1] - times[0])
+    features = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # tamamen NaN pencereler
+        for name, (start, end) in windows.items():
+            mask = (times >= start - 1e-9) & (times < end - 1e-9)
+            seg = epochs[:, :, mask]
+            empty = np.all(np.isnan(seg), axis=2)
+            peak_idx = np.argmax(np.nan_to_num(seg, nan=-np.inf), axis=2)
+            stats = {
+                'mean': np.nanmean(seg, axis=2),
+                'max': np.nanmax(seg, axis=2),
+                'min': np.nanmin(seg, axis=2),
+                'peak_latency_s': np.where(empty, np.nan, times[mask][peak_idx]),
+                'auc': np.where(empty, np.nan,
+                                np.nansum(seg - seg[:, :, :1], axis=2) / fs),
+            }
+            for c, channel in enumerate(channels):
+                for feature in FEATURES:
+                    features[f"{name}_{channel}_{feature}"] = stats[feature][:, c]
+    return pd.DataFrame(features)
+
+
+def epoch_session(igt_df: pd.DataFrame, shimmer_df: pd.DataFrame, windows: dict = None,
+                  fs: float = DEFAULT_FS, channels: dict = None, out_path: str = None):
+    """
+    Hizalanmış (Shimmer_Time içeren) bir oturumu epoch'lara ayırır
+
+    Args:
+        igt_df: IGT DataFrame (IGT_Time)
+        shimmer_df: Shimmer DataFrame (Shimmer_Time)
+        windows: {ad: (başlangıç_sn, bitiş_sn)}
+        fs: Hedef örnekleme hızı (Hz)
+        channels: {kanal_adı: sütun}; None ise GSR/PPG otomatik bulunur
+        out_path: Verilirse epoch'lar bu .npy dosyasına memmap olarak yazılır
+
+    Returns:
+        (epochs, meta, features_df)
+    """
+    windows = windows or DEFAULT_WINDOWS
+    channels = channels or find_signal_columns(shimmer_df)
+    if not channels:
+        raise ValueError("Shimmer kaydında GSR/PPG sütunu bulunamadı")
+
+    order = np.argsort(shimmer_df['Shimmer_Time'].to_numpy(), kind='stable')
+    sample_ns = shimmer_df['Shimmer_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)[order]
+    signals = np.stack([shimmer_df[col].to_numpy(dtype=np.float64)[order]
+                        for col in channels.values()])
+    event_ns = igt_df['IGT_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+
+    times = epoch_axis(windows, fs)
+    shape = (len(event_ns), len(channels), len(times))
+    out = None
+    if out_path:
+        out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=shape)
+    epochs = extract_epochs(sample_ns, signals, event_ns, times, out)
+    if out_path:
+        epochs.flush()
+
+    meta = {
+        'channels': list(channels),
+        'fs': fs,
+        'tmin': float(times[0]),
+        'n_samples': len(times),
+        'windows': {name: list(bounds) for name, bounds in windows.items()},
+        'trial_numbers': igt_df['Trial_Number'].astype(int).tolist(),
+        'decks': igt_df['Deck_Selected'].tolist() if 'Deck_Selected' in igt_df else [],
+    }
+    features_df = window_features(epochs, times, windows, meta['channels'])
+    features_df.insert(0, 'Trial_Number', meta['trial_numbers'])
+    return epochs, meta, features_df
+
+
+def save_epochs_meta(npy_path: str, meta: dict):
+    """Epoch dizisinin yanına JSON metadata yazar"""
+    with open(npy_path.replace('.npy', '.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+
+
+def load_epochs(npy_path: str):
+    """Epoch dizisini bellek eşlemeli (salt okunur) yükler"""
+    with open(npy_path.replace('.npy', '.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    return np.load(npy_path, mmap_mode='r'), meta
+
+
+def grand_average(npy_paths: list, by: str = 'decks') -> dict:
+    """
+    Çalışma genelinde deste (veya tümü) bazında ortalama dalga formları
+
+    CSV'ler yeniden okunmaz; her oturumun .npy dosyası memmap ile taranır.
+
+    Returns:
+        {etiket: (channels × samples) ortalama}, meta (ilk oturumdan)
+    """
+    sums, counts, first_meta = {}, {}, None
+    for path in npy_paths:
+        epochs, meta = load_epochs(path)
+        first_meta = first_meta or meta
+        labels = np.array(meta.get(by) or ['all'] * len(epochs))
+        for label in map(str, np.unique(labels)):
+            block = np.asarray(epochs[labels == label], dtype=np.float64)
+            valid = ~np.isnan(block)
+            sums[label] = sums.get(label, 0) + np.where(valid, block, 0).sum(axis=0)
+            counts[label] = counts.get(label, 0) + valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        averages = {label: sums[label] / counts[label] for label in sorted(sums)}
+    return averages, first_meta
+
+
+def parse_window(spec: str):
+    """'ad:başlangıç:bitiş' biçimindeki pencere tanımını ayrıştırır"""
+    name, start, end = spec.split(':')
+    return name, (float(start), float(end))
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📈 Shimmer Epoch Çıkarımı")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = [a[2:] for a in sys.argv[1:] if a.startswith('--')]
+    if len(args) < 2:
+        print("\nKullanım:")
+        print("  python3 shimmer_epochs.py <igt.csv> <shimmer.csv> [fs_hz] "
+              "[--window=ad:bas:bit ...] [--sync-points=<csv>]")
+        print("\nÖrnek:")
+        print("  python3 shimmer_epochs.py IGT_D20251220_XXX.csv Shimmer_Session.csv 32 "
+              "--window=anticipation:-3:0 --window=feedback:0:6")
+        sys.exit(1)
+
+    igt_csv, shimmer_csv = args[0], args[1]
+    fs = float(args[2]) if len(args) > 2 else DEFAULT_FS
+    windows = dict(parse_window(f.split('=', 1)[1]) for f in flags if f.startswith('window='))
+    sync_csv = next((f.split('=', 1)[1] for f in flags if f.startswith('sync-points=')), None)
+
+    for path in (igt_csv, shimmer_csv):
+        if not os.path.exists(path):
+            print(f"❌ Dosya bulunamadı: {path}")
+            sys.exit(1)
+
+    igt_df = load_igt_data(igt_csv)
+    shimmer_df = load_shimmer_data(shimmer_csv)
+    sync_points = gather_sync_points(shimmer_df, igt_csv.replace('.csv', '_Markers.csv'), sync_csv)
+    if align_shimmer_time(igt_df, shimmer_df, sync_points=sync_points) is None:
+        sys.exit(1)
+
+    npy_path = igt_csv.replace('.csv', '_Epochs.npy')
+    epochs, meta, features_df = epoch_session(igt_df, shimmer_df, windows or None, fs,
+                                              out_path=npy_path)
+    save_epochs_meta(npy_path, meta)
+    features_path = igt_csv.replace('.csv', '_EpochFeatures.csv')
+    features_df.to_csv(features_path, index=False)
+
+    print(f"\n✅ Epoch dizisi: {epochs.shape} (trials × channels × samples) → {npy_path}")
+    print(f"   Kanallar: {', '.join(meta['channels'])} | {fs:g} Hz | "
+          f"{meta['tmin']:+.2f} sn'den {meta['n_samples']} örnek")
+    print(f"   Pencere özellikleri: {features_path}")
+
+
+if __name__ == "__main__":
+    main()
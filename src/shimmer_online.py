@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shimmer Online SCR Extraction
+Parça parça gelen sinyalden deneme başına SCR özelliklerini artımlı hesaplar
+
+- Örnekler halka tamponda (ring buffer) tutulur; yalnızca açık pencerelerin ve
+  geç gelebilecek olayların ihtiyaç duyduğu örnekler saklanır (sabit bellek)
+- Olaylar (seçim zamanları) örneklerden önce veya sonra, herhangi bir sırayla eklenebilir
+- Bir denemenin yanıt penceresi kapandığı anda (akış pencere sonunu geçince)
+  özellikler üretilir; hesap merge_shimmer_igt.window_stat ile yapılır,
+  böylece sonuçlar toplu (batch) birleştirme ile aynıdır
+- Canlı veri, akış halinde okunan dosyalar ve büyük arşivler için aynı kod yolu
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import os
+import sys
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from merge_shimmer_igt import (
+    load_igt_data, load_sync_points, session_clock_model, apply_clock_model,
+    window_stat, SCR_BASELINE_WINDOW, SCR_RESPONSE_WINDOW
+)
+
+SCR_COLUMNS = ('SCR_Baseline_uS', 'SCR_Peak_uS', 'SCR_Amplitude_uS')
+MAX_EVENT_DELAY_S = 30.0    # Olayların akışa göre en fazla bu kadar geç gelebileceği varsayılır
+CHUNK_ROWS = 100_000
+
+
+class SampleRing:
+    """
+    Zaman sıralı örnekler için büyüyebilen halka tampon
+
+    Her örnek iki kez (i ve i + kapasite) yazılır; böylece tampon içeriği
+    kopyalamadan tek bir bitişik dilim olarak okunabilir.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._t = np.empty(2 * capacity, dtype=np.int64)
+        self._x = np.empty(2 * capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._t[self.head:self.head + self.count]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._x[self.head:self.head + self.count]
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        t, x = self.times.copy(), self.values.copy()
+        self.capacity = capacity
+        self._t = np.empty(2 * capacity, dtype=np.int64)
+        self._x = np.empty(2 * capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.extend(t, x)
+
+    def extend(self, t: np.ndarray, x: np.ndarray):
+        """Örnekleri sona ekler (zamanlar artan olmalı)"""
+        if self.count + len(t) > self.capacity:
+            self._grow(self.count + len(t))
+        idx = (self.head + self.count + np.arange(len(t))) % self.capacity
+        for buffer, data in ((self._t, t), (self._x, x)):
+            buffer[idx] = data
+            buffer[idx + self.capacity] = data
+        self.count += len(t)
+
+    def drop_before(self, t_ns: int):
+        """t_ns'den önceki örnekleri atar"""
+        k = int(np.searchsorted(self.times, t_ns, side='left'))
+        self.head = (self.head + k) % self.capacity
+        self.count -= k
+
+
+class OnlineSCRExtractor:
+    """
+    Artımlı SCR özellik çıkarıcı
+
+    Kullanım:
+        extractor = OnlineSCRExtractor()
+        extractor.add_event(trial, event_ns)          # herhangi bir anda
+        for row in extractor.add_samples(t_ns, gsr):  # her yeni parça
+            ...
+        for row in extractor.finish():                # akış sonu
+            ...
+
+    Her satır: {'Trial_Number', 'SCR_Baseline_uS', 'SCR_Peak_uS', 'SCR_Amplitude_uS'}
+    """
+
+    def __init__(self, baseline: tuple = SCR_BASELINE_WINDOW, response: tuple = SCR_RESPONSE_WINDOW,
+                 max_event_delay_s: float = MAX_EVENT_DELAY_S):
+        self.baseline = baseline
+        self.response = response
+        self.ring = SampleRing()
+        self.pending = []                  # (pencere kapanış ns, trial, event_ns) yığını
+        self.watermark = None              # Akıştaki son örnek zamanı
+        self.dropped_before = None         # Bu zamandan önceki örnekler atıldı
+        self.max_event_delay_ns = int(max_event_delay_s * 1e9)
+        self.late_events = 0
+        self.peak_buffered = 0
+
+    def _window_start_ns(self, event_ns: int) -> int:
+        return event_ns + int(min(self.baseline[0], self.response[0]) * 1e9)
+
+    def _window_end_ns(self, event_ns: int) -> int:
+        return event_ns + int(max(self.baseline[1], self.response[1]) * 1e9)
+
+    def add_event(self, trial: int, event_ns: int) -> list:
+        """
+        Deneme olayı ekler; penceresi zaten akışın gerisinde kalmışsa hemen hesaplanır
+
+        Returns:
+            Tamamlanan özellik satırları
+        """
+        event_ns = int(event_ns)
+        if self.dropped_before is not None and self._window_start_ns(event_ns) < self.dropped_before:
+            # Pencerenin bir kısmı tampondan çıkmış: eldeki örneklerle hesaplanır
+            self.late_events += 1
+        heapq.heappush(self.pending, (self._window_end_ns(event_ns), trial, event_ns))
+        return self._emit_closed()
+
+    def add_samples(self, t_ns: np.ndarray, values: np.ndarray) -> list:
+        """
+        Yeni sinyal parçası ekler (zamanlar artan ve öncekilerden sonra olmalı)
+
+        Returns:
+            Bu parçayla kapanan pencerelerin özellik satırları
+        """
+        t_ns = np.asarray(t_ns, dtype=np.int64)
+        if len(t_ns) == 0:
+            return []
+        if self.watermark is not None and t_ns[0] < self.watermark:
+            raise ValueError("Örnek zamanları artan sırada olmalı")
+        self.ring.extend(t_ns, np.asarray(values, dtype=np.float64))
+        self.watermark = int(t_ns[-1])
+        self.peak_buffered = max(self.peak_buffered, len(self.ring))
+        rows = self._emit_closed()
+        self._trim()
+        return rows
+
+    def finish(self) -> list:
+        """Akış sonu: bekleyen tüm denemeleri eldeki örneklerle hesaplar"""
+        closing = [heapq.heappop(self.pending) for _ in range(len(self.pending))]
+        return self._compute(closing)
+
+    def _emit_closed(self) -> list:
+        # closed='both' yanıt penceresi: bitişle aynı zamanlı örnekler de gelmiş olmalı
+        closing = []
+        while self.pending and self.watermark is not None and self.pending[0][0] < self.watermark:
+            closing.append(heapq.heappop(self.pending))
+        return self._compute(closing)
+
+    def _trim(self):
+        # Açık pencereler ve geç gelebilecek olaylar için gereken en eski örnek
+        span_ns = self._window_end_ns(0) - self._window_start_ns(0)
+        keep_from = self.watermark - self.max_event_delay_ns - span_ns
+        if self.pending:
+            keep_from = min(keep_from, self.pending[0][0] - span_ns)
+        if len(self.ring) and self.ring.times[0] < keep_from:
+            self.ring.drop_before(keep_from)
+            self.dropped_before = keep_from
+
+    def _compute(self, closing: list) -> list:
+        if not closing:
+            return []
+        trials = [trial for _, trial, _ in closing]
+        event_ns = np.array([e for _, _, e in closing], dtype=np.int64)
+        t, x = self.ring.times, self.ring.values
+        if len(t) == 0:
+            baseline = peak = np.full(len(event_ns), np.nan)
+        else:
+            baseline = window_stat(t, x, event_ns, self.baseline, 'mean')
+            peak = window_stat(t, x, event_ns, self.response, 'max', closed='both')
+        return [
+            {'Trial_Number': trial, 'SCR_Baseline_uS': b, 'SCR_Peak_uS': p, 'SCR_Amplitude_uS': p - b}
+            for trial, b, p in zip(trials, baseline, peak)
+        ]
+
+
+def stream_session(igt_csv: str, shimmer_csv: str, sync_offset: float = 0, sync_csv: str = None,
+                   chunk_rows: int = CHUNK_ROWS):
+    """
+    Shimmer CSV'sini parça parça okuyarak oturumun SCR özelliklerini üretir
+
+    Saat modeli IGT sync marker'ı ve (varsa) sync noktası dosyasından kurulur;
+    Shimmer dosyası hiçbir zaman tamamen belleğe alınmaz.
+
+    Returns:
+        (Trial_Number sırasına göre özellik DataFrame'i, çıkarıcı)
+    """
+    igt_df = load_igt_data(igt_csv)
+    sync_points = load_sync_points(sync_csv) if sync_csv else None
+    clock_model = session_clock_model(igt_df, sync_offset, sync_points)
+
+    extractor = OnlineSCRExtractor()
+    event_ns = igt_df['IGT_Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    rows = []
+    for trial, e in zip(igt_df['Trial_Number'], event_ns):
+        rows.extend(extractor.add_event(int(trial), e))
+
+    gsr_col = None
+    for chunk in pd.read_csv(shimmer_csv, chunksize=chunk_rows):
+        if gsr_col is None:
+            gsr_col = next((c for c in chunk.columns if 'GSR' in c or 'Skin_Conductance' in c), None)
+            if gsr_col is None:
+                raise ValueError("Shimmer kaydında GSR sütunu bulunamadı")
+        if 'Time (s)' in chunk.columns:
+            shimmer_s = chunk['Time (s)'].to_numpy(dtype=np.float64)
+        else:
+            shimmer_s = chunk['Timestamp (ms)'].to_numpy(dtype=np.float64) / 1000.0
+        t_ns = apply_clock_model(clock_model, shimmer_s).view(np.int64)
+        rows.extend(extractor.add_samples(t_ns, chunk[gsr_col].to_numpy(dtype=np.float64)))
+    rows.extend(extractor.finish())
+
+    features = pd.DataFrame(rows, columns=['Trial_Number', *SCR_COLUMNS])
+    return features.sort_values('Trial_Number', kind='stable').reset_index(drop=True), extractor
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("📡 Shimmer Artımlı SCR Çıkarımı")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if len(args) < 2:
+        print("\nKullanım:")
+        print("  python3 shimmer_online.py <igt.csv> <shimmer.csv> [offset_seconds] "
+              "[--sync-points=<csv>] [--chunk=<satır>]")
+        sys.exit(1)
+
+    igt_csv, shimmer_csv = args[0], args[1]
+    sync_offset = float(args[2]) if len(args) > 2 else 0
+    for path in (igt_csv, shimmer_csv):
+        if not os.path.exists(path):
+            print(f"❌ Dosya bulunamadı: {path}")
+            sys.exit(1)
+
+    chunk_rows = int(options['chunk']) if options.get('chunk') else CHUNK_ROWS
+    features, extractor = stream_session(igt_csv, shimmer_csv, sync_offset,
+                                         options.get('sync-points'), chunk_rows)
+    output_file = igt_csv.replace('.csv', '_OnlineSCR.csv')
+    features.to_csv(output_file, index=False)
+
+    valid = features['SCR_Amplitude_uS'].notna().sum()
+    print(f"\n✅ {len(features)} trial, geçerli SCR: {valid}")
+    print(f"   En fazla tamponlanan örnek: {extractor.peak_buffered:,}")
+    if extractor.late_events:
+        print(f"   ⚠️ Tampon dışına düşen geç olay: {extractor.late_events}")
+    print(f"\n💾 Çıktı dosyası: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shimmer PPG Heart-Rate / HRV Features
+PPG kanalından atım tespiti, atımlar arası aralık (IBI) serisi ve deneme başına
+kalp hızı / HRV özellikleri
+
+- Atımlar tüm kayıtta tek seferde tespit edilir (bant geçiren filtre +
+  scipy.signal.find_peaks, parabolik alt-örnek düzeltmesi)
+- Fizyolojik aralık ve kayan medyan dışındaki IBI'lar geçersiz sayılır
+- Kalp hızı 4 Hz düzgün seriye enterpole edilir; pencere ortalamaları
+  kümülatif toplam + searchsorted ile tüm denemeler için birlikte hesaplanır
+- HRV (RMSSD, SDNN) atım indeksleri üzerinden aynı yolla, ancak kısa HR
+  pencerelerinde değil: 2 sn'lik pencerede SDNN için gereken 3 IBI ve RMSSD
+  için gereken 2 ardışık çift nadiren bulunur. HRV bir önceki seçimden bu
+  seçime kadarki denemeler arası aralıkta (en az HRV_MIN_WINDOW_S) hesaplanır
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import numpy as np
+from scipy.signal import find_peaks
+
+from shimmer_preprocess import resample_uniform, design_filter, filter_chunked, nominal_rate
+
+PPG_BAND = (0.5, 8.0)
+ECG_BAND = (5.0, 20.0)   # QRS enerjisi; T dalgası ve taban kayması bastırılır
+CARDIAC_BANDS = {'PPG': PPG_BAND, 'ECG': ECG_BAND}
+MIN_IBI_S = 0.33      # 180 bpm
+MAX_IBI_S = 1.5       # 40 bpm
+IBI_OUTLIER_RATIO = 0.2
+HR_GRID_FS = 4.0
+
+# Seçime göre kalp hızı pencereleri (sn)
+PPG_WINDOWS = {
+    'baseline': (-4.0, -2.0),
+    'anticipation': (-2.0, 0.0),
+    'feedback': (0.0, 4.0),
+}
+# HRV penceresi: denemeler arası aralık, en düşük kalp hızında da 3 IBI sığacak kadar uzun
+HRV_WINDOW = 'iti'
+HRV_MIN_WINDOW_S = 5.0   # > 3 × MAX_IBI_S
+
+
+def detect_beats(times_s: np.ndarray, ppg: np.ndarray, band: tuple = PPG_BAND) -> np.ndarray:
+    """
+    Tüm kayıtta atım (PPG sistolik tepe / ECG R dalgası) zamanlarını bulur
+
+    Returns:
+        Atım zamanları (sn, artan)
+    """
+    fs = round(nominal_rate(times_s))
+    t, grid = resample_uniform(times_s, ppg, fs)
+    sos = design_filter(band, fs)
+    filtered = filter_chunked(grid, sos, fs).astype(np.float64)
+    missing = np.isnan(filtered)
+    filtered[missing] = 0.0
+
+    # Genlik eşiği: kayıt geneli dağılımdan (artefakt dirençli) belirlenir
+    q25, q75 = np.percentile(filtered[~missing], [25, 75])
+    peaks, _ = find_peaks(filtered, distance=max(1, int(MIN_IBI_S * fs)),
+                          prominence=0.5 * (q75 - q25))
+    peaks = peaks[(peaks > 0) & (peaks < len(filtered) - 1)]
+    peaks = peaks[~(missing[peaks - 1] | missing[peaks] | missing[peaks + 1])]
+
+    # Parabolik enterpolasyon ile alt-örnek tepe zamanı
+    y0, y1, y2 = filtered[peaks - 1], filtered[peaks], filtered[peaks + 1]
+    denom = y0 - 2 * y1 + y2
+    shift = np.where(denom != 0, 0.5 * (y0 - y2) / np.where(denom != 0, denom, 1), 0.0)
+    return t[peaks] + np.clip(shift, -0.5, 0.5) / fs
+
+
+def ibi_series(beats: np.ndarray):
+    """
+    Atımlar arası aralıklar ve geçerlilik maskesi
+
+    Returns:
+        (ibi_times: ikinci atım zamanı, ibi: sn, valid maskesi)
+    """
+    ibi = np.diff(beats)
+    ibi_times = beats[1:]
+    valid = (ibi >= MIN_IBI_S) & (ibi <= MAX_IBI_S)
+    if valid.sum() >= 5:
+        # Kayan medyandan sapma (5 atımlık pencere, geçerli IBI'lar üzerinde)
+        padded = np.pad(ibi, 2, mode='edge')
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 5)
+        median = np.median(windows, axis=1)
+        valid &= np.abs(ibi - median) <= IBI_OUTLIER_RATIO * median
+    return ibi_times, ibi, valid
+
+
+def window_bounds(times: np.ndarray, event_s: np.ndarray, window: tuple):
+    """Her olay için pencerenin [başlangıç, bitiş) indeksleri"""
+    return (np.searchsorted(times, event_s + window[0]),
+            np.searchsorted(times, event_s + window[1]))
+
+
+def cardiac_columns(windows: dict, prefix: str = 'PPG_') -> list:
+    """trial_cardiac_features sütunları (atım sayısından bağımsız, sabit sırada)"""
+    columns = [f"{prefix}HR_{name}_bpm" for name in windows]
+    if 'baseline' in windows:
+        columns += [f"{prefix}HR_Change_{name}_bpm" for name in windows if name != 'baseline']
+    return columns + [f"{prefix}SDNN_{HRV_WINDOW}_ms", f"{prefix}RMSSD_{HRV_WINDOW}_ms"]
+
+
+def trial_cardiac_features(beats: np.ndarray, event_s: np.ndarray,
+                           windows: dict = None, prefix: str = 'PPG_') -> dict:
+    """
+    Deneme başına kalp hızı ve HRV özellikleri
+
+    Args:
+        beats: Atım zamanları (sn)
+        event_s: Seçim zamanları (aynı zaman ekseninde, artan, sn)
+        windows: Kalp hızı pencereleri {ad: (başlangıç, bitiş)}; varsayılan PPG_WINDOWS
+        prefix: Sütun ön eki ('PPG_' veya 'ECG_')
+
+    Returns:
+        {sütun adı: dizi} (cardiac_columns sırasıyla: <prefix>HR_*, HR_Change_*,
+        SDNN_iti, RMSSD_iti); yeterli atım yoksa aynı sütunlar NaN
+    """
+    windows = windows or PPG_WINDOWS
+    columns = cardiac_columns(windows, prefix)
+    n = len(event_s)
+    ibi_times, ibi, valid = ibi_series(beats)
+    if valid.sum() < 2:
+        return {column: np.full(n, np.nan) for column in columns}
+
+    # Anlık kalp hızının düzgün ızgaraya enterpolasyonu
+    hr_times, hr = ibi_times[valid], 60.0 / ibi[valid]
+    grid = np.arange(hr_times[0], hr_times[-1], 1.0 / HR_GRID_FS)
+    hr_grid = np.interp(grid, hr_times, hr)
+    hr_csum = np.concatenate([[0.0], np.cumsum(hr_grid)])
+
+    # HRV için kümülatif toplamlar (geçersiz IBI'lar 0 ağırlıklı)
+    ibi_ms = np.where(valid, ibi * 1000.0, 0.0)
+    c_n = np.concatenate([[0], np.cumsum(valid)])
+    c_x = np.concatenate([[0.0], np.cumsum(ibi_ms)])
+    c_xx = np.concatenate([[0.0], np.cumsum(ibi_ms ** 2)])
+    pair_valid = valid[1:] & valid[:-1]
+    sq_diff = np.where(pair_valid, np.diff(ibi_ms) ** 2, 0.0)
+    c_pn = np.concatenate([[0, 0], np.cumsum(pair_valid)])
+    c_sd = np.concatenate([[0.0, 0.0], np.cumsum(sq_diff)])
+
+    features = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name, window in windows.items():
+            lo, hi = window_bounds(grid, event_s, window)
+            covered = (event_s + window[0] >= grid[0]) & (event_s + window[1] <= grid[-1]) & (hi > lo)
+            hr_mean = (hr_csum[hi] - hr_csum[lo]) / (hi - lo)
+            features[f"{prefix}HR_{name}_bpm"] = np.where(covered, hr_mean, np.nan)
+
+        # HRV: önceki seçimden bu seçime (ilk denemede ve kısa aralıklarda en az HRV_MIN_WINDOW_S)
+        previous = np.concatenate([[-np.inf], event_s[:-1]])
+        start = np.minimum(previous, event_s - HRV_MIN_WINDOW_S)
+        lo, hi = np.searchsorted(ibi_times, start), np.searchsorted(ibi_times, event_s)
+        count = c_n[hi] - c_n[lo]
+        mean = (c_x[hi] - c_x[lo]) / count
+        var = (c_xx[hi] - c_xx[lo]) / count - mean ** 2
+        sdnn = np.sqrt(np.maximum(var * count / (count - 1), 0.0))
+        features[f"{prefix}SDNN_{HRV_WINDOW}_ms"] = np.where(count >= 3, sdnn, np.nan)
+        # Ardışık farklar: her iki IBI da pencere içinde olmalı
+        pairs = c_pn[hi] - c_pn[np.minimum(lo + 1, hi)]
+        rmssd = np.sqrt((c_sd[hi] - c_sd[np.minimum(lo + 1, hi)]) / pairs)
+        features[f"{prefix}RMSSD_{HRV_WINDOW}_ms"] = np.where(pairs >= 2, rmssd, np.nan)
+
+    if 'baseline' in windows:
+        for name in windows:
+            if name != 'baseline':
+                features[f"{prefix}HR_Change_{name}_bpm"] = (features[f"{prefix}HR_{name}_bpm"]
+                                                         - features[f"{prefix}HR_baseline_bpm"])
+    return {column: features[column] for column in columns}
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shimmer Signal Preprocessing
+GSR/PPG kanalları için filtreleme, düzgün yeniden örnekleme ve artefakt tespiti
+
+- Düzensiz Shimmer örnek aralıkları sabit bir ızgaraya yeniden örneklenir;
+  kayıt boşlukları (dropout) NaN olarak işaretlenir
+- SciPy SOS Butterworth filtreleri, sıfır fazlı (sosfiltfilt), örtüşen parçalarda
+- Kayan istatistiklerle (kümülatif toplam, O(n)) artefakt tespiti:
+  aralık dışı değerler, ani sıçramalar, düz hat (flatline), aşırı varyans
+- Tüm işlemler bitişik float32 dizilerde, parça parça (sınırlı bellek)
+- Deneme başına sinyal kalite skoru (penceredeki temiz örnek oranı)
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import butter, sosfiltfilt
+
+CHUNK_SECONDS = 300.0
+PAD_SECONDS = 10.0
+MAX_GAP_INTERVALS = 3.0     # Bu kadar nominal aralıktan uzun boşluk = dropout
+
+# Kanal ayarları: filtre bandı (Hz), geçerli aralık, maksimum eğim (birim/sn),
+# düz hat için minimum kayan std, kayan pencere (sn)
+CHANNEL_SETTINGS = {
+    'GSR': {'band': (None, 3.0), 'range': (0.05, 60.0), 'max_slope': 10.0,
+            'min_std': 1e-4, 'max_std_ratio': None, 'window_s': 2.0},
+    'PPG': {'band': (0.5, 8.0), 'range': (None, None), 'max_slope': None,
+            'min_std': 1e-3, 'max_std_ratio': 5.0, 'window_s': 2.0},
+    'ECG': {'band': (0.5, 40.0), 'range': (None, None), 'max_slope': None,
+            'min_std': 1e-4, 'max_std_ratio': 5.0, 'window_s': 2.0},
+}
+
+# Kalite skoru penceresi (seçime göre, sn)
+QUALITY_WINDOW = (-2.0, 5.0)
+
+
+def nominal_rate(times_s: np.ndarray) -> float:
+    """Örnek aralıklarının medyanından nominal örnekleme hızı"""
+    return float(1.0 / np.median(np.diff(times_s)))
+
+
+def resample_uniform(times_s: np.ndarray, x: np.ndarray, fs: float):
+    """
+    Düzensiz örnekleri sabit ızgaraya doğrusal enterpolasyonla taşır
+
+    Nominal aralığın MAX_GAP_INTERVALS katından uzun boşluklara düşen
+    ızgara noktaları NaN olarak işaretlenir.
+
+    Returns:
+        (t_grid float64, x_grid float32)
+    """
+    t = np.arange(times_s[0], times_s[-1], 1.0 / fs)
+    x_grid = np.interp(t, times_s, x).astype(np.float32)
+
+    gaps = np.flatnonzero(np.diff(times_s) > MAX_GAP_INTERVALS / fs)
+    if len(gaps):
+        lo = np.searchsorted(t, times_s[gaps], side='right')
+        hi = np.searchsorted(t, times_s[gaps + 1], side='left')
+        # Boşluk aralıklarını fark dizisi ile tek geçişte işaretle
+        marks = np.zeros(len(t) + 1, dtype=np.int32)
+        np.add.at(marks, lo, 1)
+        np.add.at(marks, hi, -1)
+        x_grid[np.cumsum(marks[:-1]) > 0] = np.nan
+    return t, x_grid
+
+
+def design_filter(band: tuple, fs: float, order: int = 4):
+    """(alt, üst) bant tanımından SOS Butterworth filtresi; None kenar = yok"""
+    low, high = band
+    nyquist = fs / 2.0
+    if high is not None and high >= nyquist:
+        high = None
+    if low and high:
+        return butter(order, [low, high], btype='bandpass', fs=fs, output='sos')
+    if high:
+        return butter(order, high, btype='lowpass', fs=fs, output='sos')
+    if low:
+        return butter(order, low, btype='highpass', fs=fs, output='sos')
+    return None
+
+
+def filter_chunked(x: np.ndarray, sos, fs: float, chunk_s: float = CHUNK_SECONDS,
+                   pad_s: float = PAD_SECONDS) -> np.ndarray:
+    """
+    Sıfır fazlı SOS filtre, örtüşen parçalarda (float32 çıktı)
+
+    NaN örnekler filtre öncesi enterpolasyonla doldurulur, sonrasında geri konur.
+    Her parça her iki yandan pad_s kadar komşu veriyle filtrelenip kırpılır.
+    """
+    out = np.empty(len(x), dtype=np.float32)
+    nan_mask = np.isnan(x)
+    if nan_mask.all():
+        out[:] = np.nan
+        return out
+    if nan_mask.any():
+        idx = np.arange(len(x))
+        x = x.copy()
+        x[nan_mask] = np.interp(idx[nan_mask], idx[~nan_mask], x[~nan_mask])
+
+    chunk = max(1, int(chunk_s * fs))
+    pad = int(pad_s * fs)
+    for start in range(0, len(x), chunk):
+        stop = min(len(x), start + chunk)
+        lo, hi = max(0, start - pad), min(len(x), stop + pad)
+        segment = x[lo:hi].astype(np.float64)
+        padlen = min(3 * (2 * len(sos) + 1), len(segment) - 1)
+        filtered = sosfiltfilt(sos, segment, padlen=padlen)
+        out[start:stop] = filtered[start - lo:stop - lo]
+    out[nan_mask] = np.nan
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Merkezli kayan standart sapma (kümülatif toplam, NaN'lar 0 ağırlıklı)"""
+    valid = ~np.isnan(x)
+    offset = np.mean(x[valid], dtype=np.float64) if valid.any() else 0.0  # sayısal kararlılık
+    v = np.where(valid, x - offset, 0.0).astype(np.float64)
+    c1 = np.concatenate([[0.0], np.cumsum(v)])
+    c2 = np.concatenate([[0.0], np.cumsum(v * v)])
+    cn = np.concatenate([[0], np.cumsum(valid)])
+    half = window // 2
+    lo = np.clip(np.arange(len(x)) - half, 0, len(x))
+    hi = np.clip(np.arange(len(x)) + half + 1, 0, len(x))
+    n = np.maximum(cn[hi] - cn[lo], 1)
+    mean = (c1[hi] - c1[lo]) / n
+    var = np.maximum((c2[hi] - c2[lo]) / n - mean ** 2, 0.0)
+    return np.sqrt(var).astype(np.float32)
+
+
+def detect_artifacts(x: np.ndarray, fs: float, settings: dict) -> np.ndarray:
+    """Kanal ayarlarına göre artefakt maskesi (True = kötü örnek)"""
+    bad = np.isnan(x)
+    low, high = settings['range']
+    if low is not None:
+        bad |= x < low
+    if high is not None:
+        bad |= x > high
+    if settings['max_slope'] is not None:
+        slope = np.abs(np.diff(x, prepend=x[:1])) * fs
+        bad |= slope > settings['max_slope']
+
+    window = max(3, int(settings['window_s'] * fs))
+    std = rolling_std(x, window)
+    bad |= std < settings['min_std']
+    if settings['max_std_ratio'] is not None:
+        bad |= std > settings['max_std_ratio'] * np.nanmedian(std)
+
+    # Kötü örneklerin çevresini yarım pencere genişlet (geçiş bölgeleri)
+    half = window // 2
+    csum = np.concatenate([[0], np.cumsum(bad, dtype=np.int64)])
+    idx = np.arange(len(x))
+    lo = np.clip(idx - half, 0, len(x))
+    hi = np.clip(idx + half + 1, 0, len(x))
+    return (csum[hi] - csum[lo]) > 0
+
+
+def preprocess_channel(times_s: np.ndarray, x: np.ndarray, fs: float, settings: dict):
+    """
+    Tek kanal: yeniden örnekleme → filtre → artefakt maskesi
+
+    Returns:
+        (t_grid, temiz sinyal float32 (artefakt = NaN), artefakt maskesi)
+    """
+    t, grid = resample_uniform(times_s, x, fs)
+    sos = design_filter(settings['band'], fs)
+    filtered = filter_chunked(grid, sos, fs) if sos is not None else grid
+    bad = detect_artifacts(filtered, fs, settings)
+    clean = filtered.copy()
+    clean[bad] = np.nan
+    return t, clean, bad
+
+
+def preprocess_shimmer(shimmer_df: pd.DataFrame, channels: dict, fs: float = None,
+                       time_col: str = 'Time (s)') -> pd.DataFrame:
+    """
+    Shimmer kaydını düzgün ızgarada temizlenmiş bir DataFrame'e dönüştürür
+
+    Args:
+        shimmer_df: Ham Shimmer DataFrame
+        channels: {'GSR': sütun, 'PPG': sütun} (find_signal_columns çıktısı)
+        fs: Hedef örnekleme hızı; None ise nominal hız kullanılır
+        time_col: Shimmer saati sütunu (sn)
+
+    Returns:
+        time_col + aynı adlı temizlenmiş sinyal sütunları (float32, artefakt = NaN)
+    """
+    raw_t = shimmer_df[time_col].to_numpy(dtype=np.float64)
+    order = np.argsort(raw_t, kind='stable')
+    raw_t = raw_t[order]
+    keep = np.concatenate([[True], np.diff(raw_t) > 0])  # yinelenen zaman damgaları
+    raw_t = raw_t[keep]
+    fs = fs or round(nominal_rate(raw_t))
+
+    out = {}
+    for name, col in channels.items():
+        x = shimmer_df[col].to_numpy(dtype=np.float64)[order][keep]
+        t, clean, bad = preprocess_channel(raw_t, x, fs, CHANNEL_SETTINGS.get(name, CHANNEL_SETTINGS['GSR']))
+        out.setdefault(time_col, t)
+        out[col] = clean
+        print(f"   🧹 {name}: {fs:g} Hz ızgara, artefakt oranı %{bad.mean() * 100:.1f}")
+    return pd.DataFrame(out)
+
+
+def trial_quality(sample_ns: np.ndarray, valid: np.ndarray, event_ns: np.ndarray,
+                  fs: float, window: tuple = QUALITY_WINDOW) -> np.ndarray:
+    """
+    Deneme penceresindeki temiz örnek oranı (0-1)
+
+    Beklenen örnek sayısı pencere süresi × fs'dir; kayıt dışında kalan
+    bölümler de kalitesiz sayılır.
+    """
+    start = np.searchsorted(sample_ns, event_ns + int(window[0] * 1e9))
+    stop = np.searchsorted(sample_ns, event_ns + int(window[1] * 1e9))
+    csum = np.concatenate([[0], np.cumsum(valid)])
+    expected = (window[1] - window[0]) * fs
+    return np.clip((csum[stop] - csum[start]) / expected, 0.0, 1.0)
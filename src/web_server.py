@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IGT Web Session Server
+Görevi tarayıcı üzerinden çok sayıda eşzamanlı çevrimiçi katılımcıya sunar
+(asyncio HTTP, yalnızca standart kütüphane + uygulamanın çekirdek mantığı)
+
+    GET  /             görev sayfası (HTML + JS)
+    POST /api/start    yeni oturum: {age, gender, lang, subject_id?} → oturum anahtarı
+    POST /api/choice   deste seçimi: {token, deck, rt_ms?} → kazanç, ceza, bakiye
+    GET  /status       canlı / tamamlanan oturumlar, yazıcı istatistikleri
+
+- Desteler masaüstü uygulamasıyla aynı tohumlu çizelge motorundan
+  (schedule_batch) üretilir; tohum oturumla birlikte saklanır
+- Oturum durumu bellekte küçük tutulur: __slots__ nesnesi, int32 çizelge
+  dizisi ve TrialBuffer (≈ 6 KB / oturum)
+- Zamanlama sunucudadır: denemeler Config.FEEDBACK_DURATION_MS aralığıyla
+  açılır, erken gelen seçimler reddedilir, zaman damgaları sunucu saatidir;
+  tarayıcının ölçtüğü tepki süresi sunucunun gözlediği aralığı aşamaz
+- Tamamlanan oturumlar collection_server yazıcısıyla toplu commit edilir
+  (aynı şema, metrikler dahil) ve ancak commit'ten sonra bellekten silinir;
+  yazılamayan oturum tekrar gönderilen son seçimde veya zaman aşımı
+  taramasında yeniden denenir. Yarım kalan oturumlar zaman aşımında silinir
+
+Author: Dr. H. Fehmi ÖZEL
+"""
+
+import sys
+import time
+import json
+import asyncio
+import secrets
+import logging
+from datetime import datetime
+
+import numpy as np
+
+from main import (Config, LanguageConfig, Strings, TrialBuffer, DECK_NAMES,
+                  schedule_batch, new_schedule_seed, generate_subject_id)
+from collection_server import CollectionServer, HttpError, session_digest, DEFAULT_HOST
+
+DEFAULT_PORT = 8080
+DEFAULT_DB = 'igt_web.db'
+STATION_NAME = 'web'
+IDLE_TIMEOUT_S = 30 * 60          # Yarım kalan oturumun bellekte kalma süresi
+SWEEP_INTERVAL_S = 60
+CLOCK_SLACK_NS = 10_000_000       # Erken seçim kontrolünde zamanlayıcı payı (10 ms)
+MAX_SESSIONS_LIVE = 10000
+
+# Sayfaya gönderilen arayüz metinleri (Strings)
+PAGE_STRINGS = ('app_title', 'instructions_title', 'instructions_text', 'start', 'trial',
+                'balance', 'select_deck', 'reward', 'penalty', 'no_penalty', 'net',
+                'test_complete', 'final_balance_label', 'net_change', 'age_label',
+                'gender_label', 'male', 'female', 'participant_id_label')
+
+# Masaüstü uygulamasıyla aynı cinsiyet kodları (M/F)
+GENDER_CODES = {'m': 'M', 'male': 'M', 'erkek': 'M',
+                'f': 'F', 'female': 'F', 'kadın': 'F', 'kadin': 'F'}
+
+
+class WebSession:
+    """Tek bir çevrimiçi oturumun bellekteki durumu"""
+    __slots__ = ('token', 'session_id', 'lang', 'rewards', 'schedule', 'draws',
+                 'balance', 'start_balance', 'buffer', 'ready_ns', 'last_seen', 'final', 'saving')
+
+    def __init__(self, participant_info: dict, lang: str, seed: int):
+        lang_config = getattr(LanguageConfig, lang)
+        base_lists = [lang_config[f"penalty_{name.lower()}"] * 10 for name in DECK_NAMES]
+        start_time = datetime.now()
+        self.token = secrets.token_urlsafe(16)
+        self.session_id = (f"WEB_{participant_info['subject_id']}_"
+                           f"{start_time.strftime('%Y-%m-%d_%H-%M-%S')}_{self.token[:6]}")
+        self.lang = lang
+        self.rewards = (lang_config['reward_bad'],) * 2 + (lang_config['reward_good'],) * 2
+        self.schedule = schedule_batch([seed], base_lists)[0].astype(np.int32)
+        self.draws = [0, 0, 0, 0]
+        self.start_balance = self.balance = lang_config['start_balance']
+        self.buffer = TrialBuffer(participant_info, start_time, schedule_seed=seed)
+        self.ready_ns = time.monotonic_ns()
+        self.last_seen = time.monotonic()
+        self.final = None      # son denemenin yanıtı (oturum tamamlandı, kayıt bekliyor)
+        self.saving = None     # yazıcıdaki kaydın future'ı
+
+    def choose(self, deck_idx: int, client_rt: float, now_ns: int, feedback_ns: int) -> dict:
+        """Seçimi işler ve geri bildirimi döndürür (sunucu zamanlaması)"""
+        if now_ns < self.ready_ns - CLOCK_SLACK_NS:
+            raise HttpError(409, "deneme henüz başlamadı")
+        server_rt = max(0.0, (now_ns - self.ready_ns) / 1e9)
+        reaction_time = server_rt if client_rt is None else min(max(client_rt, 0.0), server_rt)
+
+        schedule = self.schedule[deck_idx]
+        penalty = int(schedule[self.draws[deck_idx] % len(schedule)])
+        self.draws[deck_idx] += 1
+        reward = self.rewards[deck_idx]
+        net = reward + penalty
+        self.balance += net
+        self.buffer.append(deck_idx, reaction_time, reward, penalty, net,
+                           self.balance, datetime.now())
+        self.ready_ns = time.monotonic_ns() + feedback_ns
+        self.last_seen = time.monotonic()
+        return {'trial': len(self.buffer), 'deck': DECK_NAMES[deck_idx], 'reward': reward,
+                'penalty': penalty, 'net': net, 'balance': self.balance}
+
+    def to_item(self) -> dict:
+        """Tamamlanan oturum, collection_server paket biçiminde"""
+        buffer = self.buffer
+        v = buffer.view
+        final_balance = buffer.final_balance
+        return {
+            'session': {
+                'session_id': self.session_id, 'subject_id': buffer.subject_id,
+                'age': buffer.age, 'gender': buffer.gender,
+                'start_time': buffer.start_time.isoformat(timespec='seconds'),
+                'end_time': datetime.now().isoformat(timespec='seconds'),
+                'trials_completed': len(buffer), 'final_balance': final_balance,
+                'net_change': final_balance - self.start_balance,
+                't0_ns': buffer.t0_ns, 'schedule_seed': buffer.schedule_seed,
+            },
+            'trials': {
+                'trial_number': v['trial_number'].tolist(), 'deck': v['deck'].tolist(),
+                'reaction_time': v['reaction_time'].tolist(), 'reward': v['reward'].tolist(),
+                'penalty': v['penalty'].tolist(), 'net_outcome': v['net_outcome'].tolist(),
+                'total_balance': v['total_balance'].tolist(),
+                't_ns': (v['timestamp_ns'] - buffer.t0_ns).tolist(),
+            },
+        }
+
+
+def parse_json(body: bytes) -> dict:
+    """İstek gövdesi (JSON nesnesi)"""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise HttpError(400, "geçersiz JSON")
+    if not isinstance(data, dict):
+        raise HttpError(400, "JSON nesnesi bekleniyor")
+    return data
+
+
+class WebServer(CollectionServer):
+    """
+    Çevrimiçi oturum sunucusu
+
+    Veritabanı thread'i ve toplu yazıcı CollectionServer'dan gelir; oturum
+    işlemleri (seçim, puanlama) olay döngüsünde bellekte yürütülür.
+    """
+
+    def __init__(self, db_path: str, max_trials: int = None, feedback_ms: int = None,
+                 idle_timeout: float = IDLE_TIMEOUT_S):
+        super().__init__(db_path)
+        self.max_trials = max_trials or Config.MAX_TRIALS
+        self.feedback_ms = Config.FEEDBACK_DURATION_MS if feedback_ms is None else feedback_ms
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.stats.update({'started': 0, 'completed': 0, 'abandoned': 0, 'choices': 0})
+
+    def start_session(self, data: dict) -> dict:
+        """Yeni oturum oluşturur"""
+        if len(self.sessions) >= MAX_SESSIONS_LIVE:
+            raise HttpError(503, "sunucu dolu, lütfen daha sonra deneyin")
+        lang = str(data.get('lang') or 'TR').upper()
+        if lang not in ('TR', 'EN'):
+            raise HttpError(400, "lang TR veya EN olmalı")
+        try:
+            age = int(data.get('age'))
+        except (TypeError, ValueError):
+            raise HttpError(400, "geçersiz yaş")
+        gender = GENDER_CODES.get(str(data.get('gender') or '').strip().lower())
+        if gender is None:
+            raise HttpError(400, "geçersiz cinsiyet (M veya F)")
+        subject_id = str(data.get('subject_id') or '').strip()[:64] or \
+            f"{generate_subject_id()}{secrets.token_hex(2)}"
+
+        session = WebSession({'subject_id': subject_id, 'age': age, 'gender': gender},
+                             lang, new_schedule_seed())
+        self.sessions[session.token] = session
+        self.stats['started'] += 1
+        strings = dict(getattr(Strings, lang))
+        strings['instructions_text'] = strings['instructions_text'].format(
+            balance=session.balance, currency=getattr(LanguageConfig, lang)['currency'])
+        return {'token': session.token, 'session_id': session.session_id,
+                'subject_id': subject_id, 'start_balance': session.balance,
+                'currency': getattr(LanguageConfig, lang)['currency'],
+                'max_trials': self.max_trials, 'feedback_ms': self.feedback_ms,
+                'strings': {key: strings[key] for key in PAGE_STRINGS}}
+
+    async def choose(self, data: dict) -> dict:
+        """Seçimi işler; son denemede oturumu toplu yazıcıya iletir"""
+        session = self.sessions.get(data.get('token'))
+        if session is None:
+            raise HttpError(404, "oturum bulunamadı veya zaman aşımına uğradı")
+        deck = data.get('deck')
+        deck_idx = DECK_NAMES.index(deck) if deck in DECK_NAMES else deck
+        if not isinstance(deck_idx, int) or not 0 <= deck_idx < len(DECK_NAMES):
+            raise HttpError(400, "geçersiz deste")
+        try:
+            client_rt = None if data.get('rt_ms') is None else float(data['rt_ms']) / 1000
+        except (TypeError, ValueError):
+            raise HttpError(400, "geçersiz rt_ms")
+
+        if session.final is not None:
+            # Son seçim işlendi ama kayıt bekliyor / başarısız oldu: yeni seçim yerine kayıt denenir
+            result = session.final
+        else:
+            result = session.choose(deck_idx, client_rt, time.monotonic_ns(),
+                                    self.feedback_ms * 1_000_000)
+            self.stats['choices'] += 1
+            result['done'] = len(session.buffer) >= self.max_trials
+            if not result['done']:
+                return result
+            result['net_change'] = session.balance - session.start_balance
+            session.final = result
+        try:
+            await asyncio.shield(self.save(session))
+        except Exception as e:
+            raise HttpError(503, f"oturum kaydedilemedi, lütfen tekrar deneyin: {e}")
+        return result
+
+    def save(self, session: WebSession) -> asyncio.Future:
+        """Tamamlanan oturumu toplu yazıcıya iletir (kayıt sürüyorsa aynı future döner)"""
+        if session.saving is None:
+            item = session.to_item()
+            session.saving = asyncio.get_running_loop().create_future()
+            session.saving.add_done_callback(lambda future: self.saved(session, future))
+            self.queue.put_nowait((STATION_NAME, [(item, session_digest(item))], session.saving))
+        return session.saving
+
+    def saved(self, session: WebSession, future: asyncio.Future):
+        """Oturum yalnızca commit'ten sonra bellekten silinir; hata olursa sonra tekrar denenir"""
+        if future.cancelled() or future.exception() is not None:
+            session.saving = None
+            logging.error(f"❌ {session.session_id} kaydedilemedi, bellekte tutuluyor")
+            return
+        if self.sessions.pop(session.token, None) is not None:
+            self.stats['completed'] += 1
+
+    async def sweep_loop(self):
+        """Zaman aşımına uğrayan yarım oturumları siler, kaydedilemeyen tamamlanmışları yeniden dener"""
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL_S)
+            cutoff = time.monotonic() - self.idle_timeout
+            stale = [s for s in self.sessions.values() if s.last_seen < cutoff]
+            for session in stale:
+                if session.final is not None:
+                    self.save(session)
+                    continue
+                del self.sessions[session.token]
+                self.stats['abandoned'] += 1
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        """İstek yönlendirme"""
+        path = target.split('?', 1)[0].rstrip('/') or '/'
+        if path == '/':
+            if method != 'GET':
+                raise HttpError(405, "GET bekleniyor")
+            return 200, PAGE_HTML.encode('utf-8'), 'text/html'
+        if path in ('/api/start', '/api/choice'):
+            if method != 'POST':
+                raise HttpError(405, "POST bekleniyor")
+            data = parse_json(body)
+            if path == '/api/start':
+                return 200, self.start_session(data)
+            return 200, await self.choose(data)
+        if path == '/status':
+            _, status = await super().dispatch(method, target, headers, body)
+            return 200, {**status, 'live_sessions': len(self.sessions)}
+        raise HttpError(404, f"bilinmeyen yol: {path}")
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        listener = await super().start(host, port)
+        self.sweep_task = asyncio.create_task(self.sweep_loop())
+        return listener
+
+    async def close(self):
+        self.sweep_task.cancel()
+        unsaved = sum(s.final is not None for s in self.sessions.values())
+        if unsaved:
+            logging.error(f"❌ {unsaved} tamamlanmış oturum kaydedilemeden kapatıldı")
+        if len(self.sessions) > unsaved:
+            logging.info(f"⚠️ {len(self.sessions) - unsaved} yarım oturum kaydedilmeden kapatıldı")
+        await super().close()
+
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Iowa Gambling Task</title>
+<style>
+body { background: #0f0f1e; color: #fff; font-family: Arial, sans-serif; text-align: center; margin: 0; }
+main { max-width: 960px; margin: 0 auto; padding: 24px; }
+.bar { display: flex; justify-content: space-between; color: #95a5a6; font-size: 18px; }
+.bar b { color: #f1c40f; }
+.decks { display: flex; justify-content: center; gap: 20px; margin: 40px 0; }
+.deck { width: 160px; height: 240px; border-radius: 14px; border: 3px solid #fff; font-size: 48px;
+        font-weight: bold; color: #fff; cursor: pointer; }
+.deck:disabled { opacity: 0.45; cursor: default; }
+#feedback { min-height: 90px; background: #2d3436; border-radius: 12px; padding: 16px; font-size: 22px;
+            visibility: hidden; white-space: pre-line; }
+input, select, button.main { font-size: 18px; padding: 8px 12px; margin: 6px; }
+#instructions { white-space: pre-line; text-align: left; line-height: 1.5; }
+</style></head>
+<body><main>
+<section id="setup">
+  <h1>IOWA GAMBLING TASK</h1>
+  <p><select id="lang"><option value="TR">Türkçe</option><option value="EN">English</option></select></p>
+  <p><input id="subject" placeholder="ID"> <input id="age" type="number" min="5" max="120" placeholder="Yaş / Age">
+     <select id="gender"><option value="M">Erkek / Male</option><option value="F">Kadın / Female</option></select></p>
+  <button class="main" id="begin">▶</button> <p id="error" style="color:#e74c3c"></p>
+</section>
+<section id="intro" hidden><h2 id="intro_title"></h2><p id="instructions"></p><button class="main" id="go"></button></section>
+<section id="task" hidden>
+  <div class="bar"><span id="trial"></span><span><b id="balance"></b></span></div>
+  <h2 id="prompt"></h2>
+  <div class="decks"></div>
+  <div id="feedback"></div>
+</section>
+<section id="done" hidden><h1 id="done_title"></h1><p id="summary" style="font-size:24px"></p></section>
+</main>
+<script>
+const COLORS = {A: '#e94560', B: '#f39c12', C: '#00b894', D: '#0984e3'};
+let S = null, T = null, shownAt = 0, busy = false;
+const $ = id => document.getElementById(id);
+async function post(url, data) {
+  const r = await fetch(url, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(data)});
+  const body = await r.json();
+  if (!r.ok) throw new Error(body.error || r.status);
+  return body;
+}
+function money(v) { return v.toLocaleString() + ' ' + S.currency; }
+function show(id) { for (const s of ['setup', 'intro', 'task', 'done']) $(s).hidden = s !== id; }
+function enable(on) { document.querySelectorAll('.deck').forEach(b => b.disabled = !on); if (on) shownAt = performance.now(); }
+$('begin').onclick = async () => {
+  try {
+    S = await post('/api/start', {lang: $('lang').value, subject_id: $('subject').value,
+                                  age: $('age').value, gender: $('gender').value});
+  } catch (e) { $('error').textContent = e.message; return; }
+  T = S.strings;
+  $('intro_title').textContent = T.instructions_title; $('instructions').textContent = T.instructions_text;
+  $('go').textContent = T.start; $('prompt').textContent = T.select_deck;
+  show('intro');
+};
+$('go').onclick = () => {
+  const decks = document.querySelector('.decks');
+  for (const name of 'ABCD') {
+    const b = document.createElement('button');
+    b.className = 'deck'; b.textContent = name; b.style.background = COLORS[name];
+    b.onclick = () => choose(name); decks.appendChild(b);
+  }
+  $('trial').textContent = T.trial + ': 0/' + S.max_trials;
+  $('balance').textContent = '💰 ' + T.balance + ': ' + money(S.start_balance);
+  show('task'); enable(true);
+};
+async function choose(name) {
+  if (busy) return;
+  busy = true; enable(false);
+  const rt = performance.now() - shownAt;
+  let r;
+  try { r = await post('/api/choice', {token: S.token, deck: name, rt_ms: rt}); }
+  catch (e) { $('feedback').textContent = e.message; busy = false; enable(true); return; }
+  const fb = $('feedback');
+  fb.textContent = T.reward + ': +' + money(r.reward) + '\\n' +
+    (r.penalty ? T.penalty + ': ' + money(r.penalty) : T.no_penalty) + '\\n' + T.net + ': ' + money(r.net);
+  fb.style.visibility = 'visible';
+  $('trial').textContent = T.trial + ': ' + r.trial + '/' + S.max_trials;
+  $('balance').textContent = '💰 ' + T.balance + ': ' + money(r.balance);
+  setTimeout(() => {
+    fb.style.visibility = 'hidden'; busy = false;
+    if (r.done) {
+      $('done_title').textContent = T.test_complete;
+      $('summary').textContent = T.final_balance_label + ': ' + money(r.balance) + ' | ' + T.net_change + ': ' + money(r.net_change);
+      show('done');
+    } else enable(true);
+  }, S.feedback_ms);
+}
+</script></body></html>
+"""
+
+
+async def serve(db_path: str, host: str, port: int, max_trials: int = None, feedback_ms: int = None):
+    """Sunucuyu durdurulana kadar çalıştırır"""
+    server = WebServer(db_path, max_trials, feedback_ms)
+    listener = await server.start(host, port)
+    print(f"🌐 Görev sayfası: http://{host}:{port}/  (depo: {db_path})")
+    print("   Durdurmak için Ctrl+C")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    """Ana fonksiyon"""
+    print("=" * 60)
+    print("🌐 IGT Web Oturum Sunucusu")
+    print("=" * 60)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in options:
+        print("\nKullanım:")
+        print("  python3 web_server.py [web.db] [--host=127.0.0.1] [--port=8080] "
+              "[--trials=100] [--feedback-ms=2000]")
+        print("\nÖrnek:")
+        print("  python3 web_server.py Sonuclar/igt_web.db --host=0.0.0.0")
+        sys.exit(0)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(serve(args[0] if args else DEFAULT_DB,
+                          options.get('host') or DEFAULT_HOST,
+                          int(options.get('port') or DEFAULT_PORT),
+                          int(options['trials']) if options.get('trials') else None,
+                          int(options['feedback-ms']) if options.get('feedback-ms') else None))
+    except KeyboardInterrupt:
+        print("\n👋 Sunucu durduruldu")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Merge Pipeline Benchmark - Synthetic Shimmer/IGT Sessions
+Generates synthetic Shimmer exports (tonic drift + Bateman SCRs locked to
+trial times, PPG pulse train, sensor noise, irregular sample spacing) with
+matching IGT CSVs in the real schema, then times each stage of the
+merge_shimmer_igt pipeline across recording durations and sampling rates.
+
+Each configuration is generated in one subprocess and merged in a fresh one,
+so the reported peak RSS belongs to load → preprocess → merge → write only.
+Recovered SCR amplitudes are checked against ground truth:
+  - window truth: the merger's baseline/peak definition applied to the
+    noise-free signal at the exact trial times (pipeline accuracy)
+  - kernel truth: the amplitude of the injected SCR kernel (correlation)
+IGT CSVs carry ms trial times as the app writes them; accuracy is also
+reported for archived CSVs with whole-second Trial_Real_Time.
+
+Usage:
+    python validation/benchmark_merge.py [--quick] [--minutes=1,10,60,240]
+        [--rates=128,256,512,1024] [--variants=time,timestamp]
+        [--out=benchmark_merge.json] [--compare=baseline.json]
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import resource
+import tempfile
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from scipy.signal import oaconvolve
+
+import merge_shimmer_igt as merger
+
+DEFAULT_MINUTES = (1, 10, 60, 240)
+DEFAULT_RATES = (128, 256, 512, 1024)
+QUICK_MINUTES = (1, 10)
+QUICK_RATES = (128, 512)
+VARIANTS = ('time', 'timestamp')
+
+SESSION_START = datetime(2025, 12, 20, 10, 0, 0)
+TRIAL_SPACING_S = (5.0, 8.0)      # inter-choice interval (uniform)
+SCR_LATENCY_S = (1.5, 2.5)        # choice → SCR onset
+SCR_RESPONSE_RATE = 0.8
+TAU_ONSET, TAU_RECOVERY = 0.75, 2.0
+GSR_NOISE_US = 0.005
+PPG_NOISE = 5.0
+JITTER = 0.02                     # sample spacing jitter (fraction of nominal interval)
+SLOWDOWN_LIMIT = 1.2              # --compare: a stage this many times slower is a regression
+MIN_COMPARE_S = 0.05              # --compare: shorter stages are timer noise
+SEED = 42
+
+
+def bateman_kernel(fs):
+    """Bateman SCR kernel scaled to unit peak"""
+    t = np.arange(0, 10 * TAU_RECOVERY, 1.0 / fs)
+    kernel = np.exp(-t / TAU_RECOVERY) - np.exp(-t / TAU_ONSET)
+    return kernel / kernel.max()
+
+
+def synthetic_session(minutes, fs, rng):
+    """
+    Time axis, signals and trial events for one synthetic session
+
+    Returns:
+        dict: times_s, gsr, gsr_clean, ppg, event_s, amplitudes
+    """
+    duration = minutes * 60.0
+    n = int(duration * fs)
+    # Irregular but increasing sample times (Shimmer clock jitter)
+    steps = (1.0 + rng.uniform(-JITTER, JITTER, n - 1)) / fs
+    times_s = np.concatenate([[0.0], np.cumsum(steps)])
+
+    spacing = rng.uniform(*TRIAL_SPACING_S, int(duration / TRIAL_SPACING_S[0]) + 1)
+    event_s = 10.0 + np.cumsum(spacing)
+    event_s = event_s[event_s < duration - 10.0]
+    if len(event_s) == 0:
+        event_s = np.array([duration / 2])
+    responds = rng.random(len(event_s)) < SCR_RESPONSE_RATE
+    amplitudes = np.where(responds, rng.lognormal(np.log(0.3), 0.5, len(event_s)), 0.0)
+
+    # Tonic: slow oscillation + linear drift; phasic: Bateman responses locked to trials
+    tonic = 2.0 + 0.5 * np.sin(2 * np.pi * times_s / 1800.0) + 0.1 * times_s / 3600.0
+    onsets = np.searchsorted(times_s, event_s + rng.uniform(*SCR_LATENCY_S, len(event_s)))
+    impulses = np.zeros(n)
+    np.add.at(impulses, np.minimum(onsets, n - 1), amplitudes)
+    phasic = oaconvolve(impulses, bateman_kernel(fs))[:n]
+    gsr_clean = tonic + phasic
+    gsr = gsr_clean + rng.normal(0.0, GSR_NOISE_US, n)
+
+    # PPG: pulse wave with varying heart rate (phase integration)
+    hr_hz = (70.0 + 5.0 * np.sin(2 * np.pi * times_s / 60.0)) / 60.0
+    phase = 2 * np.pi * np.concatenate([[0.0], np.cumsum(hr_hz[:-1] * steps)])
+    ppg = (1500.0 + 40.0 * np.sin(phase) + 15.0 * np.sin(2 * phase - 0.8)
+           + rng.normal(0.0, PPG_NOISE, n))
+
+    return {
+        'times_s': times_s, 'gsr': gsr, 'gsr_clean': gsr_clean, 'ppg': ppg,
+        'event_s': event_s, 'amplitudes': amplitudes,
+    }
+
+
+def igt_frame(event_s, rng):
+    """IGT table in the real CSV schema (Sync_Timestamp = Shimmer 0 s)"""
+    n = len(event_s)
+    decks = rng.integers(0, 4, n)
+    reward = np.where(decks < 2, 100, 50)
+    penalty = np.where(rng.random(n) < 0.5, -np.where(decks < 2, 250, 50), 0)
+    net = reward + penalty
+    trial_times = SESSION_START + pd.to_timedelta(event_s, unit='s')
+    sync = [None] * n
+    sync[0] = SESSION_START.isoformat(timespec='milliseconds')
+    return pd.DataFrame({
+        'Subject_ID': 'BENCH',
+        'Subject_Age': 30,
+        'Subject_Gender': 'M',
+        'Experiment_Start': SESSION_START.isoformat(timespec='seconds'),
+        'Trial_Number': np.arange(1, n + 1),
+        'Deck_Selected': np.array(list('ABCD'))[decks],
+        'Reaction_Time': np.round(rng.uniform(0.8, 2.5, n), 3),
+        'Reward': reward,
+        'Penalty': penalty,
+        'Net_Outcome': net,
+        'Total_Balance': 2000 + np.cumsum(net),
+        # As TrialBuffer.to_dataframe writes it (ms); archives from before are scored too
+        'Trial_Real_Time': np.datetime_as_string(trial_times.to_numpy(), unit='ms'),
+        'Sync_Timestamp': sync,
+    })
+
+
+def window_truth(session):
+    """The merger's SCR definition on the noise-free signal at exact trial times"""
+    to_ns = lambda s: np.round(s * 1e9).astype(np.int64)
+    sample_ns, event_ns = to_ns(session['times_s']), to_ns(session['event_s'])
+    baseline = merger.window_stat(sample_ns, session['gsr_clean'], event_ns, (-2.0, 0.0), 'mean')
+    peak = merger.window_stat(sample_ns, session['gsr_clean'], event_ns, (1.0, 5.0), 'max',
+                              closed='both')
+    return peak - baseline
+
+
+def generate_job(job):
+    """Subprocess: writes one synthetic session to disk, returns file paths"""
+    minutes, fs, variant, workdir = job
+    rng = np.random.default_rng(SEED + int(minutes * 10000 + fs))
+    start = time.perf_counter()
+    session = synthetic_session(minutes, fs, rng)
+
+    tag = f"{minutes:g}min_{fs}Hz_{variant}"
+    igt_csv = os.path.join(workdir, f"IGT_{tag}.csv")
+    shimmer_csv = os.path.join(workdir, f"Shimmer_{tag}.csv")
+    truth_npz = os.path.join(workdir, f"Truth_{tag}.npz")
+
+    igt_frame(session['event_s'], rng).to_csv(igt_csv, index=False)
+    time_col = (('Time (s)', session['times_s']) if variant == 'time'
+                else ('Timestamp (ms)', session['times_s'] * 1000.0))
+    pd.DataFrame({
+        time_col[0]: time_col[1],
+        'GSR_Skin_Conductance_CAL': session['gsr'].astype(np.float32),
+        'PPG_A13_CAL': session['ppg'].astype(np.float32),
+    }).to_csv(shimmer_csv, index=False)
+    np.savez(truth_npz, window=window_truth(session), kernel=session['amplitudes'])
+    return {
+        'igt_csv': igt_csv, 'shimmer_csv': shimmer_csv, 'truth_npz': truth_npz,
+        'n_samples': len(session['times_s']), 'n_trials': len(session['event_s']),
+        'csv_mb': os.path.getsize(shimmer_csv) / 1e6,
+        'generate_s': time.perf_counter() - start,
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss: KB on Linux, bytes on macOS)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def merge_job(files):
+    """Subprocess: times the merge_session steps stage by stage"""
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        igt_df = merger.load_igt_data(files['igt_csv'])
+        shimmer_df = merger.load_shimmer_data(files['shimmer_csv'])
+        timings['load_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sync_points = merger.gather_sync_points(shimmer_df, None)
+        shimmer_df = merger.preprocess_shimmer(shimmer_df, merger.find_signal_columns(shimmer_df))
+        timings['preprocess_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merged_df = merger.merge_data(igt_df, shimmer_df, sync_points=sync_points)
+        timings['merge_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output_file = files['igt_csv'].replace('.csv', '_Shimmer.csv')
+        merged_df.to_csv(output_file, index=False)
+        timings['write_s'] = time.perf_counter() - start
+
+    timings['total_s'] = sum(timings.values())
+    timings['peak_rss_mb'] = peak_rss_mb()
+    timings.update(scr_accuracy(merged_df['SCR_Amplitude_uS'].to_numpy(), files['truth_npz']))
+
+    # Archived CSVs written before ms timestamps: trial times truncated to whole seconds
+    igt_df['Trial_Real_Time'] = igt_df['Trial_Real_Time'].str[:19]
+    igt_df['IGT_Time'] = pd.to_datetime(igt_df['Trial_Real_Time'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_df = merger.merge_data(igt_df, shimmer_df, sync_points=sync_points)
+    legacy = scr_accuracy(legacy_df['SCR_Amplitude_uS'].to_numpy(), files['truth_npz'])
+    timings['scr_mae_uS_legacy_s'] = legacy['scr_mae_uS']
+    timings['scr_r_window_legacy_s'] = legacy['scr_r_window']
+    return timings
+
+
+def scr_accuracy(recovered, truth_npz):
+    """Compares recovered SCR amplitudes with ground truth"""
+    truth = np.load(truth_npz)
+    window, kernel = truth['window'], truth['kernel']
+    valid = np.isfinite(recovered) & np.isfinite(window)
+    if valid.sum() < 3:
+        return {'scr_valid': int(valid.sum()), 'scr_mae_uS': None,
+                'scr_r_window': None, 'scr_r_kernel': None}
+    return {
+        'scr_valid': int(valid.sum()),
+        'scr_mae_uS': float(np.mean(np.abs(recovered[valid] - window[valid]))),
+        'scr_r_window': float(np.corrcoef(recovered[valid], window[valid])[0, 1]),
+        'scr_r_kernel': float(np.corrcoef(recovered[valid], kernel[valid])[0, 1]),
+    }
+
+
+def run_in_subprocess(func, arg):
+    """Runs func in a fresh process so measurements do not affect each other"""
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(func, arg).result()
+
+
+def run_benchmark(minutes_list, rates, variants):
+    """Runs every configuration and returns the result rows"""
+    results = []
+    for minutes in minutes_list:
+        for fs in rates:
+            for variant in variants:
+                workdir = tempfile.mkdtemp(prefix='igt_bench_')
+                try:
+                    files = run_in_subprocess(generate_job, (minutes, fs, variant, workdir))
+                    metrics = run_in_subprocess(merge_job, files)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                row = {'minutes': minutes, 'fs': fs, 'variant': variant,
+                       'n_samples': files['n_samples'], 'n_trials': files['n_trials'],
+                       'csv_mb': round(files['csv_mb'], 1),
+                       'generate_s': files['generate_s'], **metrics}
+                results.append(row)
+                print(f"   {minutes:>4g} min {fs:>5} Hz {variant:<9} "
+                      f"{row['n_samples']:>10,} samples | load {row['load_s']:6.2f} s, "
+                      f"preprocess {row['preprocess_s']:6.2f} s, merge {row['merge_s']:6.2f} s, "
+                      f"write {row['write_s']:5.2f} s | RSS {row['peak_rss_mb']:7.0f} MB | "
+                      f"SCR MAE {format_value(row['scr_mae_uS'], '.4f')} µS, "
+                      f"r={format_value(row['scr_r_window'], '.3f')} "
+                      f"(whole-second CSV: {format_value(row['scr_mae_uS_legacy_s'], '.4f')} µS, "
+                      f"r={format_value(row['scr_r_window_legacy_s'], '.3f')})")
+    return results
+
+
+def format_value(value, spec):
+    return 'n/a' if value is None else format(value, spec)
+
+
+def compare_results(results, baseline_path):
+    """Lists stage regressions against a previous JSON report"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['minutes'], r['fs'], r['variant']): r for r in json.load(f)['results']}
+    regressions = []
+    for row in results:
+        ref = baseline.get((row['minutes'], row['fs'], row['variant']))
+        if ref is None:
+            continue
+        for stage in ('load_s', 'preprocess_s', 'merge_s', 'write_s', 'peak_rss_mb'):
+            if stage.endswith('_s') and max(row[stage], ref.get(stage) or 0) < MIN_COMPARE_S:
+                continue
+            if ref.get(stage) and row[stage] > SLOWDOWN_LIMIT * ref[stage]:
+                regressions.append(f"{row['minutes']:g} min {row['fs']} Hz {row['variant']}: "
+                                   f"{stage} {ref[stage]:.2f} → {row[stage]:.2f}")
+    return regressions
+
+
+def parse_list(options, key, default, cast):
+    return tuple(cast(v) for v in options[key].split(',')) if key in options else default
+
+
+if __name__ == "__main__":
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    quick = 'quick' in options
+    minutes_list = parse_list(options, 'minutes', QUICK_MINUTES if quick else DEFAULT_MINUTES, float)
+    rates = parse_list(options, 'rates', QUICK_RATES if quick else DEFAULT_RATES, int)
+    variants = parse_list(options, 'variants', VARIANTS, str)
+    out_path = options.get('out') or 'benchmark_merge.json'
+
+    print(f"🔄 Running {len(minutes_list) * len(rates) * len(variants)} configurations: "
+          f"{', '.join(f'{m:g}' for m in minutes_list)} min × "
+          f"{', '.join(map(str, rates))} Hz × {', '.join(variants)}")
+    results = run_benchmark(minutes_list, rates, variants)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'results': results,
+    }
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"\n💾 Results: {out_path}")
+
+    ok = True
+    if options.get('compare'):
+        regressions = compare_results(results, options['compare'])
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        ok = not regressions
+        print("✅ No regressions" if ok else f"❌ {len(regressions)} regressions")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Memory Regression Check - Back-to-back Sessions
+Runs consecutive headless IGT sessions through IGTMainWindow and verifies
+that Python heap usage and live Qt widget counts stay flat.
+
+Usage:
+    python validation/memory_regression.py [n_sessions]
+"""
+import os
+import sys
+import gc
+import logging
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import main
+from main import IGTMainWindow, Config
+from PyQt6.QtCore import QCoreApplication, QEvent
+from PyQt6.QtWidgets import QApplication
+
+WARMUP_SESSIONS = 10
+MAX_HEAP_GROWTH_KB = 1024
+
+
+def flush_deletions(app):
+    """Process deleteLater() requests and collect garbage"""
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    app.processEvents()
+    gc.collect()
+
+
+def run_session(window, index):
+    """Drive one full session through the real screen flow"""
+    window.show_welcome()
+    window.welcome_screen.start_experiment()
+    window.instruction_screen.continue_signal.emit()
+    window.sync_screen.sync_complete.emit(datetime.now())
+
+    screen = window.experiment_screen
+    for trial in range(Config.MAX_TRIALS):
+        screen.trial_start_time = datetime.now()
+        screen.card_selected((trial + index) % 4)
+    screen.complete_experiment()
+    window.completion_screen.close_signal.emit()
+
+
+def run_memory_check(n_sessions=100):
+    print(f"🔄 Running {n_sessions} consecutive headless sessions...")
+    output_dir = tempfile.mkdtemp(prefix='igt_memcheck_')
+    main.get_output_dir = lambda: output_dir
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = IGTMainWindow()
+    logging.disable(logging.CRITICAL)
+    window.language_screen.select_language('TR')
+
+    tracemalloc.start()
+    baseline_heap = baseline_widgets = baseline_stack = None
+    for i in range(n_sessions):
+        run_session(window, i)
+        flush_deletions(app)
+        if i + 1 == WARMUP_SESSIONS:
+            baseline_heap = tracemalloc.get_traced_memory()[0]
+            baseline_widgets = len(app.allWidgets())
+            baseline_stack = window.stacked_widget.count()
+        if (i + 1) % 20 == 0:
+            print(f"   Session {i + 1}: heap={tracemalloc.get_traced_memory()[0] / 1024:.0f} KB, "
+                  f"widgets={len(app.allWidgets())}, screens={window.stacked_widget.count()}")
+
+    final_heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    final_widgets = len(app.allWidgets())
+    final_stack = window.stacked_widget.count()
+
+    growth_kb = (final_heap - baseline_heap) / 1024
+    print("\n📊 Results (after warm-up):")
+    print(f"   Heap growth: {growth_kb:+.0f} KB (limit {MAX_HEAP_GROWTH_KB} KB)")
+    print(f"   Live widgets: {baseline_widgets} → {final_widgets}")
+    print(f"   Stacked screens: {baseline_stack} → {final_stack}")
+
+    ok = (growth_kb <= MAX_HEAP_GROWTH_KB and final_widgets == baseline_widgets
+          and final_stack == baseline_stack)
+    print("✅ Memory is flat" if ok else "❌ Memory grows across sessions")
+    return ok
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sys.exit(0 if run_memory_check(n) else 1)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Parameter Recovery and Power Analysis - Simulated IGT Studies
+Simulates many studies with synthetic participants whose PVL-Delta / ORL
+parameters are known, playing the real penalty schedules of the TR and EN
+payoff sets (LanguageConfig) produced by the seeded schedule engine
+(schedule_batch, identical to Deck schedules with the same seed).
+
+  - power: two groups differing in one parameter (shift on the probit scale,
+    natural scale for unbounded parameters); the net score [(C+D) - (A+B)] is
+    compared with Welch's t-test in every simulated study
+  - recovery: cohorts drawn from the population are fitted back with the
+    hierarchical sampler (igt_bayes chains, twice its iterations) and
+    posterior means are correlated with the true parameters; fits with
+    max R̂ above 1.05 are counted but left out of the correlations
+
+Agents are vectorized: all participants of a batch of studies choose in
+one NumPy step per trial. Batches run in a process pool with SeedSequence
+seeds. Every finished batch is appended to a JSON-lines checkpoint, so an
+interrupted run continues where it stopped when started again with the
+same options.
+
+Usage:
+    python validation/power_analysis.py [--quick] [--model=pvl_delta|orl]
+        [--param=lambda] [--n=20,40,60,80,100] [--effects=0,0.25,0.5,0.75]
+        [--studies=1000] [--batch=100] [--payoffs=tr,en]
+        [--recovery-studies=4] [--recovery-n=100] [--chains=8] [--warmup=2000] [--samples=2000]
+        [--workers=N] [--seed=N] [--out=power_analysis]
+"""
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from scipy.special import ndtri
+from scipy.stats import ttest_ind
+
+from main import schedule_batch, LanguageConfig, Config, DECK_NAMES
+from igt_bayes import MODELS, N_CHAINS, N_WARMUP, N_SAMPLES, constrain, run_sampler, summarize
+
+PAYOFFS = {'tr': LanguageConfig.TR, 'en': LanguageConfig.EN}
+# Population medians (natural scale) and between-subject SD (probit scale)
+POPULATION = {
+    'pvl_delta': {'A': 0.2, 'alpha': 0.5, 'cons': 1.5, 'lambda': 1.5},
+    'orl': {'Arew': 0.2, 'Apun': 0.2, 'K': 1.0, 'betaF': 1.0, 'betaP': 1.0},
+}
+POPULATION_SD = 0.5
+DEFAULT_PARAM = {'pvl_delta': 'lambda', 'orl': 'betaF'}
+ALPHA = 0.05
+TARGET_POWER = 0.8
+RHAT_LIMIT = 1.05        # recovery fits above this are not converged and are left out
+
+DEFAULT_N = (20, 40, 60, 80, 100)
+DEFAULT_EFFECTS = (0.0, 0.25, 0.5, 0.75)
+QUICK_N = (10, 20)
+QUICK_EFFECTS = (0.0, 0.5)
+SEED = 42
+
+
+def population_phi(model):
+    """Population medians on the unconstrained (probit) scale"""
+    phi = []
+    for name, bounds in MODELS[model].items():
+        value = POPULATION[model][name]
+        phi.append(value if bounds is None else ndtri((value - bounds[0]) / (bounds[1] - bounds[0])))
+    return np.array(phi)
+
+
+def draw_participants(model, n, rng, param=None, shift=0.0):
+    """(n × d) unconstrained parameters; `param` is shifted by `shift`"""
+    phi = population_phi(model) + POPULATION_SD * rng.standard_normal((n, len(MODELS[model])))
+    if param is not None:
+        phi[:, list(MODELS[model]).index(param)] += shift
+    return phi
+
+
+def deck_schedules(payoffs, seeds):
+    """Penalty schedules (n × 4 × trials) for the given session seeds and rewards (4,)"""
+    rewards = np.array([payoffs['reward_bad']] * 2 + [payoffs['reward_good']] * 2)
+    penalties = [payoffs[f'penalty_{name.lower()}'] * 10 for name in DECK_NAMES]
+    return schedule_batch(seeds, penalties), rewards
+
+
+def session_seeds(rng, n):
+    """Schedule seeds for n simulated sessions"""
+    return rng.integers(0, 2**63 - 1, size=n)
+
+
+def simulate_agents(model, phi, schedules, rewards, rng, n_trials=Config.MAX_TRIALS):
+    """
+    Plays all participants in parallel
+
+    Outcomes are scaled by the bad-deck reward, as in igt_bayes.load_choice_data.
+
+    Returns:
+        (choice: n × trials deck codes, outcome: n × trials scaled net outcomes)
+    """
+    p = {k: v[:, None] for k, v in constrain(model, phi).items()}
+    n = len(phi)
+    rows = np.arange(n)
+    ev, ef, pers = np.zeros((n, 4)), np.zeros((n, 4)), np.zeros((n, 4))
+    drawn = np.zeros((n, 4), dtype=np.int64)
+    choice = np.empty((n, n_trials), dtype=np.int64)
+    outcome = np.empty((n, n_trials))
+    for t in range(n_trials):
+        if model == 'pvl_delta':
+            logits = (3.0 ** p['cons'] - 1.0) * ev
+        else:
+            logits = ev + p['betaF'] * ef + p['betaP'] * pers
+        prob = np.exp(logits - logits.max(axis=1, keepdims=True))
+        cumulative = prob.cumsum(axis=1)
+        deck = np.minimum((cumulative < rng.random((n, 1)) * cumulative[:, -1:]).sum(axis=1), 3)
+        penalty = schedules[rows, deck, drawn[rows, deck] % schedules.shape[2]]
+        drawn[rows, deck] += 1
+        x = (rewards[deck] + penalty) / rewards.max()
+        choice[:, t], outcome[:, t] = deck, x
+
+        chosen = deck[:, None] == np.arange(4)
+        x = x[:, None]
+        if model == 'pvl_delta':
+            magnitude = np.abs(x) ** p['alpha']
+            utility = np.where(x >= 0, magnitude, -p['lambda'] * magnitude)
+            ev += chosen * p['A'] * (utility - ev)
+        else:
+            gain = x >= 0
+            rate = np.where(gain, p['Arew'], p['Apun'])
+            other_rate = np.where(gain, p['Apun'], p['Arew'])
+            sign = np.sign(x)
+            ev += chosen * rate * (x - ev)
+            ef += np.where(chosen, rate, other_rate) * (np.where(chosen, sign, -sign / 3) - ef)
+            pers = np.where(chosen, 1.0, pers) / (3.0 ** p['K'])
+    return choice, outcome
+
+
+def net_scores(choice):
+    """(C+D) - (A+B) per participant"""
+    counts = (choice[..., None] == np.arange(4)).sum(axis=-2)
+    return counts[..., 2] + counts[..., 3] - counts[..., 0] - counts[..., 1]
+
+
+def power_job(job):
+    """One batch of two-group studies → per-study p-values and effect sizes"""
+    key, model, param, payoff, n, effect, n_studies, seed_seq = job
+    rng = np.random.default_rng(seed_seq)
+    schedules, rewards = deck_schedules(PAYOFFS[payoff], session_seeds(rng, 2 * n * n_studies))
+    phi = np.concatenate([draw_participants(model, n * n_studies, rng),
+                          draw_participants(model, n * n_studies, rng, param, effect)])
+    choice, _ = simulate_agents(model, phi, schedules, rewards, rng)
+    scores = net_scores(choice).reshape(2, n_studies, n).astype(np.float64)
+    test = ttest_ind(scores[1], scores[0], axis=1, equal_var=False)
+    pooled_sd = np.sqrt((scores[0].var(axis=1, ddof=1) + scores[1].var(axis=1, ddof=1)) / 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cohen_d = (scores[1].mean(axis=1) - scores[0].mean(axis=1)) / pooled_sd
+    return {'key': key, 'kind': 'power', 'payoffs': payoff, 'n': n, 'effect': effect,
+            'p_values': np.nan_to_num(test.pvalue, nan=1.0).tolist(),
+            'cohen_d': cohen_d.tolist()}
+
+
+def recovery_job(job):
+    """One simulated cohort fitted back with the hierarchical sampler"""
+    key, model, payoff, n, chains, warmup, samples, seed_seq = job
+    rng = np.random.default_rng(seed_seq)
+    schedules, rewards = deck_schedules(PAYOFFS[payoff], session_seeds(rng, n))
+    phi = draw_participants(model, n, rng)
+    choice, outcome = simulate_agents(model, phi, schedules, rewards, rng)
+    data = {'sids': np.arange(n), 'session_ids': np.arange(n).astype(str),
+            'choice': choice, 'outcome': outcome, 'valid': np.ones_like(choice, dtype=bool)}
+    fit = run_sampler(model, data, chains, warmup, samples,
+                      seed=int(seed_seq.generate_state(1)[0]), progress=False)
+    summary = summarize(model, fit, data)
+    truth = constrain(model, phi)
+    row = {'key': key, 'kind': 'recovery', 'payoffs': payoff, 'n': n,
+           'seconds': fit['seconds'], 'rhat_max': float(summary['rhat'].max())}
+    for name in MODELS[model]:
+        estimate = summary.loc[summary['parameter'] == name, 'mean'].to_numpy()
+        row[f'r_{name}'] = float(np.corrcoef(estimate, truth[name])[0, 1])
+        row[f'bias_{name}'] = float(np.mean(estimate - truth[name]))
+    return row
+
+
+def build_jobs(config):
+    """All jobs in a fixed order (seeds do not depend on which jobs are already done)"""
+    specs = []
+    for payoff in config['payoffs']:
+        for n in config['n']:
+            for effect in config['effects']:
+                for start in range(0, config['studies'], config['batch']):
+                    size = min(config['batch'], config['studies'] - start)
+                    specs.append(('power', f"power|{payoff}|{n}|{effect}|{start}",
+                                  (config['model'], config['param'], payoff, n, effect, size)))
+        for study in range(config['recovery_studies']):
+            specs.append(('recovery', f"recovery|{payoff}|{study}",
+                          (config['model'], payoff, config['recovery_n'], config['chains'],
+                           config['warmup'], config['samples'])))
+    seeds = np.random.SeedSequence(config['seed']).spawn(len(specs))
+    return [(kind, (key, *args, seed)) for (kind, key, args), seed in zip(specs, seeds)]
+
+
+def load_checkpoint(path, config):
+    """Finished job rows from a previous run with the same configuration"""
+    if not os.path.exists(path):
+        return []
+    lines = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                lines.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Interrupted while writing the last line: keep the complete ones
+                with open(path, 'w', encoding='utf-8') as out:
+                    out.writelines(json.dumps(row) + '\n' for row in lines)
+                break
+    if not lines or lines[0].get('config') != config:
+        raise ValueError(f"{path} belongs to a different configuration; remove it or change --out")
+    return lines[1:]
+
+
+def run_study(config, checkpoint_path, workers=None):
+    """Runs the missing jobs, appending each result to the checkpoint"""
+    rows = load_checkpoint(checkpoint_path, config)
+    done = {row['key'] for row in rows}
+    jobs = [(kind, job) for kind, job in build_jobs(config) if job[0] not in done]
+    if rows:
+        print(f"↩️ Resuming: {len(rows)} batches already in {checkpoint_path}")
+    else:
+        with open(checkpoint_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'config': config}) + '\n')
+
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(checkpoint_path, 'a', encoding='utf-8') as f:
+        futures = [pool.submit(power_job if kind == 'power' else recovery_job, job)
+                   for kind, job in jobs]
+        for i, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            f.write(json.dumps(row) + '\n')
+            f.flush()
+            rows.append(row)
+            if i % max(1, len(futures) // 10) == 0 or i == len(futures):
+                print(f"   {i}/{len(futures)} batches ({time.perf_counter() - t_start:.1f} s)")
+    return rows
+
+
+def summarize_power(rows):
+    """Power per payoff set × sample size × effect"""
+    records = [{'payoffs': r['payoffs'], 'n': r['n'], 'effect': r['effect'], 'p': p, 'd': d}
+               for r in rows if r['kind'] == 'power' for p, d in zip(r['p_values'], r['cohen_d'])]
+    if not records:
+        return pd.DataFrame()
+    df = pd.DataFrame(records)
+    return (df.assign(significant=df['p'] < ALPHA)
+              .groupby(['payoffs', 'n', 'effect'])
+              .agg(studies=('p', 'size'), power=('significant', 'mean'), cohen_d=('d', 'mean'))
+              .reset_index())
+
+
+def summarize_recovery(rows):
+    """Mean recovery correlation and bias per payoff set, over converged fits only"""
+    df = pd.DataFrame([r for r in rows if r['kind'] == 'recovery'])
+    if df.empty:
+        return df
+    df['converged'] = df['rhat_max'] <= RHAT_LIMIT
+    stats = [c for c in df.columns if c.startswith(('r_', 'bias_'))]
+    groups = df.groupby(['payoffs', 'n'])
+    summary = df[df['converged']].groupby(['payoffs', 'n'])[stats].mean().reindex(groups.size().index)
+    summary.insert(0, 'studies', groups.size())
+    summary.insert(1, 'converged', groups['converged'].sum())
+    summary['rhat_max'] = groups['rhat_max'].max()
+    summary['seconds'] = groups['seconds'].mean()
+    return summary.reset_index()
+
+
+def plot_power(power, config, path):
+    """Power curves, one panel per payoff set"""
+    payoffs = list(power['payoffs'].unique())
+    fig, axes = plt.subplots(1, len(payoffs), figsize=(6 * len(payoffs), 4.5), squeeze=False)
+    for ax, payoff in zip(axes[0], payoffs):
+        subset = power[power['payoffs'] == payoff]
+        for effect, curve in subset.groupby('effect'):
+            ax.plot(curve['n'], curve['power'], marker='o', label=f"Δ{config['param']} = {effect:g}")
+        ax.axhline(TARGET_POWER, color='black', linestyle='--', linewidth=1)
+        ax.axhline(ALPHA, color='grey', linestyle=':', linewidth=1)
+        ax.set_ylim(0, 1)
+        ax.set_xlabel("Participants per group")
+        ax.set_ylabel("Power (net score, Welch t)")
+        ax.set_title(f"{config['model']} - {payoff.upper()} payoffs")
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def parse_list(options, key, default, cast):
+    return tuple(cast(v) for v in options[key].split(',')) if key in options else default
+
+
+if __name__ == "__main__":
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    quick = 'quick' in options
+    model = options.get('model') or 'pvl_delta'
+    if model not in MODELS:
+        print(f"❌ Unknown model: {model} (choices: {', '.join(MODELS)})")
+        sys.exit(1)
+    param = options.get('param') or DEFAULT_PARAM[model]
+    if param not in MODELS[model]:
+        print(f"❌ Unknown parameter for {model}: {param} (choices: {', '.join(MODELS[model])})")
+        sys.exit(1)
+
+    config = {
+        'model': model,
+        'param': param,
+        'payoffs': list(parse_list(options, 'payoffs', ('tr', 'en'), str)),
+        'n': list(parse_list(options, 'n', QUICK_N if quick else DEFAULT_N, int)),
+        'effects': list(parse_list(options, 'effects', QUICK_EFFECTS if quick else DEFAULT_EFFECTS, float)),
+        'studies': int(options.get('studies') or (100 if quick else 1000)),
+        'batch': int(options.get('batch') or (50 if quick else 100)),
+        'recovery_studies': int(options.get('recovery-studies') or (1 if quick else 4)),
+        'recovery_n': int(options.get('recovery-n') or (30 if quick else 100)),
+        # igt_bayes chains; n=100 cohorts need twice its iterations to reach R̂ ≤ 1.05
+        'chains': int(options.get('chains') or N_CHAINS),
+        'warmup': int(options.get('warmup') or (300 if quick else 2 * N_WARMUP)),
+        'samples': int(options.get('samples') or (300 if quick else 2 * N_SAMPLES)),
+        'seed': int(options.get('seed') or SEED),
+    }
+    unknown = [p for p in config['payoffs'] if p not in PAYOFFS]
+    if unknown:
+        print(f"❌ Unknown payoff set: {', '.join(unknown)} (choices: {', '.join(PAYOFFS)})")
+        sys.exit(1)
+    prefix = options.get('out') or 'power_analysis'
+    workers = int(options['workers']) if options.get('workers') else None
+
+    print(f"🔄 {model}: {config['studies']} studies × n={config['n']} × Δ{param}={config['effects']} "
+          f"× payoffs {config['payoffs']}; {config['recovery_studies']} recovery fits "
+          f"(n={config['recovery_n']}) per payoff set")
+    try:
+        rows = run_study(config, f"{prefix}_checkpoint.jsonl", workers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    power = summarize_power(rows)
+    recovery = summarize_recovery(rows)
+    if not power.empty:
+        power.to_csv(f"{prefix}_power.csv", index=False)
+        plot_power(power, config, f"{prefix}.png")
+        print("\n📊 Power (α = 0.05, two-sided Welch t-test on net score):")
+        for row in power.itertuples():
+            print(f"   {row.payoffs.upper()} n={row.n:<4} Δ={row.effect:<5g} "
+                  f"power={row.power:.3f}  d={row.cohen_d:+.2f}  ({row.studies} studies)")
+        for (payoff, effect), curve in power[power['effect'] != 0].groupby(['payoffs', 'effect']):
+            enough = curve.loc[curve['power'] >= TARGET_POWER, 'n']
+            needed = f"n ≥ {enough.min()}" if len(enough) else f"> {curve['n'].max()}"
+            print(f"   ➜ {payoff.upper()} Δ={effect:g}: {TARGET_POWER:.0%} power at {needed} per group")
+    if not recovery.empty:
+        recovery.to_csv(f"{prefix}_recovery.csv", index=False)
+        print(f"\n🎯 Parameter recovery (posterior mean vs. truth, fits with max R̂ ≤ {RHAT_LIMIT}):")
+        for row in recovery.to_dict('records'):
+            fits = f"{row['converged']}/{row['studies']} fits converged, max R̂ {row['rhat_max']:.3f}"
+            if not row['converged']:
+                print(f"   ⚠️ {row['payoffs'].upper()} n={row['n']}: no converged fit ({fits}); "
+                      f"raise --warmup/--samples")
+                continue
+            scores = ', '.join(f"{name} r={row[f'r_{name}']:.2f}" for name in MODELS[model])
+            flag = '⚠️ ' if row['converged'] < row['studies'] else ''
+            print(f"   {flag}{row['payoffs'].upper()} n={row['n']}: {scores} | "
+                  f"{fits} | {row['seconds']:.0f} s per fit")
+
+    print(f"\n💾 Results: {prefix}_power.csv, {prefix}_recovery.csv, {prefix}.png")
+    sys.exit(0)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Repaint Benchmark - Stylesheet vs Pre-rendered Experiment Assets
+Times one trial's worth of UI updates (cards enabled → choice → feedback
+shown → cards disabled/feedback hidden), each followed by a synchronous
+repaint, for:
+  1. the previous stylesheet path (QPushButton cards, setStyleSheet per label)
+  2. the current ExperimentScreen path (CardView + RenderAssets pixmaps)
+
+Usage:
+    python validation/render_benchmark.py [n_cycles]
+"""
+import os
+import sys
+import time
+import logging
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import main
+from main import Config, ExperimentScreen, get_string, get_lang_config
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
+)
+from PyQt6.QtGui import QFont
+
+
+class LegacyPanel(QWidget):
+    """Card row and feedback frame as rendered before pre-rendered assets"""
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        cards_layout = QHBoxLayout()
+        self.card_buttons = []
+        for deck_name in ['A', 'B', 'C', 'D']:
+            color = Config.CARD_COLORS[deck_name]
+            btn = QPushButton(deck_name)
+            btn.setFont(QFont('Arial', 48, QFont.Weight.Bold))
+            btn.setFixedSize(*Config.CARD_SIZE)
+            btn.setStyleSheet(f"""
+                QPushButton {{
+                    background-color: {color};
+                    color: white;
+                    border: 3px solid white;
+                    border-radius: 15px;
+                }}
+                QPushButton:hover {{
+                    border: 5px solid #ffeaa7;
+                }}
+                QPushButton:pressed {{
+                    background-color: {color}dd;
+                }}
+            """)
+            self.card_buttons.append(btn)
+            cards_layout.addWidget(btn)
+        layout.addLayout(cards_layout)
+
+        self.feedback_widget = QFrame()
+        self.feedback_widget.setFixedHeight(150)
+        self.feedback_widget.setStyleSheet("""
+            QFrame {
+                background-color: #2d3436;
+                border-radius: 10px;
+                border: 2px solid #f1c40f;
+            }
+        """)
+        self.feedback_widget.setVisible(False)
+        feedback_layout = QVBoxLayout(self.feedback_widget)
+        self.reward_label = QLabel()
+        self.penalty_label = QLabel()
+        self.net_label = QLabel()
+        for label in (self.reward_label, self.penalty_label, self.net_label):
+            label.setFont(QFont('Arial', 16, QFont.Weight.Bold))
+            feedback_layout.addWidget(label)
+        layout.addWidget(self.feedback_widget)
+
+    def enable_cards(self, enabled):
+        for btn in self.card_buttons:
+            btn.setEnabled(enabled)
+
+    def show_feedback(self, reward, penalty, net):
+        currency = get_lang_config()['currency']
+        self.reward_label.setText(f"✅ {get_string('reward').upper()}: +{reward:,} {currency}")
+        self.reward_label.setStyleSheet(f"color: {Config.SUCCESS_COLOR};")
+        if penalty < 0:
+            self.penalty_label.setText(f"❌ {get_string('penalty').upper()}: {penalty:,} {currency}")
+            self.penalty_label.setStyleSheet(f"color: {Config.ERROR_COLOR};")
+        else:
+            self.penalty_label.setText(f"✨ {get_string('no_penalty').upper()}")
+            self.penalty_label.setStyleSheet("color: #95a5a6;")
+        net_color = Config.SUCCESS_COLOR if net >= 0 else Config.ERROR_COLOR
+        self.net_label.setText(f"{get_string('net').upper()}: {net:+,} {currency}")
+        self.net_label.setStyleSheet(f"color: {net_color};")
+        self.feedback_widget.setVisible(True)
+
+    def hide_feedback(self):
+        self.feedback_widget.setVisible(False)
+
+
+class PrerenderedPanel:
+    """Adapter exposing the same calls on a real ExperimentScreen"""
+
+    def __init__(self):
+        self.screen = ExperimentScreen({'subject_id': 'BENCH', 'age': 30, 'gender': 'F'})
+
+    def enable_cards(self, enabled):
+        self.screen.enable_cards(enabled)
+
+    def show_feedback(self, reward, penalty, net):
+        self.screen.show_feedback(reward, penalty, net)
+
+    def hide_feedback(self):
+        self.screen.feedback_label.setPixmap(self.screen.assets.blank_feedback)
+
+
+def time_cycles(window, panel, outcomes, n_cycles):
+    """Return per-cycle update+repaint times in milliseconds"""
+    app = QApplication.instance()
+    times = []
+    for i in range(n_cycles):
+        reward, penalty = outcomes[i % len(outcomes)]
+        t0 = time.perf_counter_ns()
+        panel.enable_cards(True)
+        window.repaint()
+        panel.enable_cards(False)
+        panel.show_feedback(reward, penalty, reward + penalty)
+        window.repaint()
+        panel.hide_feedback()
+        window.repaint()
+        times.append((time.perf_counter_ns() - t0) / 1e6)
+        app.processEvents()
+    return np.array(times)
+
+
+def make_window(app, widget, theme_source):
+    window = QMainWindow()
+    window.setStyleSheet(theme_source.styleSheet())
+    window.setCentralWidget(widget)
+    window.resize(1200, 800)
+    window.show()
+    app.processEvents()
+    return window
+
+
+def run_benchmark(n_cycles=500):
+    app = QApplication.instance() or QApplication(sys.argv)
+    logging.disable(logging.CRITICAL)
+
+    # Dark theme stylesheet as applied by IGTMainWindow
+    theme = QMainWindow()
+    main.IGTMainWindow.apply_dark_theme(theme)
+
+    t0 = time.perf_counter()
+    prerendered = PrerenderedPanel()
+    build_ms = (time.perf_counter() - t0) * 1000
+    outcomes = [(deck.reward, penalty) for deck in prerendered.screen.decks
+                for penalty in sorted(set(deck.schedule))]
+
+    print(f"🔄 Timing {n_cycles} trial update cycles per path...")
+    legacy = LegacyPanel()
+    legacy_window = make_window(app, legacy, theme)
+    legacy_times = time_cycles(legacy_window, legacy, outcomes, n_cycles)
+
+    new_window = make_window(app, prerendered.screen, theme)
+    new_times = time_cycles(new_window, prerendered, outcomes, n_cycles)
+
+    print("\n📊 Update + repaint time per trial (ms):")
+    print("-" * 50)
+    for name, times in (("Stylesheet (legacy)", legacy_times), ("Pre-rendered", new_times)):
+        print(f"  {name:22s} mean {times.mean():7.3f} | median {np.median(times):7.3f} "
+              f"| p95 {np.percentile(times, 95):7.3f}")
+    print(f"\n  Speed-up (median): {np.median(legacy_times) / np.median(new_times):.2f}x")
+    print(f"  Screen construction incl. asset rendering: {build_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Session Replay - Headless Re-run of Recorded Sessions
+Feeds the recorded choices of IGT sessions (CSV archive or session DB) into
+ExperimentScreen.card_selected under the offscreen platform and checks that
+the application reproduces them exactly:
+  - draws: reward and penalty of every trial (decks rebuilt from the stored
+    schedule seed)
+  - balances: running total after every trial
+  - outputs: the generated CSV frame (TrialBuffer.to_dataframe) and the
+    behavioural metrics (igt_metrics) against the originals
+
+Feedback timers are compressed (Config.FEEDBACK_DURATION_MS, default 0 ms)
+and each trial's recorded reaction time is reproduced by back-dating the
+trial start. Sessions recorded before schedule seeds existed are replayed
+with their recorded draws injected into the decks: balances and outputs
+are still checked, draws are reported as 'unseeded'. A session that cannot
+be replayed (e.g. payoffs matching neither payoff set, or a stalled screen)
+is reported with status 'error' and the replay continues with the next one.
+
+Usage:
+    python validation/replay_sessions.py <csv|archive_dir|sessions.db>...
+        [--session=<session_id>] [--speed=max|N] [--out=replay_report.csv]
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from main import Config, ExperimentScreen, LanguageSelectionDialog, LanguageConfig
+from igt_metrics import session_metrics
+from import_archive import scan_archive, parse_session_csv
+from PyQt6.QtWidgets import QApplication
+
+TRIAL_FIELDS = ('deck', 'reward', 'penalty', 'net_outcome', 'total_balance')
+RT_TOLERANCE_S = 0.002           # recorded RTs are rounded to 1 ms
+METRIC_TOLERANCE = 1e-3
+CSV_COLUMNS = ['Subject_ID', 'Subject_Age', 'Subject_Gender', 'Trial_Number', 'Deck_Selected',
+               'Reward', 'Penalty', 'Net_Outcome', 'Total_Balance', 'Schedule_Seed']
+MAX_WAIT_S = 30.0
+
+
+def csv_record(csv_path):
+    """Recorded session from an IGT_*.csv file (validated by import_archive)"""
+    session_row, columns = parse_session_csv(csv_path)
+    if session_row is None:
+        raise ValueError(columns)
+    trial_number, deck, rt, reward, penalty, net, balance, _ = columns
+    return {
+        'session_id': session_row[0],
+        'info': {'subject_id': session_row[1], 'age': session_row[2], 'gender': session_row[3]},
+        'seed': session_row[13],
+        'trials': pd.DataFrame({'trial_number': trial_number, 'deck': deck, 'reaction_time': rt,
+                                'reward': reward, 'penalty': penalty, 'net_outcome': net,
+                                'total_balance': balance}),
+        'csv': pd.read_csv(csv_path),
+    }
+
+
+def db_records(db_path, session_id=None):
+    """Recorded sessions from the session database"""
+    conn = sqlite3.connect(db_path)
+    try:
+        # Seeds are 64-bit: read as text so NULLs in the column do not turn them into floats
+        sessions = pd.read_sql_query(
+            "SELECT sid, session_id, subject_id, age, gender,"
+            " CAST(schedule_seed AS TEXT) AS schedule_seed FROM sessions"
+            + (" WHERE session_id = ?" if session_id else "") + " ORDER BY start_time",
+            conn, params=(session_id,) if session_id else None)
+        trials = pd.read_sql_query("""
+            SELECT sid, trial_number, deck, reaction_time, reward, penalty,
+                   net_outcome, total_balance
+            FROM trial_data
+            ORDER BY sid, trial_number
+        """, conn)
+    finally:
+        conn.close()
+    by_sid = dict(tuple(trials.groupby('sid')))
+    for row in sessions.itertuples():
+        if row.sid not in by_sid:
+            continue
+        yield {
+            'session_id': row.session_id,
+            'info': {'subject_id': row.subject_id, 'age': row.age, 'gender': row.gender},
+            'seed': None if pd.isna(row.schedule_seed) else int(row.schedule_seed),
+            'trials': by_sid[row.sid].drop(columns='sid').reset_index(drop=True),
+            'csv': None,
+        }
+
+
+def iter_records(paths, session_id=None):
+    """(source, record or error) for every session found in the given paths"""
+    for path in paths:
+        if path.endswith('.db'):
+            for record in db_records(path, session_id):
+                yield path, record
+            continue
+        for csv_path in scan_archive(path) if os.path.isdir(path) else [path]:
+            try:
+                record = csv_record(csv_path)
+            except Exception as e:
+                yield csv_path, e
+                continue
+            if session_id is None or record['session_id'] == session_id:
+                yield csv_path, record
+
+
+def session_language(trials):
+    """Payoff set of the recorded session (from its rewards)"""
+    en_rewards = {LanguageConfig.EN['reward_bad'], LanguageConfig.EN['reward_good']}
+    return 'EN' if set(trials['reward'].unique()) <= en_rewards else 'TR'
+
+
+def inject_recorded_draws(screen, trials):
+    """Unseeded sessions: decks deal the recorded penalties in order"""
+    for code, deck in enumerate(screen.decks):
+        drawn = trials.loc[trials['deck'] == code, 'penalty'].tolist()
+        deck.schedule = drawn + deck.schedule[len(drawn):]
+
+
+def process_until(app, condition):
+    """Processes Qt events (timers) until the condition holds"""
+    deadline = time.perf_counter() + MAX_WAIT_S
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("ExperimentScreen did not advance")
+        app.processEvents()
+
+
+def replay(app, language_dialog, record):
+    """Replays one session, returns (TrialBuffer, per-trial processing times in s)"""
+    trials = record['trials']
+    language_dialog.select_language(session_language(trials))
+    max_trials = Config.MAX_TRIALS
+    Config.MAX_TRIALS = len(trials)
+    try:
+        screen = ExperimentScreen(record['info'], schedule_seed=record['seed'])
+        try:
+            if record['seed'] is None:
+                inject_recorded_draws(screen, trials)
+            completed = []
+            screen.experiment_complete.connect(completed.append)
+            screen.show()
+            process_until(app, lambda: screen.trial_start_time is not None)
+
+            durations = np.empty(len(trials))
+            for i, (deck, rt) in enumerate(zip(trials['deck'], trials['reaction_time'])):
+                started = datetime.now() - timedelta(seconds=float(rt))
+                screen.trial_start_time = started
+                t0 = time.perf_counter()
+                screen.card_selected(int(deck))
+                if i + 1 < len(trials):
+                    process_until(app, lambda: screen.trial_start_time is not started)
+                else:
+                    process_until(app, lambda: completed)
+                durations[i] = time.perf_counter() - t0
+            return completed[0], durations
+        finally:
+            screen.close()
+            screen.deleteLater()
+    finally:
+        Config.MAX_TRIALS = max_trials
+
+
+def compare(record, buffer):
+    """Differences between the recorded and the replayed session"""
+    trials = record['trials']
+    replayed = pd.DataFrame(buffer.view)
+    diffs = []
+    if len(replayed) != len(trials):
+        return [f"trial count {len(trials)} → {len(replayed)}"]
+    for field in TRIAL_FIELDS:
+        bad = np.flatnonzero(replayed[field].to_numpy() != trials[field].to_numpy())
+        if len(bad):
+            i = bad[0]
+            diffs.append(f"{field}: {len(bad)} trials, first at trial {i + 1} "
+                         f"({trials[field].iloc[i]} → {replayed[field].iloc[i]})")
+    rt_error = np.abs(replayed['reaction_time'].to_numpy() - trials['reaction_time'].to_numpy())
+    if rt_error.max() > RT_TOLERANCE_S:
+        diffs.append(f"reaction_time: max error {rt_error.max():.4f} s")
+
+    original = session_metrics(trials['deck'], trials['net_outcome'],
+                               trials['reaction_time'], trials['trial_number'])
+    metrics = session_metrics(replayed['deck'], replayed['net_outcome'],
+                              replayed['reaction_time'], replayed['trial_number'])
+    for name, value in original.items():
+        if not np.isclose(metrics[name], value, atol=METRIC_TOLERANCE, equal_nan=True):
+            diffs.append(f"metric {name}: {value:.4f} → {metrics[name]:.4f}")
+
+    if record['csv'] is not None:
+        frame = buffer.to_dataframe()
+        for column in CSV_COLUMNS:
+            if column not in record['csv'].columns:
+                continue
+            expected = record['csv'][column].astype(str).to_numpy()
+            actual = frame[column].astype(str).to_numpy() if column in frame else None
+            if actual is None or not np.array_equal(expected, actual):
+                diffs.append(f"csv column {column} differs")
+    return diffs
+
+
+def run_replay(paths, session_id=None, speed='max'):
+    """Replays every session and returns the report rows"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    language_dialog = LanguageSelectionDialog()
+    logging.disable(logging.CRITICAL)
+    feedback_ms, first_ms = Config.FEEDBACK_DURATION_MS, Config.FIRST_TRIAL_DELAY_MS
+    if speed != 'max':
+        Config.FEEDBACK_DURATION_MS = int(feedback_ms / float(speed))
+        Config.FIRST_TRIAL_DELAY_MS = int(first_ms / float(speed))
+    else:
+        Config.FEEDBACK_DURATION_MS = Config.FIRST_TRIAL_DELAY_MS = 0
+
+    rows = []
+    try:
+        for source, record in iter_records(paths, session_id):
+            if isinstance(record, Exception):
+                rows.append({'session_id': os.path.basename(source), 'source': source,
+                             'status': 'unreadable', 'diffs': str(record)})
+                print(f"   ⚠️ {os.path.basename(source)}: {record}")
+                continue
+            t_start = time.perf_counter()
+            try:
+                buffer, durations = replay(app, language_dialog, record)
+                diffs = compare(record, buffer)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                rows.append({'session_id': record['session_id'], 'source': source,
+                             'status': 'error', 'seconds': time.perf_counter() - t_start,
+                             'diffs': error})
+                print(f"   💥 {record['session_id']}: {error}")
+                app.processEvents()
+                continue
+            status = 'diff' if diffs else ('ok' if record['seed'] is not None else 'unseeded')
+            rows.append({
+                'session_id': record['session_id'], 'source': source, 'status': status,
+                'trials': len(durations), 'seconds': time.perf_counter() - t_start,
+                'trial_ms_mean': 1000 * durations.mean(),
+                'trial_ms_p95': 1000 * np.percentile(durations, 95),
+                'trial_ms_max': 1000 * durations.max(),
+                'diffs': '; '.join(diffs),
+            })
+            icon = {'ok': '✅', 'unseeded': '➖', 'diff': '❌'}[status]
+            print(f"   {icon} {record['session_id']}: {len(durations)} trials, "
+                  f"{1000 * durations.mean():.2f} ms/trial" + (f" | {diffs[0]}" if diffs else ""))
+            app.processEvents()
+    finally:
+        Config.FEEDBACK_DURATION_MS, Config.FIRST_TRIAL_DELAY_MS = feedback_ms, first_ms
+        language_dialog.deleteLater()
+    return rows
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    missing = [p for p in args if not os.path.exists(p)]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    t_start = time.perf_counter()
+    print(f"🔄 Replaying sessions from {', '.join(args)}...")
+    rows = run_replay(args, options.get('session'), options.get('speed') or 'max')
+    elapsed = time.perf_counter() - t_start
+
+    report = pd.DataFrame(rows)
+    out_path = options.get('out') or 'replay_report.csv'
+    report.to_csv(out_path, index=False)
+    counts = report['status'].value_counts().to_dict() if len(report) else {}
+    print(f"\n📊 {len(report)} sessions in {elapsed:.1f} s: "
+          f"{counts.get('ok', 0)} exact, {counts.get('unseeded', 0)} unseeded (balances/outputs only), "
+          f"{counts.get('diff', 0)} with differences, {counts.get('error', 0)} failed, "
+          f"{counts.get('unreadable', 0)} unreadable")
+    if 'trial_ms_mean' in report:
+        replayed = report[~report['status'].isin(['unreadable', 'error'])]
+        print(f"   Per-trial processing: mean {replayed['trial_ms_mean'].mean():.2f} ms, "
+              f"p95 {replayed['trial_ms_p95'].max():.2f} ms, max {replayed['trial_ms_max'].max():.2f} ms")
+    print(f"💾 Report: {out_path}")
+    sys.exit(1 if counts.get('diff') or counts.get('error') or counts.get('unreadable') else 0)
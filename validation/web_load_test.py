@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Web Session Server Load Test - Concurrent Simulated Participants
+Starts a local web_server instance on a fresh database (or targets a running
+one with --url) and lets hundreds of simulated participants play the task at
+the same time over keep-alive HTTP connections:
+  - every participant starts a session, then chooses a deck after a random
+    think time, waits the feedback duration announced by the server and
+    repeats until the server reports the session as done
+  - request latency is measured per endpoint (start / choice / final choice,
+    which includes the batched database commit) and reported as percentiles
+  - with a local instance the database is checked afterwards: every finished
+    participant must have exactly one session with all trials and the final
+    balance the participant saw
+
+Usage:
+    python validation/web_load_test.py [--participants=300] [--trials=100]
+        [--think-ms=150] [--feedback-ms=100] [--ramp=5] [--port=8091]
+        [--url=http://host:port] [--seed=N] [--out=web_load_test.csv]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+PERCENTILES = (50, 90, 99)
+STARTUP_TIMEOUT_S = 30
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 JSON client over asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """Returns (status, JSON body, latency in s)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        t0 = time.perf_counter()
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                          .encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        latency = time.perf_counter() - t0
+        if headers.get('connection') == 'close':
+            self.close()
+        return status, json.loads(data) if data else {}, latency
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def participant(index, host, port, think_ms, delay, rng, log):
+    """One simulated participant; appends (endpoint, status, latency) to log"""
+    await asyncio.sleep(delay)
+    conn = Connection(host, port)
+    try:
+        status, session, latency = await conn.request('POST', '/api/start', {
+            'lang': 'EN' if index % 2 else 'TR', 'age': int(rng.integers(18, 70)),
+            'gender': 'F' if rng.random() < 0.5 else 'M', 'subject_id': f"LOAD{index:05d}"})
+        log.append(('start', status, latency))
+        if status != 200:
+            return None
+        feedback_s = session['feedback_ms'] / 1000
+        preference = rng.dirichlet(np.ones(4))
+        while True:
+            think = rng.exponential(think_ms) + 20
+            await asyncio.sleep(think / 1000)
+            deck = 'ABCD'[rng.choice(4, p=preference)]
+            status, result, latency = await conn.request(
+                'POST', '/api/choice', {'token': session['token'], 'deck': deck, 'rt_ms': think})
+            done = status == 200 and result['done']
+            log.append(('final' if done else 'choice', status, latency))
+            if status != 200:
+                return None
+            if done:
+                return session['session_id'], result['trial'], result['balance']
+            await asyncio.sleep(feedback_s)
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+        log.append(('error', 0, 0.0))
+        print(f"   ⚠️ participant {index}: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+async def run_load(host, port, n_participants, think_ms, ramp_s, seed):
+    """Runs all participants concurrently, returns (finished, log, seconds, status)"""
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_participants)]
+    log = []
+    t0 = time.perf_counter()
+    finished = await asyncio.gather(*[
+        participant(i, host, port, think_ms, ramp_s * i / max(1, n_participants), rngs[i], log)
+        for i in range(n_participants)])
+    elapsed = time.perf_counter() - t0
+    conn = Connection(host, port)
+    _, status, _ = await conn.request('GET', '/status')
+    conn.close()
+    return [f for f in finished if f], log, elapsed, status
+
+
+def wait_for_port(host, port, process):
+    """Blocks until the server accepts connections"""
+    deadline = time.perf_counter() + STARTUP_TIMEOUT_S
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"web_server exited with code {process.returncode}")
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("web_server did not start")
+
+
+def check_database(db_path, finished, n_trials):
+    """Differences between what participants saw and what was stored"""
+    conn = sqlite3.connect(db_path)
+    try:
+        stored = pd.read_sql_query("""
+            SELECT s.session_id, s.final_balance, COUNT(t.trial_number) AS trials
+            FROM sessions s LEFT JOIN trial_data t ON t.sid = s.sid
+            GROUP BY s.sid
+        """, conn).set_index('session_id')
+        metrics = conn.execute("SELECT COUNT(DISTINCT sid) FROM session_metrics").fetchone()[0]
+    finally:
+        conn.close()
+    problems = []
+    if len(stored) != len(finished):
+        problems.append(f"{len(stored)} stored sessions for {len(finished)} finished participants")
+    for session_id, trials, balance in finished:
+        if session_id not in stored.index:
+            problems.append(f"{session_id}: not stored")
+        elif stored.at[session_id, 'trials'] != n_trials or trials != n_trials:
+            problems.append(f"{session_id}: {stored.at[session_id, 'trials']} trials stored")
+        elif stored.at[session_id, 'final_balance'] != balance:
+            problems.append(f"{session_id}: final balance {stored.at[session_id, 'final_balance']} "
+                            f"!= {balance}")
+    if metrics != len(stored):
+        problems.append(f"metrics for {metrics} of {len(stored)} sessions")
+    return problems
+
+
+def latency_table(log):
+    """Latency percentiles per endpoint (ms)"""
+    df = pd.DataFrame(log, columns=['endpoint', 'status', 'latency'])
+    rows = []
+    for endpoint, group in df.groupby('endpoint', sort=False):
+        ms = 1000 * group['latency'].to_numpy()
+        row = {'endpoint': endpoint, 'requests': len(group),
+               'errors': int((group['status'] != 200).sum()), 'mean_ms': ms.mean()}
+        row.update({f'p{p}_ms': np.percentile(ms, p) for p in PERCENTILES})
+        row['max_ms'] = ms.max()
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    options = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '')
+                   for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in options:
+        print(__doc__)
+        sys.exit(0)
+    n_participants = int(options.get('participants') or 300)
+    n_trials = int(options.get('trials') or 100)
+    think_ms = float(options.get('think-ms') or 150)
+    feedback_ms = int(options.get('feedback-ms') or 100)
+    ramp_s = float(options.get('ramp') or 5)
+    seed = int(options.get('seed') or 20260101)
+
+    process = db_path = None
+    if options.get('url'):
+        url = urlsplit(options['url'])
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', int(options.get('port') or 8091)
+        db_path = os.path.join(tempfile.mkdtemp(prefix='igt_web_load_'), 'igt_web.db')
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(SRC_DIR, 'web_server.py'), db_path, f'--port={port}',
+             f'--trials={n_trials}', f'--feedback-ms={feedback_ms}'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env={**os.environ, 'QT_QPA_PLATFORM': 'offscreen'})
+
+    try:
+        if process is not None:
+            wait_for_port(host, port, process)
+        print(f"🚀 {n_participants} participants × {n_trials} trials against http://{host}:{port} "
+              f"(think ~{think_ms:.0f} ms, feedback {feedback_ms} ms, ramp {ramp_s:.0f} s)")
+        finished, log, elapsed, status = asyncio.run(
+            run_load(host, port, n_participants, think_ms, ramp_s, seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=STARTUP_TIMEOUT_S)
+
+    table = latency_table(log)
+    n_requests = int(table['requests'].sum())
+    print(f"\n📊 {len(finished)}/{n_participants} participants finished in {elapsed:.1f} s "
+          f"({n_requests / elapsed:.0f} requests/s)")
+    for row in table.itertuples():
+        print(f"   {row.endpoint:<7} n={row.requests:<7} errors={row.errors:<4} "
+              + "  ".join(f"p{p}={getattr(row, f'p{p}_ms'):.2f}" for p in PERCENTILES)
+              + f"  max={row.max_ms:.2f} ms")
+    if status.get('commits'):
+        print(f"   DB writer: {status['sessions_written']} sessions in {status['commits']} commits")
+
+    problems = check_database(db_path, finished, n_trials) if db_path else []
+    for problem in problems[:10]:
+        print(f"   ❌ {problem}")
+    if db_path and not problems:
+        print(f"   ✅ Database matches all {len(finished)} finished sessions")
+
+    out_path = options.get('out') or 'web_load_test.csv'
+    table.to_csv(out_path, index=False)
+    print(f"💾 Report: {out_path}")
+    failed = table['errors'].sum() or len(finished) < n_participants or problems
+    sys.exit(1 if failed else 0)